@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.checks import Error, Tags, register
+from django.core.exceptions import ImproperlyConfigured
+
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+def is_process_local_cache(alias=DEFAULT_CACHE_ALIAS):
+    """
+    Returns whether the cache ``alias`` lives in the memory of each process,
+    so a value set by one gunicorn worker is never seen by the others.
+    """
+    return settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_CACHES
+
+
+SHARED_CACHE_MESSAGE = (
+    "CACHES['default'] uses a per-process backend, so a cached list or list "
+    "validator (ETag/Last-Modified) invalidated by one worker stays stale in "
+    "the others (pet/cache.py, pet/mixins.py), a revoked token is still "
+    "accepted (user/authentication.py), and token clients are not pinned to "
+    "the primary after a write (PetLink/db_router.py)."
+)
+SHARED_CACHE_HINT = (
+    "Set CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and "
+    "CACHE_LOCATION=redis://... (or a Memcached backend)."
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG or not is_process_local_cache():
+        return []
+    return [Error(SHARED_CACHE_MESSAGE, hint=SHARED_CACHE_HINT, id='petlink.E001')]
+
+
+def require_shared_cache(workers):
+    """
+    Raises ``ImproperlyConfigured`` when ``workers`` processes would each use
+    their own copy of the default cache.
+    """
+    if workers > 1 and is_process_local_cache():
+        raise ImproperlyConfigured(f"{SHARED_CACHE_MESSAGE} {workers} workers are configured. {SHARED_CACHE_HINT}")
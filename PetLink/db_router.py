@@ -0,0 +1,178 @@
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+# Реплика, из которой читает текущий запрос (None — читаем с основной базы)
+current_replica = ContextVar('current_replica', default=None)
+
+PIN_KEY_PREFIX = 'replica-pin'
+PIN_COOKIE = 'replica_pin'
+
+# alias -> (healthy, monotonic time of the check), per process
+_health = {}
+_round_robin = itertools.count()
+
+
+def get_config():
+    return getattr(settings, 'READ_REPLICAS', {})
+
+
+def get_replicas():
+    return get_config().get('DATABASES', [])
+
+
+def get_pin_seconds():
+    return get_config().get('PIN_SECONDS', 5)
+
+
+def pin_to_primary(request, response):
+    """
+    Sends the reads of ``request.user`` to the primary for ``PIN_SECONDS``
+    after a write, so they see their own changes while the replicas catch up.
+
+    The pin travels with the client as a signed, timestamped cookie, so
+    whichever worker handles the next request sees it. Token clients that do
+    not keep cookies are pinned through the Django cache as well, which needs
+    a shared backend to follow them between workers (see
+    :mod:`PetLink.checks`).
+    """
+    user = request.user
+    seconds = get_pin_seconds()
+    cache.set(f'{PIN_KEY_PREFIX}:{user.pk}', True, seconds)
+    response.set_signed_cookie(
+        PIN_COOKIE, str(user.pk), salt=PIN_KEY_PREFIX, max_age=seconds,
+        secure=request.is_secure(), httponly=True, samesite='Lax',
+    )
+
+
+def is_pinned(request):
+    user = request.user
+    try:
+        # max_age проверяется по подписанной метке времени, а не по сроку куки в браузере
+        pinned = request.get_signed_cookie(PIN_COOKIE, salt=PIN_KEY_PREFIX, max_age=get_pin_seconds())
+    except (KeyError, signing.BadSignature):
+        pinned = None
+    if pinned == str(user.pk):
+        return True
+    return cache.get(f'{PIN_KEY_PREFIX}:{user.pk}', False)
+
+
+def is_healthy(alias):
+    """
+    Checks that the replica accepts queries, at most once per
+    ``HEALTH_CHECK_INTERVAL`` seconds while healthy and once per
+    ``RETRY_AFTER`` seconds after a failure.
+
+    The check runs on the DB-API connection, bypassing Django's execute
+    wrappers, so it is not counted against view query budgets.
+    """
+    config = get_config()
+    healthy, checked_at = _health.get(alias, (True, None))
+    interval = config.get('HEALTH_CHECK_INTERVAL', 10) if healthy else config.get('RETRY_AFTER', 30)
+    now = time.monotonic()
+    if checked_at is not None and now - checked_at < interval:
+        return healthy
+
+    connection = connections[alias]
+    try:
+        connection.ensure_connection()
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+    except Exception as exc:
+        # Соединение могло остаться полуоткрытым; закрываем, чтобы следующая проверка переподключилась
+        try:
+            connection.close()
+        except DatabaseError:
+            pass
+        if healthy:
+            logger.warning('Read replica %s is unavailable, reading from the primary: %s', alias, exc)
+        _health[alias] = (False, now)
+        return False
+
+    if not healthy:
+        logger.info('Read replica %s is available again.', alias)
+    _health[alias] = (True, now)
+    return True
+
+
+def choose_replica():
+    """
+    Returns a healthy replica alias, rotating between them, or ``None`` when
+    there are no replicas or none of them is healthy.
+    """
+    replicas = get_replicas()
+    if not replicas:
+        return None
+    start = next(_round_robin)
+    for offset in range(len(replicas)):
+        alias = replicas[(start + offset) % len(replicas)]
+        if is_healthy(alias):
+            return alias
+    return None
+
+
+class ReplicaRouter:
+    """
+    Database router sending reads to a read replica while a request that
+    allows it is being handled (see :class:`ReplicaReadMixin`); everything
+    else, including all writes, goes to the primary.
+
+    Replicas are configured with ``REPLICA_DATABASE_URLS`` and listed in
+    ``READ_REPLICAS['DATABASES']``. They are expected to hold the same data as
+    the primary, so relations between objects from any of them are allowed.
+    """
+
+    def db_for_read(self, model, **hints):
+        return current_replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    View mixin letting safe requests read from a replica.
+
+    The replica is chosen once per request, after authentication, so all of
+    the request's reads come from the same replica. Users who wrote within the last
+    ``READ_REPLICAS['PIN_SECONDS']`` seconds (see
+    :class:`PetLink.middleware.ReplicaPinMiddleware`) keep reading from the
+    primary; the window should be longer than the usual replication lag.
+
+    :ivar read_replica: Whether GET/HEAD/OPTIONS requests may read from a replica.
+    :type read_replica: bool
+    """
+    read_replica = True
+
+    def dispatch(self, request, *args, **kwargs):
+        token = current_replica.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            current_replica.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not self.read_replica or request.method not in SAFE_METHODS or not get_replicas():
+            return
+        if request.user.is_authenticated and is_pinned(request):
+            return
+        current_replica.set(choose_replica())
@@ -0,0 +1,136 @@
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+from .db_router import get_replicas, pin_to_primary
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+def compress_gzip(content, level):
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def compress_zstd(content, level):
+    # ZstdCompressor нельзя делить между потоками, создаём на каждый ответ
+    return zstandard.ZstdCompressor(level=level).compress(content)
+
+
+# (encoding, compress function, default level), in server preference order
+COMPRESSORS = [
+    ('zstd', compress_zstd, 3),
+    ('gzip', compress_gzip, 6),
+]
+
+
+def parse_accept_encoding(header):
+    """
+    Parses an ``Accept-Encoding`` header into ``{coding: q}``. Codings listed
+    with ``q=0`` are kept so they can be refused explicitly.
+    """
+    codings = {}
+    for item in header.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding.lower()] = q
+    return codings
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses response bodies with zstd or gzip, whichever the client
+    accepts and prefers (``Accept-Encoding`` q-values; on a tie zstd wins).
+
+    Responses smaller than ``RESPONSE_COMPRESSION['MIN_SIZE']`` bytes are
+    sent as is, since compressing them costs more CPU than it saves on the
+    wire. Streaming responses (file downloads, exports that are already
+    gzipped) and responses that already have a ``Content-Encoding`` are left
+    alone. zstd is only offered when the ``zstandard`` package is installed.
+
+    Unlike Django's ``GZipMiddleware`` this does not pad responses against
+    BREACH: API responses do not carry CSRF tokens, and clients authenticate
+    with a header rather than a secret that is echoed back.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        config = getattr(settings, 'RESPONSE_COMPRESSION', {})
+        self.min_size = config.get('MIN_SIZE', 1024)
+        levels = config.get('LEVELS', {})
+        enabled = config.get('ENCODINGS', [encoding for encoding, compress, level in COMPRESSORS])
+        self.compressors = [
+            (encoding, compress, levels.get(encoding, level))
+            for encoding, compress, level in COMPRESSORS
+            if encoding in enabled and (encoding != 'zstd' or zstandard is not None)
+        ]
+
+    def choose_encoding(self, request):
+        accepted = parse_accept_encoding(request.headers.get('Accept-Encoding', ''))
+        wildcard = accepted.get('*', 0.0)
+        best = None
+        for encoding, compress, level in self.compressors:
+            q = accepted.get(encoding, wildcard)
+            if q > 0 and (best is None or q > best[0]):
+                best = (q, encoding, compress, level)
+        return best[1:] if best else None
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if response.status_code in (204, 304) or len(response.content) < self.min_size:
+            return response
+
+        # Тело зависит от Accept-Encoding, даже если клиент сжатие не принял
+        patch_vary_headers(response, ('Accept-Encoding',))
+        choice = self.choose_encoding(request)
+        if choice is None:
+            return response
+
+        encoding, compress, level = choice
+        compressed = compress(response.content, level)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # Сжатое тело уже не побайтово равно исходному
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    """
+    Pins users who just changed data to the primary database, so their next
+    reads do not hit a replica that has not caught up yet
+    (see :mod:`PetLink.db_router`).
+
+    Runs on the response, when DRF has already authenticated the user (token
+    users included) and copied it onto the Django request. The pin is set as
+    a signed cookie on the response (see :func:`PetLink.db_router.pin_to_primary`).
+    """
+
+    def process_response(self, request, response):
+        if request.method in SAFE_METHODS or not get_replicas():
+            return response
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary(request, response)
+        return response
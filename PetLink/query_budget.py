@@ -0,0 +1,128 @@
+import logging
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a view issues more SQL queries than its declared budget and
+    ``QUERY_BUDGET_STRICT`` is enabled.
+    """
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the queries run while it is installed.
+
+    Transaction control statements are not counted: whether ``atomic()``
+    issues savepoints depends on an enclosing transaction (always present
+    under ``TestCase``), and whether it sends an explicit ``BEGIN`` depends on
+    the database backend (SQLite does), not on the work the view does.
+    Queries run inside :meth:`excluded` are counted separately.
+
+    :ivar count: Number of counted queries.
+    :type count: int
+    :ivar excluded_count: Number of queries run inside :meth:`excluded`.
+    :type excluded_count: int
+    """
+    ignored_prefixes = ('BEGIN', 'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+    def __init__(self):
+        self.count = 0
+        self.excluded_count = 0
+        self.excluding = False
+
+    @property
+    def total(self):
+        return self.count + self.excluded_count
+
+    @contextmanager
+    def excluded(self):
+        excluding, self.excluding = self.excluding, True
+        try:
+            yield
+        finally:
+            self.excluding = excluding
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.startswith(self.ignored_prefixes):
+            pass
+        elif self.excluding:
+            self.excluded_count += 1
+        else:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMixin:
+    """
+    View mixin enforcing a per-endpoint SQL query budget.
+
+    Every request dispatched through the view is counted across all database
+    connections. When the count exceeds the budget declared for the request
+    method, a warning is logged; with ``QUERY_BUDGET_STRICT`` enabled (the
+    default under DEBUG and in the test runner) :class:`QueryBudgetExceeded` is
+    raised instead so N+1 regressions fail loudly. When ``QUERY_COUNT_HEADER``
+    is enabled, the total count, authentication included, is also exposed in
+    the ``X-Query-Count`` header.
+
+    Authentication queries are not charged to the budget: their number depends
+    on how the client authenticates (a session costs the session and the user,
+    a token one lookup or none when cached), not on the view.
+
+    In strict mode unsafe requests run in a transaction and the budget is
+    checked before it commits, so a request that raises
+    :class:`QueryBudgetExceeded` does not leave its writes behind.
+
+    :ivar query_budget: Maximum number of queries, authentication excluded,
+        either a single int for all methods or a mapping of HTTP method to int.
+    :type query_budget: int | dict[str, int] | None
+    """
+    query_budget = None
+
+    def get_query_budget(self, request):
+        if isinstance(self.query_budget, dict):
+            return self.query_budget.get(request.method)
+        return self.query_budget
+
+    def dispatch(self, request, *args, **kwargs):
+        self.query_counter = counter = QueryCounter()
+        strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+        with ExitStack() as stack:
+            if strict and request.method not in SAFE_METHODS:
+                # Проверяем бюджет до фиксации: при превышении записи откатываются
+                stack.enter_context(transaction.atomic(using=DEFAULT_DB_ALIAS))
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = super().dispatch(request, *args, **kwargs)
+            # DRF replaces self.request with its own Request during dispatch
+            self.check_query_budget(self.request, counter.count, strict)
+
+        if getattr(settings, 'QUERY_COUNT_HEADER', False):
+            response['X-Query-Count'] = str(counter.total)
+        return response
+
+    def perform_authentication(self, request):
+        with self.query_counter.excluded():
+            super().perform_authentication(request)
+
+    def check_query_budget(self, request, count, strict=False):
+        budget = self.get_query_budget(request)
+        logger.debug('%s %s ran %d queries (budget %s)',
+                     request.method, type(self).__name__, count, budget)
+        if budget is None or count <= budget:
+            return
+
+        message = (
+            f'{request.method} {request.path} ({type(self).__name__}) ran {count} '
+            f'SQL queries, over its budget of {budget}.'
+        )
+        if strict:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
@@ -1,5 +1,7 @@
+from importlib.util import find_spec
 from pathlib import Path
 import os
+import tempfile
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -35,10 +37,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'PetLink.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'PetLink.middleware.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -49,10 +53,50 @@ CORS_ALLOW_ALL_ORIGINS = os.getenv("CORS_ALLOW_ALL_ORIGINS", "False") == "True"
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',  # For user session authentication
-        'rest_framework.authentication.TokenAuthentication',    # For API tokens
+        'user.authentication.CachedTokenAuthentication',        # For API tokens
     ],
+    # orjson for JSON, MessagePack (selected via Accept/Content-Type) when msgpack is installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'pet.renderers.ORJSONRenderer',
+        *(['pet.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'pet.parsers.ORJSONParser',
+        *(['pet.parsers.MessagePackParser'] if find_spec('msgpack') else []),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Response compression (PetLink/middleware.py): zstd when the zstandard package
+# is installed, otherwise gzip; bodies under MIN_SIZE bytes are sent as is.
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+    'ENCODINGS': os.getenv("COMPRESSION_ENCODINGS", "zstd,gzip").split(","),
+    'LEVELS': {
+        'zstd': int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+        'gzip': int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    },
 }
 
+# Token -> user lookups cached per process (LRU with TTL). SHARED also uses the
+# Django cache (shared by the workers, see CACHES) so revocations reach every
+# worker immediately; without it entries live for LOCAL_TTL seconds only.
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': int(os.getenv("TOKEN_AUTH_CACHE_SIZE", "10000")),
+    'TTL': int(os.getenv("TOKEN_AUTH_CACHE_TTL", "300")),
+    'SHARED': os.getenv("TOKEN_AUTH_CACHE_SHARED", "True") == "True",
+    'LOCAL_TTL': int(os.getenv("TOKEN_AUTH_CACHE_LOCAL_TTL", "5")),
+}
+
+# Per-view SQL query budgets (see PetLink/query_budget.py).
+# In strict mode an exceeded budget raises instead of logging a warning.
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", str(DEBUG)) == "True"
+QUERY_COUNT_HEADER = os.getenv("QUERY_COUNT_HEADER", str(DEBUG)) == "True"
+
+TEST_RUNNER = 'PetLink.test_runner.QueryBudgetTestRunner'
+
 ROOT_URLCONF = 'PetLink.urls'
 
 TEMPLATES = [
@@ -77,6 +121,80 @@ DATABASES = {
     'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600)
 }
 
+# Read replicas, comma-separated URLs. GET requests to list views read from them
+# (see PetLink/db_router.py); in tests they mirror the default database.
+REPLICA_DATABASE_URLS = [url for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if url]
+for index, url in enumerate(REPLICA_DATABASE_URLS, start=1):
+    DATABASES[f'replica{index}'] = {**dj_database_url.parse(url, conn_max_age=600), 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['PetLink.db_router.ReplicaRouter']
+
+# Seconds a user keeps reading from the primary after a write, and how often
+# replica health is checked (while healthy / after a failure)
+READ_REPLICAS = {
+    'DATABASES': [f'replica{index}' for index in range(1, len(REPLICA_DATABASE_URLS) + 1)],
+    'PIN_SECONDS': int(os.getenv("REPLICA_PIN_SECONDS", "5")),
+    'HEALTH_CHECK_INTERVAL': int(os.getenv("REPLICA_HEALTH_CHECK_INTERVAL", "10")),
+    'RETRY_AFTER': int(os.getenv("REPLICA_RETRY_AFTER", "30")),
+}
+
+# Files in a local directory by default, shared by all gunicorn workers on the
+# host. With several hosts, or for atomic version bumps under heavy write load,
+# set CACHE_BACKEND/CACHE_LOCATION to Redis (django.core.cache.backends.redis.RedisCache,
+# redis://localhost:6379/0). A per-process cache (LocMemCache) only suits a single
+# worker: gunicorn refuses to start with more, and manage.py check --deploy reports it.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache")
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv("CACHE_LOCATION", os.path.join(tempfile.gettempdir(), "petlink-cache")),
+        # MAX_ENTRIES понимают только встроенные бэкенды, клиенту Redis его не передаём
+        **({'OPTIONS': {'MAX_ENTRIES': int(os.getenv("CACHE_MAX_ENTRIES", "20000"))}}
+           if CACHE_BACKEND.endswith('FileBasedCache') else {}),
+    }
+}
+
+# Seconds a serialized list response stays in the per-owner cache
+LIST_CACHE_TIMEOUT = int(os.getenv("LIST_CACHE_TIMEOUT", "300"))
+
+# Threads verifying password hashes for the async login view
+PASSWORD_HASHER_WORKERS = int(os.getenv("PASSWORD_HASHER_WORKERS", "4"))
+
+# Background jobs (pet/tasks.py) run in a per-process thread pool. Jobs lost by a
+# restarted worker are found from their rows and queued again when a worker
+# starts and by manage.py recover_jobs (see pet/recovery.py): exports still pending
+# after QUEUE_TIMEOUT seconds, or running for longer than RUN_TIMEOUT (at most
+# MAX_ATTEMPTS starts). Finished exports are deleted after EXPORT_RETENTION_DAYS.
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "2"))
+BACKGROUND_JOBS = {
+    'QUEUE_TIMEOUT': int(os.getenv("JOB_QUEUE_TIMEOUT", "300")),
+    'RUN_TIMEOUT': int(os.getenv("JOB_RUN_TIMEOUT", "1800")),
+    'MAX_ATTEMPTS': int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+    'EXPORT_RETENTION_DAYS': int(os.getenv("EXPORT_RETENTION_DAYS", "7")),
+}
+
+# Reminder scheduler (manage.py runreminders), all values in seconds. Reminders
+# missed while it was not running are still delivered if due within REPLAY.
+REMINDERS = {
+    'HORIZON': int(os.getenv("REMINDER_HORIZON", str(6 * 3600))),
+    'APPOINTMENT_LEAD': int(os.getenv("REMINDER_APPOINTMENT_LEAD", "3600")),
+    'REFRESH_INTERVAL': int(os.getenv("REMINDER_REFRESH_INTERVAL", "60")),
+    'REPLAY': int(os.getenv("REMINDER_REPLAY", str(24 * 3600))),
+}
+
+# Outgoing email (reminders), SMTP unless EMAIL_BACKEND says otherwise
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", "25"))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "False") == "True"
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "PetLink <noreply@petlink.local>")
+
+# Months of activity table partitions kept ahead of the current one (PostgreSQL,
+# created on migrate and by manage.py create_partitions)
+ACTIVITY_PARTITIONS_AHEAD = int(os.getenv("ACTIVITY_PARTITIONS_AHEAD", "3"))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -106,6 +224,11 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Protected file downloads: "nginx" (X-Accel-Redirect) or "apache" (X-Sendfile)
+# hands the transfer to the front server; unset streams through FileResponse.
+SENDFILE_BACKEND = os.getenv("SENDFILE_BACKEND") or None
+SENDFILE_URL = os.getenv("SENDFILE_URL", "/protected/")
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -0,0 +1,91 @@
+import gc
+import importlib
+import logging
+import time
+
+from django.contrib.auth.password_validation import get_default_password_validators
+from django.db import connections
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+# Модули, которые иначе импортируются только на первом запросе
+WARMUP_MODULES = (
+    'rest_framework.views',
+    'rest_framework.generics',
+    'rest_framework.serializers',
+    'rest_framework.renderers',
+    'rest_framework.parsers',
+    'rest_framework.negotiation',
+    'rest_framework.authtoken.models',
+    'django.contrib.admin.sites',
+    'django.contrib.admin.views.main',
+    'django.contrib.auth.hashers',
+)
+
+
+def import_modules(modules=WARMUP_MODULES):
+    for name in modules:
+        importlib.import_module(name)
+
+
+def load_urlconf():
+    """
+    Resolves the root URLconf, importing every view module and the admin
+    site registrations it references.
+    """
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict
+
+
+def load_password_validators():
+    """
+    Instantiates ``AUTH_PASSWORD_VALIDATORS``; ``CommonPasswordValidator``
+    reads and decompresses its 20k word list here, and the result is cached.
+    """
+    get_default_password_validators()
+
+
+def warm_up_app():
+    """
+    Performs the one-off work of a cold process before it accepts traffic.
+
+    Meant to run once in the gunicorn master with ``preload_app`` so forked
+    workers share the imported modules and loaded data copy-on-write.
+    Returns the time spent in seconds.
+    """
+    started = time.perf_counter()
+    import_modules()
+    load_urlconf()
+    load_password_validators()
+    elapsed = time.perf_counter() - started
+    logger.info('Application warmed up in %.3fs', elapsed)
+    return elapsed
+
+
+def freeze_heap():
+    """
+    Moves every object allocated so far into the permanent GC generation so
+    that collections in forked workers do not write to (and thereby copy)
+    the pages shared with the master.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def close_connections():
+    """
+    Closes database connections before forking; a socket shared between
+    processes would interleave their queries.
+    """
+    connections.close_all()
+
+
+def open_connections():
+    """
+    Connects every configured database so the first request of a worker does
+    not pay for the TCP and authentication handshake.
+    """
+    for alias in connections:
+        connections[alias].ensure_connection()
@@ -0,0 +1,69 @@
+"""
+Gunicorn configuration for PetLink.
+
+The application is loaded and warmed up once in the master (``preload_app``),
+then its heap is frozen so the forked workers share it copy-on-write. Each
+worker opens its own database connections and re-queues background jobs lost
+by the worker it replaces before taking requests, and finishes its own queued
+jobs when it exits. Several workers refuse to start on a per-process cache
+(see PetLink/checks.py).
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+preload_app = True
+
+# Перезапуск воркеров ограничивает рост памяти из-за фрагментации
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    from PetLink.checks import require_shared_cache
+
+    # Кеш в памяти процесса у каждого воркера свой: не стартуем с устаревающими списками
+    require_shared_cache(server.cfg.workers)
+
+
+def when_ready(server):
+    from PetLink.warmup import close_connections, freeze_heap, warm_up_app
+
+    elapsed = warm_up_app()
+    close_connections()
+    freeze_heap()
+    server.log.info("Application warmed up in %.3fs, heap frozen", elapsed)
+
+
+def post_fork(server, worker):
+    from PetLink.warmup import open_connections
+
+    try:
+        open_connections()
+    except Exception as exc:
+        # Django reconnects on the first request anyway
+        server.log.warning("Worker %s could not pre-open DB connections: %s", worker.pid, exc)
+
+    from pet.recovery import recover_lost_jobs
+
+    try:
+        recover_lost_jobs()
+    except Exception as exc:
+        # manage.py recover_jobs подберёт их позже
+        server.log.warning("Worker %s could not recover lost background jobs: %s", worker.pid, exc)
+
+
+def worker_exit(server, worker):
+    from pet.tasks import shutdown
+
+    # Перезапуск по max_requests: дожидаемся заданий из очереди этого воркера
+    shutdown(wait=True)
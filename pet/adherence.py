@@ -0,0 +1,172 @@
+from datetime import timedelta
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import Least
+
+from .models import Medication, MedicationDose, Pet
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def course_schedule(days):
+    """
+    Expands the logged days of one course into its full daily schedule.
+
+    ``days`` are ``(date, taken, frequency)`` tuples sorted by date, one per
+    day with logged doses. Yields ``(date, expected, taken)`` for every day
+    from the first to the last logged one; days without logs keep the
+    frequency of the previous logged day and count as missed.
+    """
+    previous = None
+    for day, taken, frequency in days:
+        if previous is not None:
+            gap_day, gap_frequency = previous[0] + timedelta(days=1), previous[1]
+            while gap_day < day:
+                yield gap_day, gap_frequency, 0
+                gap_day += timedelta(days=1)
+        frequency = max(frequency or 1, 1)
+        yield day, frequency, taken
+        previous = day, frequency
+
+
+def logged_days(queryset):
+    """
+    Aggregates medication records into ``(pet_id, medication_name, date, taken,
+    frequency)`` rows, one per course and day, in a single grouped query.
+    """
+    return (
+        queryset
+        .values_list('pet_id', 'medication_name', 'date')
+        .annotate(taken=Count('id'), frequency=Max('frequency'))
+        .order_by('pet_id', 'medication_name', 'date')
+    )
+
+
+def refresh_course(pet_id, medication_name, dates=None):
+    """
+    Recomputes the schedule of one course from its medication log, around
+    the days in ``dates`` whose records changed, or entirely.
+
+    A logged day only determines its own row and those of the unlogged days
+    up to the next logged one, so only the days from the logged day before
+    the earliest changed date to the one after the latest are recomputed
+    (up to the course bounds when there is none). The log is aggregated per
+    day in SQL, the gaps are filled in and the rows are written with one
+    upsert; rows of the range left outside the course are deleted.
+
+    The pet row is locked first, so concurrent refreshes of a course run one
+    after the other instead of interleaving their deletes and upserts, and
+    each one reads the log as committed by the previous. Returns the number
+    of rows written.
+    """
+    medications = Medication.objects.filter(pet_id=pet_id, medication_name=medication_name)
+    existing = MedicationDose.objects.filter(pet_id=pet_id, medication_name=medication_name)
+
+    with transaction.atomic():
+        if Pet.objects.select_for_update().filter(pk=pet_id).values_list('pk').first() is None:
+            return 0
+        start = end = None
+        if dates:
+            start = medications.filter(date__lt=min(dates)).aggregate(day=Max('date'))['day']
+            end = medications.filter(date__gt=max(dates)).aggregate(day=Min('date'))['day']
+        if start is not None:
+            medications, existing = medications.filter(date__gte=start), existing.filter(date__gte=start)
+        if end is not None:
+            medications, existing = medications.filter(date__lte=end), existing.filter(date__lte=end)
+
+        doses = [
+            MedicationDose(pet_id=pet_id, medication_name=medication_name, date=day, expected=expected, taken=taken)
+            for day, expected, taken in course_schedule(row[2:] for row in logged_days(medications))
+        ]
+        if doses:
+            # Курс непрерывен: всё между первой и последней датой перезаписывается
+            existing = existing.exclude(date__range=(doses[0].date, doses[-1].date))
+        existing.delete()
+        MedicationDose.objects.bulk_create(
+            doses,
+            batch_size=REBUILD_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['pet', 'medication_name', 'date'],
+            update_fields=['expected', 'taken'],
+        )
+    return len(doses)
+
+
+def refresh_courses(changes):
+    """
+    Refreshes the schedules touched by ``changes``, ``(pet_id,
+    medication_name, date)`` tuples of changed records (one refresh per
+    course, around all of its changed days).
+    """
+    dates_by_course = {}
+    for pet_id, medication_name, day in changes:
+        dates_by_course.setdefault((pet_id, medication_name), set()).add(day)
+    for (pet_id, medication_name), dates in dates_by_course.items():
+        refresh_course(pet_id, medication_name, dates)
+
+
+def rebuild_dose_schedule(pet_ids=None):
+    """
+    Rebuilds the schedule of every course (or of the given pets) from the
+    medication log, streaming one grouped query. Returns the number of rows.
+    """
+    medications = Medication.objects.all()
+    doses = MedicationDose.objects.all()
+    if pet_ids is not None:
+        medications = medications.filter(pet_id__in=pet_ids)
+        doses = doses.filter(pet_id__in=pet_ids)
+
+    created, batch = 0, []
+    with transaction.atomic():
+        doses.delete()
+        for (pet_id, medication_name), days in groupby(logged_days(medications).iterator(), key=lambda row: row[:2]):
+            for day, expected, taken in course_schedule(row[2:] for row in days):
+                batch.append(MedicationDose(
+                    pet_id=pet_id, medication_name=medication_name, date=day, expected=expected, taken=taken,
+                ))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                MedicationDose.objects.bulk_create(batch)
+                created, batch = created + len(batch), []
+        MedicationDose.objects.bulk_create(batch)
+    return created + len(batch)
+
+
+def adherence_report(pet, start, end, medication_name=None):
+    """
+    Compares expected and taken doses of a pet between ``start`` and ``end``
+    (inclusive), per medication and per day.
+
+    Both the totals and the daily rows are computed by the database; extra
+    doses on one day do not make up for missed doses on another.
+    """
+    doses = MedicationDose.objects.filter(pet=pet, date__gte=start, date__lte=end)
+    if medication_name:
+        doses = doses.filter(medication_name=medication_name)
+
+    totals = (
+        doses.values('medication_name')
+        .annotate(
+            total_expected=Sum('expected'),
+            total_taken=Sum('taken'),
+            on_schedule=Sum(Least('taken', 'expected')),
+        )
+        .order_by('medication_name')
+    )
+    daily = doses.values_list('medication_name', 'date', 'expected', 'taken').order_by('medication_name', 'date')
+    days_by_name = {
+        name: [{'date': day, 'expected': expected, 'taken': taken} for _, day, expected, taken in rows]
+        for name, rows in groupby(daily, key=lambda row: row[0])
+    }
+
+    return [
+        {
+            'medication_name': row['medication_name'],
+            'expected': row['total_expected'],
+            'taken': row['total_taken'],
+            'adherence': round(row['on_schedule'] / row['total_expected'], 4) if row['total_expected'] else None,
+            'days': days_by_name.get(row['medication_name'], []),
+        }
+        for row in totals
+    ]
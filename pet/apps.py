@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PetConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pet'
+
+    def ready(self):
+        from PetLink import checks  # noqa: F401
+        from . import signals  # noqa: F401
@@ -0,0 +1,156 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import NotFound
+
+from user.authentication import aauthenticate_token
+from .models import Pet
+from .pagination import ActivityCursorPagination
+from .renderers import ORJSONRenderer
+from .serializers import FeedingSerializer, MedicationSerializer, PetSerializer, WalkSerializer
+
+
+class AsyncRequest:
+    """
+    Minimal request wrapper exposing what serializers and paginators read
+    (``user``, ``query_params``, ``build_absolute_uri``) from a Django request.
+    """
+
+    def __init__(self, request, user):
+        self._request = request
+        self.user = user
+        self.query_params = request.GET
+
+    def __getattr__(self, name):
+        return getattr(self._request, name)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAPIView(View):
+    """
+    Base class for async-native JSON API views.
+
+    Requests are authenticated with the ``Authorization: Token <key>`` header
+    only (session authentication would require CSRF checks). Under ASGI these
+    views run on the event loop, so a request waiting on the database does not
+    hold a worker thread.
+    """
+    http_method_names = ['get', 'post', 'options']
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await aauthenticate_token(request)
+        if user is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+        # Как DRF: пользователь токена виден middleware (ReplicaPinMiddleware)
+        request.user = user
+        self.api_request = AsyncRequest(request, user)
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_serializer_context(self):
+        return {'request': self.api_request, 'view': self}
+
+    def json_response(self, data, status=200):
+        return HttpResponse(ORJSONRenderer().render(data), status=status, content_type='application/json')
+
+    async def create_from_body(self, request, **save_kwargs):
+        """
+        Validates the JSON body with the serializer and inserts the row with
+        ``acreate``. Validation runs in a thread since serializers are sync.
+        """
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError as exc:
+            return self.json_response({'detail': f'JSON parse error - {exc}'}, status=400)
+
+        serializer = self.serializer_class(data=data, context=self.get_serializer_context())
+        if not await sync_to_async(serializer.is_valid)():
+            return self.json_response(serializer.errors, status=400)
+
+        model = self.serializer_class.Meta.model
+        obj = await model.objects.acreate(**serializer.validated_data, **save_kwargs)
+        return self.json_response(self.serializer_class(obj, context=self.get_serializer_context()).data, status=201)
+
+
+class AsyncPetListView(AsyncAPIView):
+    """
+    Async variant of :class:`pet.views.PetCreateView` for the current user's pets.
+
+    Accepts JSON bodies only; photos are uploaded through the sync view.
+    """
+    serializer_class = PetSerializer
+    max_pets = 5
+
+    async def get(self, request, *args, **kwargs):
+        queryset = Pet.objects.select_related('owner').with_age().filter(owner=self.api_request.user)
+        context = self.get_serializer_context()
+        data = [self.serializer_class(pet, context=context).data async for pet in queryset.aiterator()]
+        return self.json_response(data)
+
+    async def post(self, request, *args, **kwargs):
+        if await Pet.objects.filter(owner=self.api_request.user).acount() >= self.max_pets:
+            return self.json_response(
+                {'error': 'You can not create more than 5 pets profiles.'}, status=403
+            )
+        return await self.create_from_body(request, owner=self.api_request.user)
+
+
+class AsyncActivityListView(AsyncAPIView):
+    """
+    Async variant of :class:`pet.views.BaseActivityView`.
+
+    Lists are paginated with the same keyset cursor and accept the same
+    ``?pet=``, ``?from=`` and ``?to=`` filters as the sync views; POST
+    creates a single record (bulk bodies are only accepted by the sync views).
+    """
+    pagination_class = ActivityCursorPagination
+
+    async def get(self, request, *args, **kwargs):
+        model = self.serializer_class.Meta.model
+        queryset = model.objects.filter(pet__owner=self.api_request.user)
+        pet_id = request.GET.get('pet')
+        if pet_id is not None:
+            if not pet_id.isdigit():
+                return self.json_response({'pet': 'A valid integer is required.'}, status=400)
+            queryset = queryset.filter(pet_id=int(pet_id))
+        for param, lookup in (('from', 'date__gte'), ('to', 'date__lte')):
+            if param not in request.GET:
+                continue
+            try:
+                day = parse_date(request.GET[param])
+            except ValueError:
+                day = None
+            if day is None:
+                return self.json_response({param: 'Date must be in YYYY-MM-DD format.'}, status=400)
+            queryset = queryset.filter(**{lookup: day})
+
+        paginator = self.pagination_class()
+        try:
+            page = await paginator.apaginate_queryset(queryset, self.api_request, view=self)
+        except NotFound as exc:
+            return self.json_response({'detail': str(exc.detail)}, status=404)
+        serializer = self.serializer_class(page, many=True, context=self.get_serializer_context())
+        return self.json_response({
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': serializer.data,
+        })
+
+    async def post(self, request, *args, **kwargs):
+        return await self.create_from_body(request)
+
+
+class AsyncMedicationView(AsyncActivityListView):
+    serializer_class = MedicationSerializer
+
+
+class AsyncFeedingView(AsyncActivityListView):
+    serializer_class = FeedingSerializer
+
+
+class AsyncWalkView(AsyncActivityListView):
+    serializer_class = WalkSerializer
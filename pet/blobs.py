@@ -0,0 +1,91 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Pet, PetDocument, StoredBlob
+from .storage import get_blob_storage
+
+
+def retain_blob(name):
+    """
+    Records one more row referencing the stored file ``name``.
+    """
+    if not name:
+        return
+    if StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1):
+        return
+    try:
+        with transaction.atomic():
+            StoredBlob.objects.create(name=name, ref_count=1)
+    except IntegrityError:
+        StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+
+def release_blob(name):
+    """
+    Drops one reference to ``name``. Once nothing references the file, it is
+    deleted after the transaction commits, so a rollback never leaves a row
+    pointing at a missing file.
+    """
+    if not name:
+        return
+    StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') - 1)
+    if StoredBlob.objects.filter(name=name, ref_count__lte=0).exists():
+        transaction.on_commit(lambda: _delete_unreferenced(name))
+
+
+def _delete_unreferenced(name):
+    """
+    Deletes the file ``name`` and its ``StoredBlob`` row if nothing
+    references it.
+
+    Runs with the row locked. :meth:`pet.storage.ContentAddressedStorage._save`
+    takes the same lock before reusing an existing file and keeps it until
+    the new reference is recorded, so a file is never deleted right after it
+    was reused.
+    """
+    with transaction.atomic():
+        blob = StoredBlob.objects.select_for_update().filter(name=name, ref_count__lte=0).first()
+        if blob is None:
+            return
+        get_blob_storage().delete(name)
+        blob.delete()
+
+
+def count_references():
+    """
+    Returns ``{name: number of references}`` for every stored file referenced
+    by a pet photo, photo variant or document.
+    """
+    # Ленивый импорт: pet.images сам импортирует этот модуль
+    from .images import iter_variant_paths
+
+    references = Counter()
+    references.update(Pet.objects.exclude(photo='').values_list('photo', flat=True).iterator())
+    references.update(PetDocument.objects.exclude(file='').values_list('file', flat=True).iterator())
+    for photo_variants in Pet.objects.exclude(photo_variants={}).values_list('photo_variants', flat=True).iterator():
+        references.update(iter_variant_paths(photo_variants))
+    return references
+
+
+def recount_blobs():
+    """
+    Rebuilds every ``StoredBlob`` from the references that actually exist and
+    schedules unreferenced files for deletion. Meant for maintenance (see
+    ``manage.py migrate_legacy_files``), not for a database taking writes.
+    Returns the reference counts.
+    """
+    references = count_references()
+    with transaction.atomic():
+        stored = dict(StoredBlob.objects.select_for_update().values_list('name', 'ref_count'))
+        StoredBlob.objects.bulk_create(
+            [StoredBlob(name=name, ref_count=count) for name, count in references.items() if name not in stored],
+            batch_size=500,
+        )
+        for name, ref_count in stored.items():
+            if references[name] != ref_count:
+                StoredBlob.objects.filter(name=name).update(ref_count=references[name])
+            if not references[name]:
+                transaction.on_commit(lambda name=name: _delete_unreferenced(name))
+    return references
@@ -0,0 +1,91 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = 'petlink'
+HITS_KEY = f'{KEY_PREFIX}:list-cache:hits'
+MISSES_KEY = f'{KEY_PREFIX}:list-cache:misses'
+
+
+def get_timeout():
+    return getattr(settings, 'LIST_CACHE_TIMEOUT', 300)
+
+
+def get_version_key(owner_id):
+    return f'{KEY_PREFIX}:owner:{owner_id}:version'
+
+
+def get_owner_version(owner_id):
+    """
+    Returns the current cache version of an owner's data.
+
+    Every cached list embeds this version in its key, so bumping it makes all
+    of the owner's cached lists unreachable at once; stale entries simply
+    expire.
+    """
+    return cache.get_or_set(get_version_key(owner_id), time.time_ns, timeout=None)
+
+
+def bump_owner_version(owner_id):
+    if owner_id is None:
+        return
+    try:
+        cache.incr(get_version_key(owner_id))
+    except ValueError:
+        # Ключ вытеснен: новая версия не должна совпасть ни с одной старой
+        cache.set(get_version_key(owner_id), time.time_ns(), timeout=None)
+
+
+def get_deleted_key(owner_id):
+    return f'{KEY_PREFIX}:owner:{owner_id}:deleted_at'
+
+
+def record_owner_deletion(owner_id):
+    """
+    Remembers when one of the owner's rows was last deleted. Deleted rows
+    leave no ``updated_at`` behind, so ``Last-Modified`` takes this into
+    account, see :class:`pet.mixins.ConditionalListMixin`.
+    """
+    if owner_id is not None:
+        cache.set(get_deleted_key(owner_id), time.time(), timeout=None)
+
+
+def get_owner_deleted_at(owner_id):
+    return cache.get(get_deleted_key(owner_id))
+
+
+def get_list_cache_key(request, view_name):
+    owner_id = request.user.pk
+    query = hashlib.md5(
+        f'{request.get_host()}{request.get_full_path()}{request.headers.get("Accept", "")}'.encode()
+    ).hexdigest()
+    return f'{KEY_PREFIX}:list:{owner_id}:{get_owner_version(owner_id)}:{view_name}:{query}'
+
+
+def _increment(key):
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def record_hit():
+    _increment(HITS_KEY)
+
+
+def record_miss():
+    _increment(MISSES_KEY)
+
+
+def get_cache_stats():
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counters.get(HITS_KEY, 0), counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
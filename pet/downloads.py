@@ -0,0 +1,166 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import content_disposition_header, parse_etags, quote_etag
+
+DIGEST_RE = re.compile(r'[0-9a-f]{64}')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """
+    Read-only view of ``length`` bytes of an open file starting at ``start``.
+
+    It keeps ``fileno()`` so WSGI servers can still use ``os.sendfile`` for the
+    partial body (they bound the transfer by ``Content-Length``), while plain
+    iteration never reads past the end of the range.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        self.file.seek(start)
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def get_file_etag(fieldfile):
+    """
+    Returns the ETag of a stored file.
+
+    Files in the content-addressed storage are named after the SHA-256 of
+    their content, which makes a strong validator for free. Other files get a
+    weak validator derived from size and modification time.
+    """
+    stem = os.path.splitext(os.path.basename(fieldfile.name))[0]
+    if DIGEST_RE.fullmatch(stem):
+        return quote_etag(stem)
+    modified = fieldfile.storage.get_modified_time(fieldfile.name)
+    return 'W/' + quote_etag(f'{fieldfile.size:x}-{int(modified.timestamp()):x}')
+
+
+def etag_matches(header, etag, weak=True):
+    if not header:
+        return False
+    etags = parse_etags(header)
+    if '*' in etags:
+        return True
+    if weak:
+        return etag.removeprefix('W/') in [tag.removeprefix('W/') for tag in etags]
+    return not etag.startswith('W/') and etag in etags
+
+
+def parse_range(header, size):
+    """
+    Parses a single-range ``Range`` header into ``(start, length)``.
+
+    Returns ``None`` when the whole file should be sent (no header, or a form
+    that is not supported, such as multiple ranges) and raises ``ValueError``
+    for a range that cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+
+    first, last = match.groups()
+    if first == '':
+        length = min(int(last), size)
+        if length == 0:
+            raise ValueError(header)
+        return size - length, length
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, end - start + 1
+
+
+def offload_response(fieldfile, backend):
+    """
+    Lets the front server transfer the file (X-Accel-Redirect / X-Sendfile).
+
+    The front server then also takes care of ``Range`` requests.
+    """
+    response = HttpResponse()
+    if backend == 'nginx':
+        prefix = getattr(settings, 'SENDFILE_URL', '/protected/').rstrip('/')
+        response['X-Accel-Redirect'] = f'{prefix}/{quote(fieldfile.name)}'
+    else:
+        response['X-Sendfile'] = fieldfile.path
+    # Тип и длину выставит фронт-сервер
+    del response['Content-Type']
+    return response
+
+
+def serve_file(request, fieldfile, filename=None, as_attachment=True):
+    """
+    Returns a response transferring ``fieldfile`` efficiently.
+
+    Supports ``If-None-Match`` (``304 Not Modified``), single byte ranges
+    (``206 Partial Content``, guarded by ``If-Range``) and, when
+    ``SENDFILE_BACKEND`` is set to ``"nginx"`` or ``"apache"``, hands the
+    transfer to the front server so no Python worker is occupied by it.
+    Otherwise the file is streamed with ``FileResponse``, which WSGI servers
+    such as gunicorn send with ``os.sendfile``.
+    """
+    etag = get_file_etag(fieldfile)
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    filename = filename or os.path.basename(fieldfile.name)
+    backend = getattr(settings, 'SENDFILE_BACKEND', None)
+    if backend:
+        response = offload_response(fieldfile, backend)
+        disposition = content_disposition_header(as_attachment, filename)
+        if disposition:
+            response['Content-Disposition'] = disposition
+        response['ETag'] = etag
+        return response
+
+    size = fieldfile.size
+    if_range = request.headers.get('If-Range')
+    try:
+        byte_range = None
+        if not if_range or etag_matches(if_range, etag, weak=False):
+            byte_range = parse_range(request.headers.get('Range'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = fieldfile.storage.open(fieldfile.name, 'rb')
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    if byte_range is None:
+        response = FileResponse(file, as_attachment=as_attachment, filename=filename,
+                                content_type=content_type)
+    else:
+        start, length = byte_range
+        response = FileResponse(RangeFile(file, start, length), as_attachment=as_attachment,
+                                filename=filename, content_type=content_type, status=206)
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{start + length - 1}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,184 @@
+import csv
+import gzip
+import json
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Appointment, Feeding, Medication, PetDocument, PetExport, Walk
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (type, model, ordering, column mapping for the common CSV columns, extra fields)
+EXPORT_SOURCES = (
+    ('medication', Medication, ('date', 'time', 'id'),
+     {'date': 'date', 'time': 'time', 'title': 'medication_name', 'notes': 'notes'},
+     ('dosage', 'frequency', 'created_at', 'updated_at')),
+    ('feeding', Feeding, ('date', 'time', 'id'),
+     {'date': 'date', 'time': 'time', 'title': 'food_type', 'notes': 'notes'},
+     ('amount', 'created_at', 'updated_at')),
+    ('walk', Walk, ('date', 'time', 'id'),
+     {'date': 'date', 'time': 'time', 'notes': 'notes'},
+     ('created_at', 'updated_at')),
+    ('appointment', Appointment, ('appointment_date', 'appointment_time', 'id'),
+     {'date': 'appointment_date', 'time': 'appointment_time', 'title': 'name', 'notes': 'description'},
+     ()),
+    ('document', PetDocument, ('uploaded_at', 'id'),
+     {'date': 'uploaded_at', 'title': 'title'},
+     ('document_type', 'file')),
+)
+
+CSV_COLUMNS = ('type', 'id', 'date', 'time', 'title', 'notes', 'details')
+
+
+def iter_pet_history(pet_id, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields ``(type, columns, extra)`` for every record of a pet.
+
+    Rows are streamed from the database with ``.values().iterator()``, so no
+    model instances are built and memory stays flat regardless of history size.
+    """
+    for kind, model, ordering, columns, extra in EXPORT_SOURCES:
+        fields = ('id', *columns.values(), *extra)
+        queryset = model.objects.filter(pet_id=pet_id).order_by(*ordering).values(*fields)
+        for row in queryset.iterator(chunk_size=chunk_size):
+            common = {'id': row['id']}
+            common.update({column: row[field] for column, field in columns.items()})
+            yield kind, common, {field: row[field] for field in extra}
+
+
+class NDJSONExportWriter:
+    """
+    Writes one JSON object per line.
+    """
+
+    def __init__(self, handle):
+        self.handle = handle
+
+    def write(self, kind, common, extra):
+        record = {'type': kind, **common, **extra}
+        self.handle.write(json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False))
+        self.handle.write('\n')
+
+
+class CSVExportWriter:
+    """
+    Writes a fixed set of columns; source-specific fields go to ``details`` as JSON.
+    """
+
+    def __init__(self, handle):
+        self.writer = csv.writer(handle)
+        self.writer.writerow(CSV_COLUMNS)
+
+    def write(self, kind, common, extra):
+        self.writer.writerow([
+            kind,
+            common['id'],
+            common.get('date', ''),
+            common.get('time', ''),
+            common.get('title', ''),
+            common.get('notes', ''),
+            json.dumps(extra, cls=DjangoJSONEncoder, ensure_ascii=False) if extra else '',
+        ])
+
+
+EXPORT_WRITERS = {
+    PetExport.FORMAT_NDJSON: NDJSONExportWriter,
+    PetExport.FORMAT_CSV: CSVExportWriter,
+}
+
+
+def run_export(export_id):
+    """
+    Produces the file of a :class:`pet.models.PetExport` and records the outcome.
+
+    The export is claimed by moving it from pending to running in a single
+    UPDATE, so an export queued twice (see :func:`recover_exports`) is only
+    produced once. The file is written to a temporary name next to its final
+    location and moved into place only once complete, so a half-written
+    export can never be downloaded.
+    """
+    claimed = PetExport.objects.filter(pk=export_id, status=PetExport.STATUS_PENDING).update(
+        status=PetExport.STATUS_RUNNING, started_at=timezone.now(), attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        return
+    export = PetExport.objects.get(pk=export_id)
+    # Попытка, которую мог пережить зависший предыдущий запуск: итог пишет только своя
+    current = PetExport.objects.filter(pk=export_id, status=PetExport.STATUS_RUNNING, attempts=export.attempts)
+
+    name = f'pet_exports/pet_{export.pet_id}_export_{export.pk}.{export.format}.gz'
+    path = default_storage.path(name)
+    temp_path = f'{path}.{uuid.uuid4().hex}.part'
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    try:
+        row_count = 0
+        with gzip.open(temp_path, 'wt', encoding='utf-8', newline='') as handle:
+            writer = EXPORT_WRITERS[export.format](handle)
+            for kind, common, extra in iter_pet_history(export.pet_id):
+                writer.write(kind, common, extra)
+                row_count += 1
+        os.replace(temp_path, path)
+    except Exception as exc:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        current.update(status=PetExport.STATUS_FAILED, error=str(exc), finished_at=timezone.now())
+        raise
+
+    current.update(status=PetExport.STATUS_DONE, file=name, row_count=row_count, finished_at=timezone.now())
+
+
+def recover_exports(now=None):
+    """
+    Finds exports whose job was lost, e.g. because the worker process running
+    or queueing it was restarted, and returns the ids to run again.
+
+    An export still pending ``QUEUE_TIMEOUT`` seconds after it was requested
+    is returned as is; one running for longer than ``RUN_TIMEOUT`` is moved
+    back to pending, or marked failed once it has been started
+    ``MAX_ATTEMPTS`` times (see ``BACKGROUND_JOBS``). Running an export that
+    is in fact still queued somewhere is harmless, :func:`run_export` claims
+    it only once.
+    """
+    options = settings.BACKGROUND_JOBS
+    now = now or timezone.now()
+    interrupted = PetExport.objects.filter(
+        status=PetExport.STATUS_RUNNING,
+        started_at__lt=now - timedelta(seconds=options['RUN_TIMEOUT']),
+    )
+    interrupted.filter(attempts__gte=options['MAX_ATTEMPTS']).update(
+        status=PetExport.STATUS_FAILED, error='The export was interrupted too many times.', finished_at=now,
+    )
+    interrupted.update(status=PetExport.STATUS_PENDING)
+
+    return list(
+        PetExport.objects.filter(
+            status=PetExport.STATUS_PENDING,
+            created_at__lt=now - timedelta(seconds=options['QUEUE_TIMEOUT']),
+        ).values_list('pk', flat=True)
+    )
+
+
+def purge_expired_exports(now=None):
+    """
+    Deletes finished and failed exports older than
+    ``BACKGROUND_JOBS['EXPORT_RETENTION_DAYS']``; their files are removed by
+    the ``post_delete`` handler. Returns the number of exports deleted.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=settings.BACKGROUND_JOBS['EXPORT_RETENTION_DAYS'])
+    expired = PetExport.objects.filter(
+        status__in=[PetExport.STATUS_DONE, PetExport.STATUS_FAILED], finished_at__lt=cutoff,
+    )
+    deleted = 0
+    # По одному, чтобы post_delete удалил файл каждой выгрузки
+    for export in expired.iterator():
+        export.delete()
+        deleted += 1
+    return deleted
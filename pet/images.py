@@ -0,0 +1,206 @@
+import io
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.fields.json import KT
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .blobs import release_blob, retain_blob
+from .cache import bump_owner_version
+from .models import Pet
+
+# name: (size in pixels, crop to a square)
+PHOTO_VARIANTS = {
+    'thumb': (128, True),
+    'small': (320, False),
+    'medium': (640, False),
+}
+
+# format name: (file extension, Pillow save options)
+PHOTO_FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def render_variant(image, size, crop):
+    """
+    Returns a resized copy of ``image`` fitting in ``size`` x ``size`` pixels.
+    """
+    if crop:
+        return ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    variant = image.copy()
+    variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+    return variant
+
+
+def generate_photo_variants(pet_id):
+    """
+    Generates the resized WebP/JPEG variants of a pet's photo.
+
+    The photo is rotated according to its EXIF orientation and re-encoded
+    without any metadata, so variants never carry EXIF (GPS position, camera
+    details). The result is stored in ``Pet.photo_variants`` only if the photo
+    has not been replaced in the meantime; variants of a previous photo are
+    released (and deleted once no other pet shares them).
+
+    The job is claimed by stamping ``photo_job_started_at`` and bumping
+    ``photo_job_attempts`` in a single UPDATE, like :func:`pet.exports.run_export`,
+    so a job queued by several workers (see :mod:`pet.recovery`) runs once,
+    and a photo that keeps failing is given up after
+    ``BACKGROUND_JOBS['MAX_ATTEMPTS']`` attempts. The result is written with
+    the pet row locked and the variants being replaced are read under that
+    lock, so a job that does run twice for the same photo is still harmless.
+    """
+    pet = Pet.objects.filter(pk=pet_id).only('owner_id', 'photo', 'photo_variants').first()
+    if pet is None:
+        return
+
+    if not pet.photo:
+        if pet.photo_variants:
+            with transaction.atomic():
+                previous = lock_photo_variants(pet_id, '')
+                if previous is not None:
+                    Pet.objects.filter(pk=pet_id).update(photo_variants={}, updated_at=timezone.now())
+                    release_photo_variants(previous)
+                    bump_owner_version(pet.owner_id)
+        return
+
+    source = pet.photo.name
+    if not claim_photo_job(pet_id, source):
+        return
+    try:
+        store_photo_variants(pet, source)
+    except Exception:
+        # Попытка засчитана; recover_photo_variants повторит задачу до MAX_ATTEMPTS раз
+        Pet.objects.filter(pk=pet_id, photo=source).update(photo_job_started_at=None)
+        raise
+
+
+def store_photo_variants(pet, source):
+    """
+    Encodes and stores the variants of ``source`` and records them on the pet
+    if its photo is still ``source``.
+    """
+    encoded = encode_photo_variants(pet.photo)
+    storage = pet.photo.storage
+    with transaction.atomic():
+        # Файлы сохраняются в той же транзакции, где учитываются ссылки на них (pet.blobs)
+        variants = {
+            name: {
+                format_name: storage.save(path, ContentFile(content))
+                for format_name, (path, content) in formats.items()
+            }
+            for name, formats in encoded.items()
+        }
+        result = {'source': source, 'variants': variants}
+        previous = lock_photo_variants(pet.pk, source)
+        if previous is not None:
+            Pet.objects.filter(pk=pet.pk).update(
+                photo_variants=result, photo_job_attempts=0, photo_job_started_at=None, updated_at=timezone.now(),
+            )
+            retain_photo_variants(result)
+            release_photo_variants(previous)
+            bump_owner_version(pet.owner_id)
+        else:
+            # Фото успели заменить: новые варианты никому не нужны
+            retain_photo_variants(result)
+            release_photo_variants(result)
+
+
+def claim_photo_job(pet_id, source, now=None):
+    """
+    Marks the variants job of ``source`` as started, unless another worker
+    started it less than ``BACKGROUND_JOBS['RUN_TIMEOUT']`` seconds ago or it
+    has already been attempted ``MAX_ATTEMPTS`` times. Returns whether the
+    job was claimed.
+    """
+    options = settings.BACKGROUND_JOBS
+    now = now or timezone.now()
+    return bool(
+        Pet.objects.filter(pk=pet_id, photo=source, photo_job_attempts__lt=options['MAX_ATTEMPTS'])
+        .filter(Q(photo_job_started_at__isnull=True)
+                | Q(photo_job_started_at__lt=now - timedelta(seconds=options['RUN_TIMEOUT'])))
+        .update(photo_job_started_at=now, photo_job_attempts=F('photo_job_attempts') + 1)
+    )
+
+
+def encode_photo_variants(photo):
+    """
+    Returns ``{variant: {format: (path, bytes)}}`` for every variant of
+    ``photo``.
+    """
+    stem = os.path.splitext(os.path.basename(photo.name))[0]
+    with photo.open('rb') as handle:
+        image = ImageOps.exif_transpose(Image.open(handle))
+        image = image.convert('RGB')
+
+    encoded = {}
+    for name, (size, crop) in PHOTO_VARIANTS.items():
+        resized = render_variant(image, size, crop)
+        encoded[name] = {}
+        for format_name, (extension, options) in PHOTO_FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, **options)
+            encoded[name][format_name] = (f'pets_photo/variants/{stem}_{name}.{extension}', buffer.getvalue())
+    return encoded
+
+
+def lock_photo_variants(pet_id, photo):
+    """
+    Locks the pet row and returns its current variants, or ``None`` when the
+    pet is gone or its photo is no longer ``photo``. Must run in a transaction.
+    """
+    row = Pet.objects.select_for_update().filter(pk=pet_id).values('photo', 'photo_variants').first()
+    if row is None or row['photo'] != photo:
+        return None
+    return row['photo_variants'] or {}
+
+
+def pets_without_current_variants():
+    """
+    Returns pets with a photo whose variants are missing or were made from
+    another photo.
+    """
+    return Pet.objects.exclude(photo='').annotate(variants_source=KT('photo_variants__source')).filter(
+        Q(variants_source__isnull=True) | ~Q(variants_source=F('photo'))
+    )
+
+
+def recover_photo_variants(now=None):
+    """
+    Returns the ids of pets whose variants job was lost or failed: the photo
+    changed more than ``BACKGROUND_JOBS['QUEUE_TIMEOUT']`` seconds ago, the
+    variants still do not match it, no job has been running for less than
+    ``RUN_TIMEOUT`` seconds and fewer than ``MAX_ATTEMPTS`` were started.
+    """
+    options = settings.BACKGROUND_JOBS
+    now = now or timezone.now()
+    return list(
+        pets_without_current_variants()
+        .filter(updated_at__lt=now - timedelta(seconds=options['QUEUE_TIMEOUT']),
+                photo_job_attempts__lt=options['MAX_ATTEMPTS'])
+        .filter(Q(photo_job_started_at__isnull=True)
+                | Q(photo_job_started_at__lt=now - timedelta(seconds=options['RUN_TIMEOUT'])))
+        .values_list('pk', flat=True)
+    )
+
+
+def iter_variant_paths(photo_variants):
+    for formats in (photo_variants or {}).get('variants', {}).values():
+        yield from formats.values()
+
+
+def retain_photo_variants(photo_variants):
+    for path in iter_variant_paths(photo_variants):
+        retain_blob(path)
+
+
+def release_photo_variants(photo_variants):
+    for path in iter_variant_paths(photo_variants):
+        release_blob(path)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from pet.rollups import backfill_rollups
+
+
+class Command(BaseCommand):
+    help = "Recomputes the daily activity rollups from the medication, feeding and walk tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pet', type=int, action='append', dest='pets',
+                            help="Only recompute the rollups of this pet (repeatable).")
+
+    def handle(self, *args, **options):
+        written = backfill_rollups(options['pets'])
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {written} daily rollups."))
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from datetime import date, time as dtime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+from pet.models import Feeding, Pet
+from user.models import CustomUser
+
+ENDPOINTS = (
+    ('pets', '/pets/pet-create/', '/pets/async/pets/'),
+    ('feedings', '/pets/feedings/?page_size=50', '/pets/async/feedings/?page_size=50'),
+)
+
+
+class Command(BaseCommand):
+    help = ("Compares throughput of the sync and async pet/activity endpoints by "
+            "driving concurrent in-process requests against throwaway data.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint.")
+        parser.add_argument('--concurrency', type=int, default=20, help="Requests in flight at once.")
+        parser.add_argument('--rows', type=int, default=500, help="Feedings created for the benchmark pet.")
+
+    def handle(self, *args, **options):
+        user, token = self.create_data(options['rows'])
+        try:
+            # Запросы идут в процессе, через тестовый клиент с хостом testserver
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                results = asyncio.run(self.run_all(token.key, options['requests'], options['concurrency']))
+        finally:
+            user.delete()
+
+        for name, variant, elapsed, failures in results:
+            rate = options['requests'] / elapsed if elapsed else 0
+            line = f"{name:<10} {variant:<5} {rate:9.1f} req/s  ({elapsed:.2f}s"
+            line += f", {failures} failed)" if failures else ")"
+            self.stdout.write(line)
+
+    def create_data(self, rows):
+        user = CustomUser.objects.create_user(
+            email=f'bench-{time.time_ns()}@example.invalid', password=None, first_name='Bench'
+        )
+        token = Token.objects.create(user=user)
+        pet = Pet.objects.create(owner=user, name='Bench', species='Dog', breed='Mixed',
+                                 birth_date=date(2020, 1, 1))
+        today = date.today()
+        Feeding.objects.bulk_create(
+            Feeding(pet=pet, food_type='Dry', amount='100 g', date=today - timedelta(days=i % 365),
+                    time=dtime(i % 24, i % 60))
+            for i in range(rows)
+        )
+        return user, token
+
+    async def run_all(self, key, total, concurrency):
+        results = []
+        for name, sync_url, async_url in ENDPOINTS:
+            for variant, url in (('sync', sync_url), ('async', async_url)):
+                elapsed, failures = await self.run(url, key, total, concurrency)
+                results.append((name, variant, elapsed, failures))
+        return results
+
+    async def run(self, url, key, total, concurrency):
+        client = AsyncClient()
+        headers = {'Authorization': f'Token {key}'}
+        semaphore = asyncio.Semaphore(concurrency)
+        failures = 0
+
+        async def one():
+            nonlocal failures
+            async with semaphore:
+                response = await client.get(url, headers=headers)
+                if response.status_code != 200:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time.perf_counter() - started, failures
@@ -0,0 +1,57 @@
+import time
+from datetime import date, time as dtime, timedelta
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from PetLink.middleware import COMPRESSORS, zstandard
+from pet.models import Feeding
+from pet.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+from pet.serializers import FeedingSerializer
+
+
+class Command(BaseCommand):
+    help = ("Measures rendering a page of serialized feedings with the stock JSON renderer, "
+            "orjson and MessagePack, and the size and cost of compressing the result.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Feedings in the rendered page.")
+        parser.add_argument('--repeat', type=int, default=20, help="Runs per variant; the best one is reported.")
+
+    def handle(self, *args, **options):
+        today = date.today()
+        feedings = [
+            Feeding(id=i, pet_id=1, food_type='Dry', amount='100 g', notes=f'Ate everything, portion {i}',
+                    date=today - timedelta(days=i // 3), time=dtime(8 + i % 3 * 5))
+            for i in range(1, options['rows'] + 1)
+        ]
+        data = {'next': None, 'previous': None, 'results': FeedingSerializer(feedings, many=True).data}
+
+        renderers = [('JSONRenderer', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('ORJSONRenderer', ORJSONRenderer()))
+        if msgpack is not None:
+            renderers.append(('MessagePackRenderer', MessagePackRenderer()))
+
+        baseline = None
+        for label, renderer in renderers:
+            best, content = self.measure(renderer.render, data, options['repeat'])
+            baseline = baseline or best
+            self.stdout.write(f"{label:<20} {best * 1000:8.2f} ms  {len(content):>9} bytes  ({baseline / best:4.1f}x)")
+
+        content = JSONRenderer().render(data)
+        for encoding, compress, level in COMPRESSORS:
+            if encoding == 'zstd' and zstandard is None:
+                continue
+            best, compressed = self.measure(lambda body: compress(body, level), content, options['repeat'])
+            self.stdout.write(f"{encoding + ' ' + str(level):<20} {best * 1000:8.2f} ms  {len(compressed):>9} bytes  "
+                              f"({len(content) / len(compressed):4.1f}x smaller)")
+
+    @staticmethod
+    def measure(func, data, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func(data)
+            timings.append(time.perf_counter() - started)
+        return min(timings), result
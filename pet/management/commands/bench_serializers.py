@@ -0,0 +1,79 @@
+import time
+from datetime import date, time as dtime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from pet.models import Feeding, Pet
+from pet.serializers import FeedingSerializer
+from user.models import CustomUser
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Measures the per-row cost of serializing feedings through ModelSerializer, "
+            "with ?fields= narrowing and through the values() fast path. "
+            "Benchmark rows are created in a transaction that is rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help="Feedings to serialize.")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per variant; the best one is reported.")
+        parser.add_argument('--fields', default='id,date,time,amount',
+                            help="Fields used for the sparse fieldset variants.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['rows'], options['repeat'], options['fields'].split(','))
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, rows, repeat, fields):
+        user = CustomUser.objects.create_user(email=f'bench-{time.time_ns()}@example.invalid', first_name='Bench')
+        pet = Pet.objects.create(owner=user, name='Bench', species='Dog', birth_date=date(2020, 1, 1))
+        today = date.today()
+        Feeding.objects.bulk_create(
+            Feeding(pet=pet, food_type='Dry', amount='100 g', notes='Ate everything',
+                    date=today - timedelta(days=i // 3), time=dtime(8 + i % 3 * 5))
+            for i in range(rows)
+        )
+        queryset = Feeding.objects.filter(pet=pet).order_by('-date', '-time', '-id')
+
+        def model_serializer(context):
+            serializer = FeedingSerializer(context=context)
+            columns = serializer.get_select_columns()
+            return FeedingSerializer(list(queryset.only(*columns)), many=True, context=context).data
+
+        def values_path(context):
+            serializer = FeedingSerializer(context=context)
+            plan = serializer.get_values_plan()
+            if plan is None:
+                raise CommandError("FeedingSerializer no longer qualifies for the values() fast path.")
+            return serializer.values_representation(queryset.values(*{column for _, column, _ in plan}), plan)
+
+        variants = [
+            ('ModelSerializer, all fields', model_serializer, {'fields': None}),
+            ('ModelSerializer, ?fields=', model_serializer, {'fields': fields}),
+            ('values(), all fields', values_path, {'fields': None}),
+            ('values(), ?fields=', values_path, {'fields': fields}),
+        ]
+
+        baseline = None
+        for label, func, context in variants:
+            best, data = min(self.measure(func, context) for _ in range(repeat))
+            if label.endswith('all fields') and baseline is not None and data != baseline[1]:
+                raise CommandError(f"{label} renders different output than ModelSerializer.")
+            if baseline is None:
+                baseline = (best, data)
+            per_row = best / rows * 1e6
+            self.stdout.write(f"{label:<30} {per_row:8.2f} µs/row  ({baseline[0] / best:4.1f}x)")
+
+    @staticmethod
+    def measure(func, context):
+        started = time.perf_counter()
+        data = [dict(item) for item in func(context)]
+        return time.perf_counter() - started, data
@@ -0,0 +1,31 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from pet.partitions import add_months, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = ("Creates the monthly partitions of the medication, feeding and walk tables up to N months ahead "
+            "(PostgreSQL only). Also runs after every migrate; schedule it daily, e.g. from cron, "
+            "for deployments that go longer without one.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=settings.ACTIVITY_PARTITIONS_AHEAD,
+                            help="Months ahead of the current one to cover.")
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help="Database to create partitions in.")
+
+    def handle(self, *args, **options):
+        if connections[options['database']].vendor != 'postgresql':
+            self.stdout.write("Activity tables are only partitioned on PostgreSQL; nothing to do.")
+            return
+
+        created = ensure_partitions(options['months'], using=options['database'])
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        until = add_months(date.today().replace(day=1), options['months'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Partitions up to {until:%Y-%m} are in place ({len(created)} created)."
+        ))
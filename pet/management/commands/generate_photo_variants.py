@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from pet.images import generate_photo_variants, pets_without_current_variants
+from pet.models import Pet
+
+
+class Command(BaseCommand):
+    help = "Generates resized photo variants for pets whose variants are missing or stale."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Regenerate variants for every pet with a photo.")
+
+    def handle(self, *args, **options):
+        pets = Pet.objects.exclude(photo='') if options['all'] else pets_without_current_variants()
+        generated = 0
+        for pet_id in pets.values_list('pk', flat=True).iterator(chunk_size=200):
+            generate_photo_variants(pet_id)
+            generated += 1
+        self.stdout.write(self.style.SUCCESS(f"Generated variants for {generated} pets."))
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+# Запускается в отдельном процессе: в текущем всё уже импортировано
+STARTUP_SCRIPT = """
+import django
+django.setup()
+from PetLink.warmup import warm_up_app
+warm_up_app()
+"""
+
+
+class Command(BaseCommand):
+    help = ("Reports per-module import time of a cold application start "
+            "(django.setup() plus warmup), using python -X importtime.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=30, help="Number of modules to list.")
+        parser.add_argument('--sort', choices=('cumulative', 'self'), default='cumulative',
+                            help="Order modules by cumulative or self time.")
+        parser.add_argument('--package', help="Only list modules of this top-level package.")
+
+    def handle(self, *args, **options):
+        stderr = self.run_startup()
+        modules = parse_importtime(stderr)
+        if not modules:
+            self.stderr.write("No import timings were collected.")
+            return
+
+        total = sum(self_us for self_us, _ in modules.values())
+        key = 1 if options['sort'] == 'cumulative' else 0
+        rows = sorted(modules.items(), key=lambda item: item[1][key], reverse=True)
+        if options['package']:
+            rows = [row for row in rows if row[0].split('.')[0] == options['package']]
+
+        self.stdout.write(f"{'self ms':>9} {'cumul ms':>9}  module")
+        for name, (self_us, cumulative_us) in rows[:options['limit']]:
+            self.stdout.write(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(modules)} modules imported in {total / 1000:.1f} ms"
+        ))
+
+    def run_startup(self):
+        env = {**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            self.stderr.write(result.stderr.splitlines()[-1] if result.stderr else "Startup failed.")
+        return result.stderr
+
+
+def parse_importtime(output):
+    """
+    Parses ``-X importtime`` lines (``import time: self | cumulative | name``)
+    into ``{module: (self_us, cumulative_us)}``.
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            # Заголовок таблицы
+            continue
+    return modules
@@ -0,0 +1,331 @@
+import http.client
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+from pet.models import Feeding, Medication, Pet, Walk
+from user.models import CustomUser
+
+PASSWORD = 'loadtest-password'
+
+# Веса операций в наборах нагрузки
+MIXES = {
+    'default': {'login': 2, 'pet_list': 20, 'activity_list': 50, 'activity_create': 25, 'document_upload': 3},
+    'read': {'login': 1, 'pet_list': 30, 'activity_list': 69},
+    'write': {'login': 1, 'activity_list': 20, 'activity_create': 70, 'document_upload': 9},
+}
+
+ACTIVITY_PATHS = ('/pets/feedings/', '/pets/walks/', '/pets/medications/')
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Account:
+    """
+    A benchmark user: credentials, API token and pet ids.
+    """
+
+    def __init__(self, email, token, pet_ids):
+        self.email = email
+        self.token = token
+        self.pet_ids = pet_ids
+
+    @property
+    def headers(self):
+        return {'Authorization': f'Token {self.token}'}
+
+
+def login(account, rng):
+    body = json.dumps({'email': account.email, 'password': PASSWORD})
+    return 'POST', '/accounts/login/', body, {'Content-Type': 'application/json'}
+
+
+def pet_list(account, rng):
+    return 'GET', '/pets/pet-create/', None, account.headers
+
+
+def activity_list(account, rng):
+    return 'GET', f'{rng.choice(ACTIVITY_PATHS)}?page_size=20', None, account.headers
+
+
+def activity_create(account, rng):
+    pet_id = rng.choice(account.pet_ids)
+    today = date.today().isoformat()
+    moment = f'{rng.randrange(24):02d}:{rng.randrange(60):02d}'
+    if rng.random() < 0.5:
+        path, data = '/pets/walks/', {'pet': pet_id, 'date': today, 'time': moment, 'notes': 'Park loop'}
+    else:
+        path, data = '/pets/feedings/', {'pet': pet_id, 'date': today, 'time': moment,
+                                         'food_type': 'Dry', 'amount': '100 g'}
+    return 'POST', path, json.dumps(data), {**account.headers, 'Content-Type': 'application/json'}
+
+
+def document_upload(account, rng):
+    # Уникальное содержимое: одинаковые байты хранилище не записывает повторно
+    content = f'%PDF-1.4\n% loadtest {rng.getrandbits(64):016x}\n'.encode() + b'0' * 16 * 1024
+    body = encode_multipart(BOUNDARY, {
+        'title': 'Blood test',
+        'document_type': 'analysis',
+        'file': ContentFile(content, name='analysis.pdf'),
+    })
+    path = f'/pets/pets/{rng.choice(account.pet_ids)}/documents/'
+    return 'POST', path, body, {**account.headers, 'Content-Type': MULTIPART_CONTENT}
+
+
+OPERATIONS = {
+    'login': login,
+    'pet_list': pet_list,
+    'activity_list': activity_list,
+    'activity_create': activity_create,
+    'document_upload': document_upload,
+}
+
+
+def percentile(sorted_values, percent):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(percent / 100 * len(sorted_values) + 0.5 - 1e-9))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples, duration):
+    """
+    Aggregates ``(operation, seconds, status, query count)`` samples into
+    per-operation stats, plus a ``total`` row.
+    """
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample[0], []).append(sample)
+    groups = dict(sorted(groups.items()))
+    groups['total'] = samples
+
+    summary = {}
+    for name, group in groups.items():
+        latencies = sorted(seconds for _, seconds, _, _ in group)
+        queries = [count for _, _, _, count in group if count is not None]
+        summary[name] = {
+            'requests': len(group),
+            'errors': sum(1 for _, _, status, _ in group if not 200 <= status < 400),
+            'rps': len(group) / duration,
+            'p50': percentile(latencies, 50) * 1000,
+            'p95': percentile(latencies, 95) * 1000,
+            'p99': percentile(latencies, 99) * 1000,
+            'queries': sum(queries) / len(queries) if queries else None,
+        }
+    return summary
+
+
+class Command(BaseCommand):
+    help = ("Load-tests the API: boots the app on a throwaway test database, drives a weighted mix "
+            "of login, pet list, activity list/create and document upload requests from concurrent "
+            "clients, and reports throughput, p50/p95/p99 latency and SQL queries per request. "
+            "Results can be saved as a baseline and compared against later runs.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=10, help="Clients sending requests at once.")
+        parser.add_argument('--duration', type=float, default=30, help="Measured seconds.")
+        parser.add_argument('--warmup', type=float, default=3, help="Seconds of load before measuring.")
+        parser.add_argument('--mix', choices=sorted(MIXES), default='default', help="Operation mix.")
+        parser.add_argument('--users', type=int, default=20, help="Benchmark users.")
+        parser.add_argument('--pets', type=int, default=2, help="Pets per user.")
+        parser.add_argument('--activities', type=int, default=300, help="Activities of each type per pet.")
+        parser.add_argument('--seed', type=int, default=0, help="Seed for the request sequence.")
+        parser.add_argument('--baseline-dir', default=str(Path(settings.BASE_DIR) / 'benchmarks'),
+                            help="Directory of saved baselines.")
+        parser.add_argument('--save-baseline', metavar='NAME', help="Save the results as NAME.json.")
+        parser.add_argument('--compare', metavar='NAME', help="Compare the results with baseline NAME.")
+
+    def handle(self, *args, **options):
+        baseline = self.load_baseline(options) if options['compare'] else None
+
+        workdir = tempfile.mkdtemp(prefix='petlink-loadtest-')
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor == 'sqlite':
+            # Файл, а не память: потоки сервера открывают собственные соединения
+            connection.settings_dict['TEST']['NAME'] = os.path.join(workdir, 'loadtest.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(ALLOWED_HOSTS=['127.0.0.1'], MEDIA_ROOT=workdir,
+                                   QUERY_COUNT_HEADER=True, QUERY_BUDGET_STRICT=False):
+                accounts = self.create_data(options['users'], options['pets'], options['activities'])
+                samples = self.run_load(accounts, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        summary = summarize(samples, options['duration'])
+        self.report(summary, baseline)
+        if options['save_baseline']:
+            self.save_baseline(summary, connection.vendor, options)
+
+    def create_data(self, users, pets, activities):
+        self.stdout.write(f"Creating {users} users, {users * pets} pets and "
+                          f"{users * pets * activities * 3} activities...")
+        password = make_password(PASSWORD)  # хешируем один раз, а не для каждого пользователя
+        owners = CustomUser.objects.bulk_create(
+            CustomUser(email=f'loadtest-{i}@example.invalid', password=password, first_name=f'Owner {i}')
+            for i in range(users)
+        )
+        tokens = Token.objects.bulk_create(Token(user=owner, key=Token.generate_key()) for owner in owners)
+        all_pets = Pet.objects.bulk_create(
+            Pet(owner=owner, name=f'Pet {i}', species='Dog', breed='Mixed', birth_date=date(2020, 1, 1))
+            for owner in owners for i in range(pets)
+        )
+
+        today = date.today()
+        for pet in all_pets:
+            days = [(today - timedelta(days=i // 3), dtime(8 + i % 3 * 5, i % 60)) for i in range(activities)]
+            Feeding.objects.bulk_create(Feeding(pet=pet, food_type='Dry', amount='100 g', date=day, time=moment)
+                                        for day, moment in days)
+            Walk.objects.bulk_create(Walk(pet=pet, notes='Park loop', date=day, time=moment)
+                                     for day, moment in days)
+            Medication.objects.bulk_create(Medication(pet=pet, medication_name='Vitamins', dosage='1 tab',
+                                                      frequency=1, date=day, time=moment)
+                                           for day, moment in days)
+
+        pet_ids = {}
+        for pet in all_pets:
+            pet_ids.setdefault(pet.owner_id, []).append(pet.pk)
+        return [Account(owner.email, token.key, pet_ids[owner.pk]) for owner, token in zip(owners, tokens)]
+
+    def run_load(self, accounts, options):
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler, allow_reuse_address=False)
+        server.set_app(get_internal_wsgi_application())
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        port = server.server_address[1]
+
+        weights = MIXES[options['mix']]
+        self.stdout.write(f"Running mix '{options['mix']}' with {options['concurrency']} clients for "
+                          f"{options['warmup']:g}s warm-up + {options['duration']:g}s...")
+        started = time.perf_counter()
+        measure_from = started + options['warmup']
+        deadline = measure_from + options['duration']
+
+        results = [[] for _ in range(options['concurrency'])]
+        workers = [
+            threading.Thread(target=self.client, args=(
+                port, accounts[index % len(accounts)], weights,
+                random.Random(options['seed'] * 1000 + index), measure_from, deadline, results[index],
+            ))
+            for index in range(options['concurrency'])
+        ]
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            server.shutdown()
+            server.server_close()
+        return [sample for samples in results for sample in samples]
+
+    @staticmethod
+    def client(port, account, weights, rng, measure_from, deadline, samples):
+        """
+        Sends requests over one keep-alive connection until ``deadline`` and
+        appends the samples taken after ``measure_from``.
+        """
+        names, cumulative = list(weights), []
+        total = 0
+        for name in names:
+            total += weights[name]
+            cumulative.append(total)
+
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        try:
+            while True:
+                started = time.perf_counter()
+                if started >= deadline:
+                    break
+                name = rng.choices(names, cum_weights=cumulative)[0]
+                method, path, body, headers = OPERATIONS[name](account, rng)
+                try:
+                    connection.request(method, path, body, headers)
+                    response = connection.getresponse()
+                    response.read()
+                    status, queries = response.status, response.getheader('X-Query-Count')
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    status, queries = 0, None
+                if started >= measure_from:
+                    samples.append((name, time.perf_counter() - started, status,
+                                    int(queries) if queries is not None else None))
+        finally:
+            connection.close()
+
+    def report(self, summary, baseline=None):
+        header = (f"{'operation':<16} {'requests':>8} {'errors':>6} {'req/s':>8} "
+                  f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>7}")
+        if baseline:
+            header += f" {'Δ req/s':>8} {'Δ p95':>8} {'Δ queries':>9}"
+        self.stdout.write(header)
+
+        for name, stats in summary.items():
+            queries = f"{stats['queries']:.1f}" if stats['queries'] is not None else '-'
+            line = (f"{name:<16} {stats['requests']:>8} {stats['errors']:>6} {stats['rps']:>8.1f} "
+                    f"{stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['p99']:>8.1f} {queries:>7}")
+            previous = baseline['results'].get(name) if baseline else None
+            if previous:
+                line += (f" {self.change(stats['rps'], previous['rps']):>8}"
+                         f" {self.change(stats['p95'], previous['p95']):>8}")
+                if stats['queries'] is not None and previous['queries'] is not None:
+                    line += f" {stats['queries'] - previous['queries']:>+9.1f}"
+            self.stdout.write(line)
+
+    @staticmethod
+    def change(current, previous):
+        if not previous:
+            return '-'
+        return f"{(current - previous) / previous * 100:+.0f}%"
+
+    def baseline_path(self, options, name):
+        return Path(options['baseline_dir']) / f'{name}.json'
+
+    def load_baseline(self, options):
+        path = self.baseline_path(options, options['compare'])
+        try:
+            baseline = json.loads(path.read_text())
+        except FileNotFoundError:
+            raise CommandError(f"No baseline at {path}.")
+
+        run = baseline['options']
+        for option in ('mix', 'concurrency', 'users', 'pets', 'activities'):
+            if run.get(option) != options[option]:
+                self.stderr.write(f"Baseline {options['compare']} was recorded with --{option}={run.get(option)}, "
+                                  f"this run uses {options[option]}; the comparison is not like for like.")
+        return baseline
+
+    def save_baseline(self, summary, vendor, options):
+        path = self.baseline_path(options, options['save_baseline'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'database': vendor,
+            'options': {option: options[option] for option in
+                        ('mix', 'concurrency', 'duration', 'warmup', 'users', 'pets', 'activities', 'seed')},
+            'results': summary,
+        }, indent=2))
+        self.stdout.write(f"Baseline saved to {path}.")
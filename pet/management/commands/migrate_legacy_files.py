@@ -0,0 +1,76 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from pet.blobs import count_references, recount_blobs
+from pet.signals import BLOB_FIELDS
+from pet.storage import get_blob_storage
+
+
+class Command(BaseCommand):
+    help = ("Moves photos and documents saved before content-addressed storage to their "
+            "content-addressed names, merging duplicate files, rebuilds the reference counts "
+            "and deletes files nothing references. Run it once after migrating, and again "
+            "whenever the counts are in doubt, while the site is not taking uploads.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be changed.")
+        parser.add_argument('--min-age', type=int, default=3600,
+                            help="Seconds an unreferenced file must be old before it is deleted "
+                                 "(default: 3600), so uploads in progress are kept.")
+
+    def handle(self, *args, **options):
+        storage = get_blob_storage()
+        dry_run = options['dry_run']
+
+        moved = {}
+        rows = 0
+        for model, field in BLOB_FIELDS.items():
+            legacy = model.objects.exclude(**{field: ''}).values_list('pk', field)
+            for pk, name in legacy.iterator(chunk_size=200):
+                if storage.is_blob_name(name):
+                    continue
+                if name not in moved:
+                    if not storage.exists(name):
+                        self.stderr.write(f"{model.__name__} {pk}: {name} is missing, left as is.")
+                        continue
+                    moved[name] = name if dry_run else self.move(storage, name)
+                if not dry_run:
+                    model.objects.filter(pk=pk, **{field: name}).update(**{field: moved[name]})
+                rows += 1
+        self.stdout.write(f"Moved {len(moved)} legacy files referenced by {rows} rows "
+                          f"to {len(set(moved.values()))} stored files.")
+
+        references = count_references() if dry_run else recount_blobs()
+        self.stdout.write(f"Counted references to {len(references)} stored files.")
+
+        cutoff = timezone.now() - timedelta(seconds=options['min_age'])
+        deleted = 0
+        for model, field in BLOB_FIELDS.items():
+            upload_to = model._meta.get_field(field).upload_to.rstrip('/')
+            for name in self.walk(storage, upload_to):
+                if references[name] or storage.get_modified_time(name) > cutoff:
+                    continue
+                if not dry_run:
+                    storage.delete(name)
+                deleted += 1
+        self.stdout.write(f"Deleted {deleted} unreferenced files.")
+        self.stdout.write(self.style.SUCCESS("Dry run, nothing changed." if dry_run else "Done."))
+
+    def move(self, storage, name):
+        with transaction.atomic(), storage.open(name, 'rb') as handle:
+            # Имя получается из содержимого: одинаковые файлы сходятся в один
+            return storage.save(name, File(handle, name=posixpath.basename(name)))
+
+    def walk(self, storage, directory):
+        if not storage.exists(directory):
+            return
+        directories, files = storage.listdir(directory)
+        for name in files:
+            yield posixpath.join(directory, name)
+        for name in directories:
+            yield from self.walk(storage, posixpath.join(directory, name))
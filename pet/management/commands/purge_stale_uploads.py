@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from pet.models import DocumentUpload
+from pet.uploads import discard_upload
+
+
+class Command(BaseCommand):
+    help = "Deletes resumable document uploads that were never finalized, with their temp files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Age after which an upload is stale.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        purged = 0
+        for upload in DocumentUpload.objects.filter(created_at__lt=cutoff).iterator():
+            discard_upload(upload)
+            purged += 1
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} stale uploads."))
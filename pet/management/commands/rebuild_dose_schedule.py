@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from pet.adherence import rebuild_dose_schedule
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the materialized medication dose schedule from the medication log."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pet', type=int, action='append', dest='pets',
+                            help="Only rebuild the courses of this pet (repeatable).")
+
+    def handle(self, *args, **options):
+        created = rebuild_dose_schedule(options['pets'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt dose schedule: {created} days."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from pet.exports import purge_expired_exports
+from pet.recovery import recover_lost_jobs
+
+
+class Command(BaseCommand):
+    help = ("Runs background jobs lost by a restarted worker and deletes expired exports. "
+            "Web workers re-queue lost jobs when they start; schedule this command, e.g. hourly "
+            "from cron, to also cover quiet periods and to enforce export retention.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-purge', action='store_true', help="Do not delete expired exports.")
+
+    def run_job(self, func, *args):
+        # Здесь задания выполняются сразу, без пула потоков
+        try:
+            func(*args)
+        except Exception as exc:
+            self.stderr.write(f"{func.__name__}{args} failed: {exc}")
+
+    def handle(self, *args, **options):
+        recovered = recover_lost_jobs(run=self.run_job)
+        self.stdout.write(f"Ran {recovered} lost jobs.")
+        if not options['no_purge']:
+            self.stdout.write(f"Deleted {purge_expired_exports()} expired exports.")
+        self.stdout.write(self.style.SUCCESS("Done."))
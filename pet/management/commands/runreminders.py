@@ -0,0 +1,27 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from pet.reminders import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = ("Runs the appointment and medication reminder scheduler in the foreground and "
+            "emails due reminders to the owners. Run a single instance; on start it delivers "
+            "the reminders missed while it was not running.")
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler()
+
+        def shutdown(signum, frame):
+            scheduler.stop()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(
+            f"Reminder scheduler started (horizon {scheduler.horizon}, "
+            f"appointment lead {scheduler.appointment_lead})."
+        )
+        scheduler.run()
+        self.stdout.write(self.style.SUCCESS(f"Reminder scheduler stopped, {scheduler.fired} reminders fired."))
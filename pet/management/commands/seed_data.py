@@ -0,0 +1,253 @@
+import io
+import random
+import time
+from datetime import date, datetime, time as dtime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+
+from pet.adherence import rebuild_dose_schedule
+from pet.models import Feeding, Medication, Pet, Walk
+from pet.rollups import backfill_rollups
+from user.models import CustomUser
+
+FIRST_NAMES = ['Aigerim', 'Alex', 'Anna', 'Arman', 'Dana', 'Daniyar', 'Elena', 'Ivan', 'Kamila', 'Maria',
+               'Max', 'Nurlan', 'Olga', 'Sam', 'Timur', 'Zarina']
+LAST_NAMES = ['Abenov', 'Brown', 'Ivanova', 'Kim', 'Li', 'Novak', 'Petrov', 'Smith', 'Suleimenova', 'Tan']
+PET_NAMES = ['Bella', 'Charlie', 'Coco', 'Luna', 'Max', 'Milo', 'Oscar', 'Rocky', 'Simba', 'Tom', 'Barsik',
+             'Murka', 'Sharik', 'Kesha']
+
+# species: (weight, breeds, feedings per day, walks per day, foods)
+SPECIES = {
+    'Dog': (45, ['Labrador', 'Beagle', 'Husky', 'Corgi', 'Mixed'], (2, 2), (1, 3), ['Dry', 'Wet', 'Raw']),
+    'Cat': (35, ['British Shorthair', 'Siamese', 'Maine Coon', 'Mixed'], (2, 3), (0, 0), ['Dry', 'Wet']),
+    'Rabbit': (8, ['Dutch', 'Lop', None], (1, 2), (0, 0), ['Hay', 'Pellets', 'Vegetables']),
+    'Hamster': (7, ['Syrian', 'Dwarf', None], (1, 1), (0, 0), ['Seed mix', 'Pellets']),
+    'Parrot': (5, ['Budgerigar', 'Cockatiel', None], (1, 2), (0, 0), ['Seed mix', 'Fruit']),
+}
+
+# (name, dosage, doses per day)
+MEDICATIONS = [
+    ('Amoxicillin', '50 mg', 2), ('Meloxicam', '1.5 mg', 1), ('Prednisolone', '5 mg', 2),
+    ('Omeprazole', '10 mg', 1), ('Metronidazole', '250 mg', 2), ('Gabapentin', '100 mg', 3),
+]
+
+NOTES = ['Ate everything', 'Left some food', 'Very playful', 'Tired after the park', 'Met other dogs',
+         'Seemed a bit lazy', 'Took the pill with a treat', 'Rainy day']
+
+# Порядок значений в строках активностей
+ACTIVITY_FIELDS = {
+    Feeding: ['pet', 'date', 'time', 'notes', 'created_at', 'updated_at', 'food_type', 'amount'],
+    Walk: ['pet', 'date', 'time', 'notes', 'created_at', 'updated_at'],
+    Medication: ['pet', 'date', 'time', 'notes', 'created_at', 'updated_at', 'medication_name', 'dosage',
+                 'frequency'],
+}
+
+# Вероятности событий за один день
+COURSE_START_CHANCE = 0.01
+MISSED_DOSE_CHANCE = 0.08
+NOTE_CHANCE = 0.15
+DERIVED_CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = ("Generates reproducible synthetic users, pets and months of feedings, walks and medication "
+            "courses, bulk loading them (COPY on PostgreSQL) and reporting rows per second. "
+            "Daily rollups and dose schedules of the new pets are rebuilt afterwards.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help="Users to create.")
+        parser.add_argument('--max-pets', type=int, default=3, help="Each user gets 1 to max-pets pets.")
+        parser.add_argument('--days', type=int, default=365, help="Days of history per pet.")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Random seed; the same seed generates the same data.")
+        parser.add_argument('--batch-size', type=int, default=10000, help="Rows per insert batch.")
+        parser.add_argument('--password', default='petlink123', help="Password of every generated user.")
+        parser.add_argument('--no-copy', action='store_true', help="Use executemany instead of COPY on PostgreSQL.")
+        parser.add_argument('--skip-derived', action='store_true',
+                            help="Do not rebuild rollups and dose schedules of the new pets.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.verbosity = options['verbosity']
+        self.batch_size = options['batch_size']
+        # Само соединение, а не прокси django.db.connection: на миллионах значений это заметно
+        self.connection = connections[DEFAULT_DB_ALIAS]
+        self.use_copy = self.connection.vendor == 'postgresql' and not options['no_copy']
+        self.email_domain = f"seed{options['seed']}.petlink.invalid"
+        if CustomUser.objects.filter(email__endswith=f'@{self.email_domain}').exists():
+            raise CommandError(f"Data for --seed {options['seed']} already exists; pick another seed.")
+
+        self.counts = dict.fromkeys([CustomUser, Pet, Feeding, Walk, Medication], 0)
+        self.buffers = {Feeding: [], Walk: [], Medication: []}
+        self.prepared = {}
+        started = time.perf_counter()
+        with transaction.atomic():
+            pets = self.create_pets(self.create_users(options['users'], options['password']), options['max_pets'])
+            today = date.today()
+            for pet in pets:
+                self.generate_history(pet, max(pet.birth_date, today - timedelta(days=options['days'] - 1)), today)
+            for model in self.buffers:
+                self.flush(model)
+        elapsed = time.perf_counter() - started
+
+        total = sum(self.counts.values())
+        for model, count in self.counts.items():
+            self.stdout.write(f"{model.__name__:<12} {count:>10,} rows")
+        method = 'COPY' if self.use_copy else 'executemany'
+        self.stdout.write(self.style.SUCCESS(
+            f"Inserted {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s, activities via {method})."
+        ))
+
+        if not options['skip_derived']:
+            self.rebuild_derived([pet.pk for pet in pets])
+
+    def create_users(self, count, password):
+        password = make_password(password)  # один хеш на всех вместо create_user для каждого
+        users = [
+            CustomUser(
+                email=f'user{i}@{self.email_domain}', password=password,
+                first_name=self.rng.choice(FIRST_NAMES), last_name=self.rng.choice(LAST_NAMES),
+            )
+            for i in range(count)
+        ]
+        users = CustomUser.objects.bulk_create(users, batch_size=self.batch_size)
+        self.counts[CustomUser] += len(users)
+        return users
+
+    def create_pets(self, users, max_pets):
+        species_names = list(SPECIES)
+        weights = [SPECIES[name][0] for name in species_names]
+        today = date.today()
+        pets = []
+        for user in users:
+            for _ in range(self.rng.randint(1, max_pets)):
+                species = self.rng.choices(species_names, weights)[0]
+                pets.append(Pet(
+                    owner=user, name=self.rng.choice(PET_NAMES), species=species,
+                    breed=self.rng.choice(SPECIES[species][1]),
+                    birth_date=today - timedelta(days=self.rng.randint(60, 15 * 365)),
+                ))
+        pets = Pet.objects.bulk_create(pets, batch_size=self.batch_size)
+        self.counts[Pet] += len(pets)
+        return pets
+
+    def generate_history(self, pet, start, end):
+        weight, breeds, feedings, walks, foods = SPECIES[pet.species]
+        food = self.rng.choice(foods)
+        amount = f'{self.rng.randrange(20, 400, 10)} g'
+        course, course_left = None, 0
+
+        day = start
+        while day <= end:
+            for hour in self.spread(self.rng.randint(*feedings), 7, 20):
+                self.add(Feeding, pet, day, hour, food, amount)
+            for hour in self.spread(self.rng.randint(*walks), 7, 22):
+                self.add(Walk, pet, day, hour)
+
+            if course_left == 0 and self.rng.random() < COURSE_START_CHANCE:
+                course, course_left = self.rng.choice(MEDICATIONS), self.rng.randint(5, 14)
+            if course_left:
+                for hour in self.spread(course[2], 8, 20):
+                    if self.rng.random() >= MISSED_DOSE_CHANCE:
+                        self.add(Medication, pet, day, hour, *course)
+                course_left -= 1
+            day += timedelta(days=1)
+
+    def spread(self, count, first_hour, last_hour):
+        """
+        Hours of ``count`` events spread over the day, with some jitter.
+        """
+        if count <= 0:
+            return []
+        step = (last_hour - first_hour) / count
+        return [min(23, int(first_hour + step * i + self.rng.random() * step)) for i in range(count)]
+
+    def add(self, model, pet, day, hour, *extra):
+        """
+        Buffers one activity row in :data:`ACTIVITY_FIELDS` order; the record
+        is dated at the moment of the activity.
+        """
+        moment = dtime(hour, self.rng.randrange(60))
+        notes = self.rng.choice(NOTES) if self.rng.random() < NOTE_CHANCE else ''
+        recorded = datetime.combine(day, moment, tzinfo=dt_timezone.utc)
+        buffer = self.buffers[model]
+        buffer.append((pet.pk, day, moment, notes, recorded, recorded, *extra))
+        if len(buffer) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model):
+        rows = self.buffers[model]
+        if not rows:
+            return
+        fields = [model._meta.get_field(name) for name in ACTIVITY_FIELDS[model]]
+        rows = [[self.prepare(field, value) for field, value in zip(fields, row)] for row in rows]
+        if self.use_copy:
+            self.copy(model, fields, rows)
+        else:
+            self.insert(model, fields, rows)
+        self.counts[model] += len(rows)
+        self.buffers[model] = []
+        # Метки времени между пакетами почти не повторяются, не копим их
+        self.prepared.pop(models.DateTimeField, None)
+        if self.verbosity >= 2:
+            self.stdout.write(f"  {model.__name__}: {self.counts[model]:,} rows")
+
+    def prepare(self, field, value):
+        """
+        Converts ``value`` to its database representation the way
+        ``bulk_create`` would, memoized per field type: dates, times and
+        strings repeat a lot, and ``created_at`` equals ``updated_at``.
+        """
+        cache = self.prepared.setdefault(type(field), {})
+        if value not in cache:
+            cache[value] = field.get_db_prep_save(value, self.connection)
+        return cache[value]
+
+    def insert(self, model, fields, rows):
+        quote = self.connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})', rows
+            )
+
+    def copy(self, model, fields, rows):
+        """
+        Loads ``rows`` with ``COPY ... FROM STDIN`` in PostgreSQL's text format.
+        """
+        buffer = io.StringIO()
+        for row in rows:
+            values = []
+            for value in row:
+                if value is None:
+                    values.append('\\N')
+                else:
+                    values.append(str(value).replace('\\', '\\\\').replace('\t', '\\t')
+                                  .replace('\n', '\\n').replace('\r', '\\r'))
+            buffer.write('\t'.join(values) + '\n')
+        buffer.seek(0)
+
+        quote = self.connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        sql = f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN'
+        with self.connection.cursor() as cursor:
+            if hasattr(cursor, 'copy_expert'):  # psycopg2
+                cursor.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def rebuild_derived(self, pet_ids):
+        started = time.perf_counter()
+        rollups = doses = 0
+        for start in range(0, len(pet_ids), DERIVED_CHUNK_SIZE):
+            chunk = pet_ids[start:start + DERIVED_CHUNK_SIZE]
+            rollups += backfill_rollups(chunk)
+            doses += rebuild_dose_schedule(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {rollups:,} daily rollups and {doses:,} scheduled doses "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet', '0004_petdocument'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feeding',
+            index=models.Index(fields=['pet', 'date', 'time'], name='pet_feeding_pet_date_time'),
+        ),
+        migrations.AddIndex(
+            model_name='medication',
+            index=models.Index(fields=['pet', 'date', 'time'], name='pet_medication_pet_date_time'),
+        ),
+        migrations.AddIndex(
+            model_name='walk',
+            index=models.Index(fields=['pet', 'date', 'time'], name='pet_walk_pet_date_time'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet', '0005_activity_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['pet', 'appointment_date', 'appointment_time'], name='pet_appointment_pet_date_time'),
+        ),
+    ]
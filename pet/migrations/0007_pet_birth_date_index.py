@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet', '0006_appointment_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['birth_date'], name='pet_pet_birth_date'),
+        ),
+    ]
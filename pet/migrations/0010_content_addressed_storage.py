@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:32
+
+import pet.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet', '0009_pet_photo_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Stored Blob',
+                'verbose_name_plural': 'Stored Blobs',
+            },
+        ),
+        migrations.AlterField(
+            model_name='pet',
+            name='photo',
+            field=models.ImageField(blank=True, storage=pet.storage.get_blob_storage, upload_to='pets_photo/'),
+        ),
+        migrations.AlterField(
+            model_name='petdocument',
+            name='file',
+            field=models.FileField(storage=pet.storage.get_blob_storage, upload_to='pet_documents/'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:33
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet', '0010_content_addressed_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=150)),
+                ('document_type', models.CharField(choices=[('passport', 'Passport'), ('vaccination', 'Vaccination'), ('analysis', 'Medical Analysis'), ('insurance', 'Insurance'), ('other', 'Other')], default='other', max_length=50)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_uploads', to=settings.AUTH_USER_MODEL)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_uploads', to='pet.pet')),
+            ],
+            options={
+                'verbose_name': 'Document Upload',
+                'verbose_name_plural': 'Document Uploads',
+            },
+        ),
+    ]
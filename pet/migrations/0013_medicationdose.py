@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet', '0012_reminder_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MedicationDose',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('medication_name', models.CharField(max_length=100)),
+                ('date', models.DateField()),
+                ('expected', models.IntegerField(default=0)),
+                ('taken', models.IntegerField(default=0)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='medication_doses', to='pet.pet')),
+            ],
+            options={
+                'verbose_name': 'Medication Dose',
+                'verbose_name_plural': 'Medication Doses',
+                'constraints': [models.UniqueConstraint(fields=('pet', 'medication_name', 'date'), name='pet_medicationdose_unique_day')],
+            },
+        ),
+    ]
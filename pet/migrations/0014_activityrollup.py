@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet', '0013_medicationdose'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('activity_type', models.CharField(choices=[('medication', 'Medication'), ('feeding', 'Feeding'), ('walk', 'Walk')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_rollups', to='pet.pet')),
+            ],
+            options={
+                'verbose_name': 'Activity Rollup',
+                'verbose_name_plural': 'Activity Rollups',
+                'constraints': [models.UniqueConstraint(fields=('pet', 'date', 'activity_type'), name='pet_activityrollup_unique_day')],
+            },
+        ),
+    ]
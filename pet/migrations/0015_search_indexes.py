@@ -0,0 +1,77 @@
+from django.db import OperationalError, migrations, transaction
+
+# (kind, code, table, searchable text) — must match pet.search.SEARCH_SOURCES
+SOURCES = [
+    ('medication', 1, 'pet_medication', "{t}medication_name || ' ' || {t}notes"),
+    ('feeding', 2, 'pet_feeding', "{t}food_type || ' ' || {t}notes"),
+    ('walk', 3, 'pet_walk', "{t}notes"),
+    ('appointment', 4, 'pet_appointment', "{t}name || ' ' || {t}description"),
+    ('document', 5, 'pet_petdocument', "{t}title"),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        for kind, code, table, text in SOURCES:
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_search ON {table} "
+                f"USING GIN (to_tsvector('simple', {text.format(t='')}))"
+            )
+    elif connection.vendor == 'sqlite':
+        try:
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute(
+                    "CREATE VIRTUAL TABLE pet_search USING fts5("
+                    "kind UNINDEXED, object_id UNINDEXED, pet_id UNINDEXED, body, "
+                    "tokenize = 'unicode61 remove_diacritics 2')"
+                )
+        except OperationalError:
+            # SQLite собран без FTS5: поиск работает через LIKE, см. pet.search
+            return
+        # rowid = id * 8 + код источника: триггеры находят строку по rowid без сканирования.
+        # Django о триггерах не знает: миграция, пересоздающая таблицу, удалит их молча.
+        # После каждого migrate недостающие триггеры создаёт pet.search.ensure_search_indexes.
+        for kind, code, table, text in SOURCES:
+            new_text = text.format(t='new.')
+            schema_editor.execute(
+                f"INSERT INTO pet_search (rowid, kind, object_id, pet_id, body) "
+                f"SELECT id * 8 + {code}, '{kind}', id, pet_id, {text.format(t='')} FROM {table}"
+            )
+            schema_editor.execute(
+                f"CREATE TRIGGER {table}_search_insert AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO pet_search (rowid, kind, object_id, pet_id, body) "
+                f"VALUES (new.id * 8 + {code}, '{kind}', new.id, new.pet_id, {new_text}); END"
+            )
+            schema_editor.execute(
+                f"CREATE TRIGGER {table}_search_update AFTER UPDATE ON {table} BEGIN "
+                f"UPDATE pet_search SET pet_id = new.pet_id, body = {new_text} "
+                f"WHERE rowid = old.id * 8 + {code}; END"
+            )
+            schema_editor.execute(
+                f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} BEGIN "
+                f"DELETE FROM pet_search WHERE rowid = old.id * 8 + {code}; END"
+            )
+
+
+def drop_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        for kind, code, table, text in SOURCES:
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table}_search")
+    elif connection.vendor == 'sqlite':
+        for kind, code, table, text in SOURCES:
+            for event in ('insert', 'update', 'delete'):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_search_{event}")
+        schema_editor.execute("DROP TABLE IF EXISTS pet_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet', '0014_activityrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
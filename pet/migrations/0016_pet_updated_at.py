@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet', '0015_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,166 @@
+from datetime import date
+
+from django.db import migrations
+
+# Таблицы журналов активностей, которые делим на месячные секции по date
+TABLES = ['pet_medication', 'pet_feeding', 'pet_walk']
+# Сколько месяцев вперёд создать секции сразу (дальше — pet.partitions.ensure_partitions)
+MONTHS_AHEAD = 3
+# Секции создаются не раньше чем за столько месяцев до текущего; более старые строки
+# (и опечатки вроде 0201 года) остаются в секции DEFAULT
+MONTHS_BACK = 36
+
+
+def add_months(month, count):
+    years, month_index = divmod(month.month - 1 + count, 12)
+    return date(month.year + years, month_index + 1, 1)
+
+
+def first_partition_month(first_day, this_month):
+    """
+    Returns the month of the first partition: the month of the oldest row,
+    but no earlier than :data:`MONTHS_BACK` months before ``this_month``.
+    """
+    if first_day is None:
+        return this_month
+    return min(max(first_day.replace(day=1), add_months(this_month, -MONTHS_BACK)), this_month)
+
+
+def fetch_definitions(cursor, table):
+    """
+    Returns the definitions of the table's indexes (except the primary key)
+    and foreign keys, to be replayed on the new table.
+    """
+    cursor.execute(
+        "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "WHERE i.indrelid = %s::regclass AND NOT i.indisprimary",
+        [table],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    return indexes, cursor.fetchall()
+
+
+def rename_table(schema_editor, table, new_name):
+    """
+    Renames ``table`` together with its id sequence, so the new table's
+    identity sequence can take the usual ``<table>_id_seq`` name.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+        sequence = cursor.fetchone()[0]
+    schema_editor.execute(f"ALTER TABLE {table} RENAME TO {new_name}")
+    if sequence:
+        schema_editor.execute(f"ALTER SEQUENCE {sequence} RENAME TO {new_name}_id_seq")
+
+
+def copy_rows(schema_editor, source, table):
+    execute = schema_editor.execute
+    execute(f"INSERT INTO {table} SELECT * FROM {source}")
+    execute(f"DROP TABLE {source}")
+    # Строки скопированы с явными id, продолжаем последовательность после них
+    execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+        f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+    )
+
+
+def partition_table(schema_editor, table):
+    execute = schema_editor.execute
+    with schema_editor.connection.cursor() as cursor:
+        indexes, foreign_keys = fetch_definitions(cursor, table)
+        cursor.execute(f'SELECT MIN("date") FROM {table}')
+        first_day = cursor.fetchone()[0]
+
+    rename_table(schema_editor, table, f'{table}_unpartitioned')
+    # id остаётся identity-столбцом, как его создал Django
+    execute(
+        f"CREATE TABLE {table} (LIKE {table}_unpartitioned "
+        f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY) "
+        f'PARTITION BY RANGE ("date")'
+    )
+    this_month = date.today().replace(day=1)
+    month = first_partition_month(first_day, this_month)
+    while month <= add_months(this_month, MONTHS_AHEAD):
+        execute(
+            f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+        month = add_months(month, 1)
+    # Строки старше первой секции остаются здесь; строки будущих месяцев
+    # ensure_partitions переносит в их секции, когда создаёт их
+    execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    copy_rows(schema_editor, f'{table}_unpartitioned', table)
+
+    # Ключ секционирования обязан входить в первичный ключ; id по-прежнему уникален,
+    # его выдаёт одна последовательность
+    execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, "date")')
+    for index in indexes:
+        execute(index)
+    for name, definition in foreign_keys:
+        execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    execute(f"ANALYZE {table}")
+
+
+def unpartition_table(schema_editor, table):
+    execute = schema_editor.execute
+    with schema_editor.connection.cursor() as cursor:
+        indexes, foreign_keys = fetch_definitions(cursor, table)
+
+    rename_table(schema_editor, table, f'{table}_partitioned')
+    execute(
+        f"CREATE TABLE {table} (LIKE {table}_partitioned "
+        f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY)"
+    )
+    copy_rows(schema_editor, f'{table}_partitioned', table)
+
+    execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+    for index in indexes:
+        # Индексы секционированной таблицы описаны как "ON ONLY"
+        execute(index.replace(' ON ONLY ', ' ON ', 1))
+    for name, definition in foreign_keys:
+        execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    execute(f"ANALYZE {table}")
+
+
+def partition_activity_tables(apps, schema_editor):
+    # SQLite и прочие базы остаются без секций
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        partition_table(schema_editor, table)
+
+
+def unpartition_activity_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        unpartition_table(schema_editor, table)
+
+
+class Migration(migrations.Migration):
+    """
+    Turns the medication, feeding and walk tables into tables partitioned by
+    month of ``date`` on PostgreSQL. Rows are copied into the new tables, so
+    the tables are locked for the duration; run it in a maintenance window.
+
+    Monthly partitions cover at most :data:`MONTHS_BACK` months of history and
+    :data:`MONTHS_AHEAD` months ahead; older rows go to the ``DEFAULT``
+    partition. Only the database changes: ``id`` stays an identity column, so
+    Django's migration state is untouched. The primary key constraint becomes
+    ``(id, date)``, since PostgreSQL requires the partition key in it; ids stay
+    unique because they all come from the column's identity sequence.
+    """
+
+    dependencies = [
+        ('pet', '0016_pet_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_activity_tables, unpartition_activity_tables),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Изменение help_text раньше лежало в миграции индексов 0005 и вынесено сюда,
+    # поэтому идёт после секционирования журналов (0017). Схему оно не меняет:
+    # зависимость от 0017 задаёт только порядок в графе, на неё опирается 0019
+    dependencies = [
+        ('pet', '0017_partition_activity_tables'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='petdocument',
+            name='title',
+            field=models.CharField(help_text='For example: VET passport, Blood test, Vaccination', max_length=150),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-17 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet', '0019_petexport_attempts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('due_at', models.DateTimeField()),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Sent Reminder',
+                'verbose_name_plural': 'Sent Reminders',
+                'indexes': [models.Index(fields=['due_at'], name='pet_sentreminder_due_at')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'due_at'), name='pet_sentreminder_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet', '0020_sentreminder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='photo_job_attempts',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='photo_job_started_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
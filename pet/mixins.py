@@ -0,0 +1,293 @@
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from math import ceil
+
+from django.db import connections, router, transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from . import cache as list_cache
+from .models import Pet
+from .signals import activities_bulk_created
+
+
+class BulkCreateMixin:
+    """
+    Lets a ``ListCreateAPIView`` accept many records in one request.
+
+    When the request body is a list (a JSON array, or NDJSON parsed by
+    :class:`pet.parsers.NDJSONParser`), every referenced pet is loaded with a
+    single ``IN`` query scoped to the caller, each item is validated against
+    that preloaded mapping, and valid rows are written with ``bulk_create`` in
+    batches inside one transaction. Invalid items are reported by index and do
+    not prevent the valid ones from being stored. A single object body falls
+    through to the regular create.
+
+    :ivar bulk_batch_size: Number of rows per INSERT statement.
+    :type bulk_batch_size: int
+    :ivar bulk_max_items: Maximum number of items accepted in one request.
+    :type bulk_max_items: int
+    """
+    bulk_batch_size = 500
+    bulk_max_items = 5000
+
+    def is_bulk_request(self, request):
+        return request.method == 'POST' and isinstance(request.data, list)
+
+    def get_query_budget(self, request):
+        budget = super().get_query_budget(request)
+        if budget is None or not self.is_bulk_request(request):
+            return budget
+        # один запрос на проверку питомцев + по INSERT на пачку
+        count = len(request.data)
+        return budget + ceil(count / self.get_bulk_batch_size(count))
+
+    def get_bulk_batch_size(self, count):
+        """
+        Returns the rows per INSERT actually used by ``bulk_create``, which the
+        database backend may lower below ``bulk_batch_size`` (e.g. SQLite's
+        limit on query parameters).
+        """
+        model = self.get_serializer_class().Meta.model
+        fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+        ops = connections[router.db_for_write(model)].ops
+        return max(1, min(self.bulk_batch_size, ops.bulk_batch_size(fields, range(count))))
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        return self.bulk_create(request.data)
+
+    def bulk_create(self, items):
+        if not items:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of items.']})
+        if len(items) > self.bulk_max_items:
+            raise ValidationError({
+                'non_field_errors': [f'No more than {self.bulk_max_items} items are accepted per request.']
+            })
+
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        context['pets'] = self.get_bulk_pets(items)
+
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({'index': index, 'errors': {'non_field_errors': ['Expected an object.']}})
+                continue
+            serializer = serializer_class(data=item, context=context)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+
+        model = serializer_class.Meta.model
+        objs = [model(**validated_data) for validated_data in valid]
+        if objs:
+            with transaction.atomic():
+                model.objects.bulk_create(objs, batch_size=self.bulk_batch_size)
+                # bulk_create не отправляет post_save
+                activities_bulk_created.send(sender=model, objs=objs, owner=self.request.user)
+
+        return Response(
+            {
+                'created': serializer_class(objs, many=True, context=context).data,
+                'errors': errors,
+            },
+            status=status.HTTP_201_CREATED if objs else status.HTTP_400_BAD_REQUEST,
+        )
+
+    def get_bulk_pets(self, items):
+        """
+        Loads every pet referenced by ``items`` that belongs to the caller.
+        """
+        pet_ids = set()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                pet_ids.add(int(item.get('pet')))
+            except (TypeError, ValueError):
+                continue
+        if not pet_ids:
+            return {}
+        return Pet.objects.filter(owner=self.request.user).in_bulk(pet_ids)
+
+
+class CachedListMixin:
+    """
+    Caches serialized list responses per owner.
+
+    The cache key embeds the owner's data version (see :mod:`pet.cache`), which
+    is bumped whenever one of the owner's pets, activities, appointments or
+    documents is saved or deleted, so a cached list is never served after the
+    underlying data changed. Staff users, who see every owner's pets, bypass
+    the cache.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if request.user.is_staff:
+            return super().list(request, *args, **kwargs)
+
+        key = list_cache.get_list_cache_key(request, type(self).__name__)
+        data = list_cache.cache.get(key)
+        if data is not None:
+            list_cache.record_hit()
+            return Response(data)
+
+        list_cache.record_miss()
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            list_cache.cache.set(key, response.data, list_cache.get_timeout())
+        return response
+
+
+class ConditionalListMixin:
+    """
+    Answers repeated list requests with ``304 Not Modified``.
+
+    The validator is computed with one aggregate query over the filtered
+    queryset, ``Max(updated_at)`` and ``Count(pk)``, before anything is
+    loaded or serialized. The count catches deletions, which leave no
+    ``updated_at`` behind; ``Last-Modified`` also takes the owner's last
+    deletion time into account (see :func:`pet.cache.record_owner_deletion`).
+
+    The validator itself is cached under the owner's data version (see
+    :mod:`pet.cache`), so the aggregate only runs after the owner's data
+    changed. Like the cached lists, this relies on a cache shared by every
+    worker (see :mod:`PetLink.checks`): otherwise a worker that did not see
+    the version bump keeps answering ``304`` for data that has changed.
+
+    Place the mixin before :class:`CachedListMixin` so a matching request
+    never reaches the list cache either.
+
+    :ivar last_modified_field: Timestamp field bumped on every change.
+    :type last_modified_field: str
+    """
+    last_modified_field = 'updated_at'
+
+    def get_validator_extra(self):
+        """
+        Returns anything besides the rows that changes the representation.
+        """
+        return ''
+
+    def get_list_validator(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        state = queryset.aggregate(last_modified=Max(self.last_modified_field), count=Count('pk'))
+
+        last_modified = state['last_modified']
+        deleted_at = list_cache.get_owner_deleted_at(request.user.pk)
+        if deleted_at is not None:
+            deleted_at = datetime.fromtimestamp(deleted_at, tz=dt_timezone.utc)
+            last_modified = max(last_modified, deleted_at) if last_modified else deleted_at
+
+        fingerprint = '|'.join([
+            str(request.user.pk),
+            request.get_full_path(),
+            request.headers.get('Accept', ''),
+            last_modified.isoformat() if last_modified else '',
+            str(state['count']),
+            str(self.get_validator_extra()),
+        ])
+        # Слабый ETag: тело может быть сжато или перекодировано по пути
+        etag = f'W/"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+        return etag, last_modified
+
+    def get_cached_list_validator(self, request):
+        if request.user.is_staff:
+            return self.get_list_validator(request)
+        key = list_cache.get_list_cache_key(request, f'{type(self).__name__}:validator:{self.get_validator_extra()}')
+        validator = list_cache.cache.get(key)
+        if validator is None:
+            validator = self.get_list_validator(request)
+            list_cache.cache.set(key, validator, list_cache.get_timeout())
+        return validator
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_cached_list_validator(request)
+        # HTTP-даты с точностью до секунды
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            # Ответ зависит от пользователя: кешировать можно только клиенту
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization', 'Cookie'])
+        return response
+
+
+class SparseFieldsListMixin:
+    """
+    Adds ``?fields=`` sparse fieldsets to a list view and serializes from
+    ``values()`` rows when possible.
+
+    ``?fields=id,date,notes`` limits both the response and the SELECT column
+    list (see :class:`pet.serializers.SparseFieldsMixin`). When every
+    remaining field is a plain column, the page is fetched with
+    ``values()`` and rendered without instantiating models or running
+    field-by-field ``to_representation`` over model attributes.
+
+    Place it after the caching mixins so cached and 304 responses skip it.
+
+    :ivar fields_query_param: Name of the query parameter listing the fields.
+    :type fields_query_param: str
+    """
+    fields_query_param = 'fields'
+
+    def get_requested_fields(self):
+        if self.request.method not in SAFE_METHODS:
+            return None
+        value = self.request.query_params.get(self.fields_query_param, '')
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        return names or None
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_requested_fields()
+        return context
+
+    def get_ordering_columns(self):
+        # Курсор пагинации строится из полей сортировки
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        return {field.lstrip('-') for field in ordering}
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+
+        plan = serializer.get_values_plan()
+        if plan is not None:
+            columns = {column for name, column, converter in plan} | self.get_ordering_columns()
+            rows = queryset.values(*columns)
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(serializer.values_representation(page, plan))
+            return Response(serializer.values_representation(rows, plan))
+
+        columns = serializer.get_select_columns()
+        if columns is not None:
+            columns |= self.get_ordering_columns()
+            related = {column.split('__')[0] for column in columns if '__' in column}
+            # select_related несовместим с отложенной загрузкой связанной записи
+            queryset = queryset.select_related(None)
+            if related:
+                queryset = queryset.select_related(*related)
+            queryset = queryset.only(*columns)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
@@ -1,7 +1,85 @@
-from datetime import date
+import uuid
+from datetime import date, datetime, timedelta
 
+from dateutil.relativedelta import relativedelta
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .storage import get_blob_storage
+
+
+def format_age(total_months: int) -> str:
+    """
+    Formats an age given in whole months.
+    - If the pet is under 1 year old, age is shown in months.
+    - If the pet is 1 year or older, age is shown in years and months.
+    """
+    if total_months < 12:
+        return f"{total_months} months"
+    years = total_months // 12
+    months = total_months % 12
+    if months == 0:
+        return f"{years} years"
+    return f"{years} years and {months} months"
+
+
+def medication_dose_times(day, start, frequency):
+    """
+    Returns the aware due times of ``frequency`` doses spread evenly over the
+    24 hours starting at ``day`` and ``start``. A non-positive frequency
+    counts as a single dose.
+    """
+    first = timezone.make_aware(datetime.combine(day, start))
+    frequency = max(frequency or 1, 1)
+    interval = timedelta(days=1) / frequency
+    return [first + interval * index for index in range(frequency)]
+
+
+class PetQuerySet(models.QuerySet):
+    """
+    QuerySet for pets with age computed by the database.
+
+    Age is expressed in whole months since ``birth_date``, counted the same way
+    as :attr:`Pet.age`, so that pets can be filtered and sorted by age without
+    loading every row into Python.
+    """
+
+    def with_age(self, today=None):
+        """
+        Annotates each pet with ``age_in_months`` computed in SQL.
+        """
+        today = today or date.today()
+        months = (
+            (today.year - ExtractYear('birth_date')) * 12
+            + (today.month - ExtractMonth('birth_date'))
+        )
+        # Месяц ещё не исполнился, если день рождения позже сегодняшнего числа
+        not_yet = models.Case(
+            models.When(birth_date__day__gt=today.day, then=models.Value(1)),
+            default=models.Value(0),
+        )
+        return self.annotate(
+            age_in_months=models.ExpressionWrapper(months - not_yet, output_field=models.IntegerField())
+        )
+
+    def filter_age(self, min_months=None, max_months=None, today=None):
+        """
+        Filters pets by age in months (both bounds inclusive).
+
+        The bounds are translated into an exact ``birth_date`` range, so the
+        filter is served by the ``birth_date`` index instead of evaluating the
+        age expression for every row.
+        """
+        today = today or date.today()
+        queryset = self
+        if min_months is not None:
+            queryset = queryset.filter(birth_date__lte=today - relativedelta(months=min_months))
+        if max_months is not None:
+            queryset = queryset.filter(birth_date__gt=today - relativedelta(months=max_months + 1))
+        return queryset
+
 
 class Pet(models.Model):
     """
@@ -23,45 +101,74 @@ class Pet(models.Model):
     :type breed: CharField
     :ivar birth_date: The pet's date of birth.
     :type birth_date: DateField
+    :ivar photo_variants: Resized copies of the photo generated in the
+        background, see :mod:`pet.images`.
+    :type photo_variants: JSONField
+    :ivar photo_job_attempts: Number of times a worker started generating
+        the variants of the current photo.
+    :type photo_job_attempts: IntegerField
+    :ivar photo_job_started_at: When the running variants job started, or
+        ``None`` when no job is running.
+    :type photo_job_started_at: DateTimeField
+    :ivar updated_at: Timestamp of the last change, used to validate
+        conditional requests.
+    :type updated_at: DateTimeField
     """
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='pets'
     )
-    photo = models.ImageField(upload_to='pets_photo/', blank=True)
+    photo = models.ImageField(upload_to='pets_photo/', blank=True, storage=get_blob_storage)
 
     name = models.CharField(max_length=100)
     species = models.CharField(max_length=50, help_text="e.g., Dog, Cat, Hamster")
     breed = models.CharField(max_length=50, blank=True, null=True)
     birth_date = models.DateField()
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)
+    photo_job_attempts = models.IntegerField(default=0, editable=False)
+    photo_job_started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PetQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Pet'
         verbose_name_plural = 'Pets'
+        indexes = [
+            models.Index(fields=['birth_date'], name='pet_pet_birth_date'),
+        ]
 
-    @property
-    def age(self) -> str:
+    def months_since_birth(self) -> int:
         """
-        Calculates the pet's age dynamically based on its birth date.
-        - If the pet is under 1 year old, age is shown in months.
-        - If the pet is 1 year or older, age is shown in years and months.
+        Returns the pet's age in whole months, preferring the value annotated
+        by :meth:`PetQuerySet.with_age` when it is available.
         """
+        annotated = getattr(self, 'age_in_months', None)
+        if annotated is not None:
+            return annotated
+
         today = date.today()
         total_months = (today.year - self.birth_date.year) * 12 + (today.month - self.birth_date.month)
 
         # Adjust for the day of the month
         if today.day < self.birth_date.day:
             total_months -= 1
+        return total_months
+
+    @property
+    def age(self) -> str:
+        """
+        Calculates the pet's age dynamically based on its birth date.
+        - If the pet is under 1 year old, age is shown in months.
+        - If the pet is 1 year or older, age is shown in years and months.
+        """
+        return format_age(self.months_since_birth())
 
-        if total_months < 12:
-            return f"{total_months} months"
-        else:
-            years = total_months // 12
-            months = total_months % 12
-            if months == 0:
-                return f"{years} years"
-            return f"{years} years and {months} months"
+    def save(self, *args, **kwargs):
+        # Файл сохраняется (pet.storage) и учитывается (pet.blobs) в одной транзакции
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.name} ({self.species})"
@@ -85,16 +192,29 @@ class Appointment(models.Model):
         :type appointment_date: date
         :ivar appointment_time: The time at which the appointment is scheduled.
         :type appointment_time: time
+        :ivar updated_at: Timestamp of the last change, used by the reminder scheduler.
+        :type updated_at: datetime
         """
     pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name='appointments')
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     appointment_date = models.DateField()
     appointment_time = models.TimeField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Appointment'
         verbose_name_plural = 'Appointments'
+        indexes = [
+            models.Index(fields=['pet', 'appointment_date', 'appointment_time'], name='pet_appointment_pet_date_time'),
+            # Диапазонные выборки планировщика напоминаний по всем питомцам
+            models.Index(fields=['appointment_date', 'appointment_time'], name='pet_appointment_date_time'),
+            models.Index(fields=['updated_at'], name='pet_appointment_updated_at'),
+        ]
+
+    @property
+    def starts_at(self):
+        return timezone.make_aware(datetime.combine(self.appointment_date, self.appointment_time))
 
     def __str__(self):
         return f"Appointment for {self.pet.name} on {self.appointment_date.strftime('%d-%m-%Y')} at {self.appointment_time.strftime('%H:%M')}"
@@ -131,10 +251,19 @@ class BaseActivity(models.Model):
 
     class Meta:
         abstract = True  # Базовая модель, не создаёт таблицу в базе данных
+        indexes = [
+            # Покрывает фильтр по питомцу и сортировку ленты (date, time)
+            models.Index(fields=['pet', 'date', 'time'], name='%(app_label)s_%(class)s_pet_date_time'),
+        ]
 
     def __str__(self):
         return f"{self.day} for activity id {self.activity_log.id}"
 
+    def save(self, *args, **kwargs):
+        # Сигналы обновляют сводки в той же транзакции, что и саму запись
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 class Medication(BaseActivity):
     """
     Represents a medication associated with a pet's treatment plan.
@@ -159,9 +288,22 @@ class Medication(BaseActivity):
     dosage = models.CharField(max_length=50)  # Дозировка
     frequency = models.IntegerField(default=1)  # Как часто нужно принимать (количество раз в день)
 
+    class Meta(BaseActivity.Meta):
+        indexes = BaseActivity.Meta.indexes + [
+            models.Index(fields=['date', 'time'], name='pet_medication_date_time'),
+            models.Index(fields=['updated_at'], name='pet_medication_updated_at'),
+        ]
+
     def __str__(self):
         return f"{self.medication_name} для {self.pet.name} ({self.date})"
 
+    def dose_times(self):
+        """
+        Returns the due times of the doses of this record: ``frequency`` doses
+        spread evenly over 24 hours, starting at ``date`` and ``time``.
+        """
+        return medication_dose_times(self.date, self.time, self.frequency)
+
 
 class Feeding(BaseActivity):
     """
@@ -234,21 +376,23 @@ class PetDocument(models.Model):
         related_name="documents"
     )
 
-    file = models.FileField(upload_to="pet_documents/")
+    file = models.FileField(upload_to="pet_documents/", storage=get_blob_storage)
     title = models.CharField(
         max_length=150,
         help_text="For example: VET passport, Blood test, Vaccination"
     )
 
+    DOCUMENT_TYPE_CHOICES = [
+        ("passport", "Passport"),
+        ("vaccination", "Vaccination"),
+        ("analysis", "Medical Analysis"),
+        ("insurance", "Insurance"),
+        ("other", "Other"),
+    ]
+
     document_type = models.CharField(
         max_length=50,
-        choices=[
-            ("passport", "Passport"),
-            ("vaccination", "Vaccination"),
-            ("analysis", "Medical Analysis"),
-            ("insurance", "Insurance"),
-            ("other", "Other"),
-        ],
+        choices=DOCUMENT_TYPE_CHOICES,
         default="other"
     )
 
@@ -259,5 +403,288 @@ class PetDocument(models.Model):
         verbose_name_plural = "Pet Documents"
         ordering = ["-uploaded_at"]
 
+    def save(self, *args, **kwargs):
+        # Файл сохраняется (pet.storage) и учитывается (pet.blobs) в одной транзакции
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
     def str(self):
-        return f"{self.title} – {self.pet.name}"
\ No newline at end of file
+        return f"{self.title} – {self.pet.name}"
+
+
+class PetExport(models.Model):
+    """
+    Represents a background export of a pet's full history.
+
+    An export collects every medication, feeding, walk and appointment of a pet
+    together with the metadata of its documents into a single gzip-compressed
+    NDJSON or CSV file. The file is produced off the request thread; clients
+    poll the export's status and download the file once it is done.
+
+    :ivar pet: The pet whose history is exported.
+    :type pet: ForeignKey
+    :ivar requested_by: The user who requested the export.
+    :type requested_by: ForeignKey
+    :ivar format: Output format, either NDJSON or CSV.
+    :type format: CharField
+    :ivar status: Current state of the export job.
+    :type status: CharField
+    :ivar file: The finished, gzip-compressed export file.
+    :type file: FileField
+    :ivar row_count: Number of rows written to the file.
+    :type row_count: IntegerField
+    :ivar error: Error message if the export failed.
+    :type error: TextField
+    :ivar attempts: Number of times a worker started the export.
+    :type attempts: IntegerField
+    :ivar created_at: Timestamp indicating when the export was requested.
+    :type created_at: DateTimeField
+    :ivar started_at: Timestamp of the latest start, used to detect exports
+        whose worker died, see :func:`pet.exports.recover_exports`.
+    :type started_at: DateTimeField
+    :ivar finished_at: Timestamp indicating when the export finished.
+    :type finished_at: DateTimeField
+    """
+    FORMAT_NDJSON = 'ndjson'
+    FORMAT_CSV = 'csv'
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name='exports')
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='pet_exports'
+    )
+    format = models.CharField(
+        max_length=10,
+        choices=[(FORMAT_NDJSON, 'NDJSON'), (FORMAT_CSV, 'CSV')],
+        default=FORMAT_NDJSON
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=[
+            (STATUS_PENDING, 'Pending'),
+            (STATUS_RUNNING, 'Running'),
+            (STATUS_DONE, 'Done'),
+            (STATUS_FAILED, 'Failed'),
+        ],
+        default=STATUS_PENDING
+    )
+    file = models.FileField(upload_to='pet_exports/', blank=True)
+    row_count = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Pet Export'
+        verbose_name_plural = 'Pet Exports'
+        ordering = ['-created_at']
+        indexes = [
+            # Поиск потерянных и устаревших заданий
+            models.Index(fields=['status', 'created_at'], name='pet_export_status_created'),
+        ]
+
+    def __str__(self):
+        return f"Export of {self.pet.name} ({self.format}, {self.status})"
+
+
+class DocumentUpload(models.Model):
+    """
+    Represents a resumable, chunked upload of a pet document in progress.
+
+    The client declares the file up front, then appends chunks at explicit
+    offsets; the bytes go straight to a temporary file on disk whose size is
+    the authoritative upload offset, so an interrupted transfer resumes where
+    it stopped. The ``PetDocument`` row is created only when the upload is
+    finalized, see :mod:`pet.uploads`.
+
+    :ivar id: Random identifier of the upload, used in its URL.
+    :type id: UUIDField
+    :ivar pet: The pet the document will be linked to.
+    :type pet: ForeignKey
+    :ivar owner: The user performing the upload.
+    :type owner: ForeignKey
+    :ivar title: Title of the future document.
+    :type title: CharField
+    :ivar document_type: Type of the future document.
+    :type document_type: CharField
+    :ivar filename: Original name of the uploaded file.
+    :type filename: CharField
+    :ivar size: Total size of the file in bytes, declared by the client.
+    :type size: BigIntegerField
+    :ivar created_at: Timestamp indicating when the upload was started.
+    :type created_at: DateTimeField
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name='document_uploads')
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='document_uploads'
+    )
+    title = models.CharField(max_length=150)
+    document_type = models.CharField(
+        max_length=50,
+        choices=PetDocument.DOCUMENT_TYPE_CHOICES,
+        default="other"
+    )
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Document Upload'
+        verbose_name_plural = 'Document Uploads'
+
+    def __str__(self):
+        return f"Upload of {self.filename} for {self.pet.name}"
+
+
+class StoredBlob(models.Model):
+    """
+    Reference count of a file kept in the content-addressed storage.
+
+    Photos, photo variants and documents are stored under the SHA-256 digest
+    of their content, so several rows may point at the same file. Each such
+    reference increments ``ref_count``; when the last referencing row goes
+    away the blob row and the file are deleted, see :mod:`pet.blobs`.
+
+    :ivar name: Storage name of the file.
+    :type name: CharField
+    :ivar ref_count: Number of references to the file.
+    :type ref_count: IntegerField
+    :ivar created_at: Timestamp indicating when the file was first referenced.
+    :type created_at: DateTimeField
+    """
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Stored Blob'
+        verbose_name_plural = 'Stored Blobs'
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+class MedicationDose(models.Model):
+    """
+    Materialized daily dose schedule of a pet's medication course.
+
+    One row per pet, medication name and day of the course (from the first to
+    the last logged dose). ``expected`` is the ``frequency`` of the
+    :class:`Medication` records of the latest logged day on or before that
+    day (the highest one if they differ), ``taken`` the number of records
+    logged on that day. Rows are maintained from the medication log, see
+    :mod:`pet.adherence`, and never edited directly.
+
+    :ivar pet: The pet taking the medication.
+    :type pet: ForeignKey
+    :ivar medication_name: Name of the medication, as logged.
+    :type medication_name: CharField
+    :ivar date: Day of the schedule.
+    :type date: DateField
+    :ivar expected: Number of doses prescribed for the day.
+    :type expected: IntegerField
+    :ivar taken: Number of doses logged for the day.
+    :type taken: IntegerField
+    """
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name='medication_doses')
+    medication_name = models.CharField(max_length=100)
+    date = models.DateField()
+    expected = models.IntegerField(default=0)
+    taken = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Medication Dose'
+        verbose_name_plural = 'Medication Doses'
+        constraints = [
+            models.UniqueConstraint(fields=['pet', 'medication_name', 'date'], name='pet_medicationdose_unique_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.medication_name} для {self.pet_id} ({self.date}): {self.taken}/{self.expected}"
+
+
+class ActivityRollup(models.Model):
+    """
+    Number of activities of one type logged for a pet on one day.
+
+    Kept up to date in the same transaction as the activity rows themselves
+    (see :mod:`pet.rollups`), so dashboards read per-day counts without
+    scanning the activity tables.
+
+    :ivar pet: The pet the activities belong to.
+    :type pet: ForeignKey
+    :ivar date: Day of the activities.
+    :type date: DateField
+    :ivar activity_type: One of ``'medication'``, ``'feeding'`` or ``'walk'``.
+    :type activity_type: CharField
+    :ivar count: Number of activities logged on that day.
+    :type count: IntegerField
+    """
+    ACTIVITY_TYPE_CHOICES = [
+        ('medication', 'Medication'),
+        ('feeding', 'Feeding'),
+        ('walk', 'Walk'),
+    ]
+
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name='activity_rollups')
+    date = models.DateField()
+    activity_type = models.CharField(max_length=20, choices=ACTIVITY_TYPE_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Activity Rollup'
+        verbose_name_plural = 'Activity Rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['pet', 'date', 'activity_type'], name='pet_activityrollup_unique_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.activity_type} для {self.pet_id} ({self.date}): {self.count}"
+
+
+class SentReminder(models.Model):
+    """
+    A reminder that has been delivered.
+
+    The reminder scheduler (:mod:`pet.reminders`) records every reminder it
+    delivers before sending it, so a reminder is never sent twice, and after
+    a restart it delivers the overdue reminders that have no row here.
+    Rows older than the replay window are deleted by the scheduler.
+
+    :ivar kind: ``'appointment'`` or ``'medication'``.
+    :type kind: CharField
+    :ivar object_id: Primary key of the appointment or medication.
+    :type object_id: BigIntegerField
+    :ivar due_at: When the reminder was due.
+    :type due_at: DateTimeField
+    :ivar sent_at: Timestamp indicating when the reminder was delivered.
+    :type sent_at: DateTimeField
+    """
+    kind = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    due_at = models.DateTimeField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Sent Reminder'
+        verbose_name_plural = 'Sent Reminders'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id', 'due_at'], name='pet_sentreminder_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['due_at'], name='pet_sentreminder_due_at'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} ({self.due_at})"
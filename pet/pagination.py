@@ -0,0 +1,286 @@
+import base64
+import binascii
+import heapq
+import json
+from collections import OrderedDict
+from itertools import islice
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import models
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (a.k.a. seek) pagination over a composite ordering.
+
+    Unlike DRF's ``CursorPagination``, which only seeks on the first ordering
+    field and falls back to an offset for ties, this paginator encodes the full
+    ordering tuple of the boundary row in the cursor and translates it into a
+    ``(a < A) OR (a = A AND b < B) OR ...`` filter. The cost of fetching a page
+    therefore stays constant no matter how deep the client pages, provided an
+    index covers the ordering columns.
+
+    :ivar ordering: Ordering fields, all in the same direction. The last field
+        must be unique (usually ``id``) so that positions are unambiguous.
+    :type ordering: tuple[str]
+    :ivar page_size: Default number of rows returned per page.
+    :type page_size: int
+    :ivar max_page_size: Upper bound for the ``page_size`` query parameter.
+    :type max_page_size: int
+    """
+    ordering = ('-id',)
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async variant of :meth:`paginate_queryset` for async views.
+        """
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page([obj async for obj in queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Returns the (unevaluated) queryset of the requested page plus one row,
+        which tells whether another page follows.
+        """
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.field_names = [field.lstrip('-') for field in self.ordering]
+
+        cursor = self.decode_cursor(request, queryset.model)
+        self.reverse = cursor[1] if cursor else False
+        self.has_cursor = cursor is not None
+        if cursor:
+            queryset = queryset.filter(self.get_keyset_filter(cursor[0], self.reverse))
+        return queryset.order_by(*self.get_ordering(self.reverse))[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_cursor
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith('-') else '-' + field
+            for field in self.ordering
+        )
+
+    def get_keyset_filter(self, position, reverse=False):
+        """
+        Builds the filter selecting rows strictly after ``position`` in the
+        (possibly reversed) ordering.
+        """
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            descending = field.startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            clause = Q(**{f'{self.field_names[index]}__{lookup}': position[index]})
+            for name, value in zip(self.field_names[:index], position[:index]):
+                clause &= Q(**{name: value})
+            condition |= clause
+        return condition
+
+    def get_position(self, item):
+        if isinstance(item, dict):
+            return [item[name] for name in self.field_names]
+        return [getattr(item, name) for name in self.field_names]
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            return self.parse_position(payload['p'], model), bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError, binascii.Error,
+                FieldDoesNotExist, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_position(self, values, model):
+        return [
+            model._meta.get_field(name).to_python(value)
+            for name, value in zip(self.field_names, values, strict=True)
+        ]
+
+    def encode_cursor(self, position, reverse=False):
+        payload = {'p': [self._encode_value(value) for value in position]}
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('ascii')
+        ).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def _encode_value(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class ActivityCursorPagination(KeysetPagination):
+    """
+    Pagination for activity logs (medications, feedings, walks), newest first.
+
+    Backed by the ``(pet_id, date, time)`` indexes declared on ``BaseActivity``.
+    """
+    ordering = ('-date', '-time', '-id')
+
+
+class TimelinePagination(KeysetPagination):
+    """
+    Keyset pagination over several activity sources merged into one stream.
+
+    Every source is queried with the same cursor, ordered by its own
+    ``(date, time, id)`` index and limited to one page, and the resulting
+    cursors are k-way merged with ``heapq.merge``. A page therefore costs one
+    small indexed query per source and never loads whole tables into memory.
+
+    Rows are ordered by ``(date, time, kind, id)``, newest first; ``kind``
+    breaks ties between sources that share a timestamp.
+    """
+    ordering = ('-date', '-time', '-kind', '-id')
+    position_fields = (models.DateField(), models.TimeField(), models.CharField(), models.BigIntegerField())
+
+    def paginate_sources(self, sources, request, view=None):
+        """
+        Paginates a list of :class:`TimelineSource` and returns ``(kind, obj)``
+        pairs for the current page.
+        """
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.field_names = [field.lstrip('-') for field in self.ordering]
+
+        cursor = self.decode_cursor(request, None)
+        reverse = cursor[1] if cursor else False
+        streams = [
+            source.stream(cursor[0] if cursor else None, reverse, self.page_size + 1)
+            for source in sources
+        ]
+        merged = heapq.merge(*streams, key=lambda entry: entry[0], reverse=not reverse)
+
+        self.reverse, self.has_cursor = reverse, cursor is not None
+        results = self.set_page(list(islice(merged, self.page_size + 1)))
+        return [(position[2], obj) for position, obj in results]
+
+    def parse_position(self, values, model):
+        return [
+            field.to_python(value)
+            for field, value in zip(self.position_fields, values, strict=True)
+        ]
+
+    def get_position(self, item):
+        return list(item[0])
+
+
+class TimelineSource:
+    """
+    A single model contributing rows to the merged timeline.
+
+    :ivar kind: Label of the source, also used as a tie-breaker in the ordering.
+    :type kind: str
+    :ivar queryset: Rows of this source, already scoped to one pet.
+    :type queryset: QuerySet
+    :ivar date_field: Name of the model's date column.
+    :type date_field: str
+    :ivar time_field: Name of the model's time column.
+    :type time_field: str
+    """
+
+    def __init__(self, kind, queryset, date_field='date', time_field='time'):
+        self.kind = kind
+        self.queryset = queryset
+        self.date_field = date_field
+        self.time_field = time_field
+
+    def get_keyset_filter(self, position, reverse):
+        date, time, kind, pk = position
+        lookup = 'gt' if reverse else 'lt'
+        condition = (
+            Q(**{f'{self.date_field}__{lookup}': date})
+            | Q(**{self.date_field: date, f'{self.time_field}__{lookup}': time})
+        )
+        # Rows sharing the cursor's timestamp are ordered by (kind, id).
+        if self.kind == kind:
+            condition |= Q(**{self.date_field: date, self.time_field: time, f'pk__{lookup}': pk})
+        elif (self.kind > kind) == reverse:
+            condition |= Q(**{self.date_field: date, self.time_field: time})
+        return condition
+
+    def stream(self, position, reverse, limit):
+        """
+        Yields ``(position, obj)`` pairs in timeline order, at most ``limit`` rows.
+        """
+        queryset = self.queryset
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position, reverse))
+        prefix = '' if reverse else '-'
+        queryset = queryset.order_by(
+            prefix + self.date_field, prefix + self.time_field, prefix + 'pk'
+        )
+        for obj in queryset[:limit]:
+            key = (getattr(obj, self.date_field), getattr(obj, self.time_field), self.kind, obj.pk)
+            yield key, obj
@@ -0,0 +1,94 @@
+from datetime import date
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import Feeding, Medication, Walk
+
+# Журналы активностей, разбитые на месячные секции по date
+# (на PostgreSQL, см. миграцию 0017_partition_activity_tables)
+PARTITIONED_MODELS = [Medication, Feeding, Walk]
+
+
+def add_months(month, count):
+    years, month_index = divmod(month.month - 1 + count, 12)
+    return date(month.year + years, month_index + 1, 1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y_%m}'
+
+
+def is_partitioned(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [table])
+        return cursor.fetchone() is not None
+
+
+def existing_partitions(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [table],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def create_partition(connection, table, month):
+    """
+    Creates the partition of ``table`` for ``month``.
+
+    Rows of that month that were inserted before the partition existed sit in
+    the ``DEFAULT`` partition, and PostgreSQL refuses to create an overlapping
+    partition while they are there. In that case the partition is built as a
+    plain table, the rows are moved into it and it is attached afterwards.
+    """
+    name = partition_name(table, month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    default = f'{table}_default'
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {default} WHERE "date" >= %s AND "date" < %s)', [start, end])
+        if not cursor.fetchone()[0]:
+            cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} {bounds}")
+            return
+
+        cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {default} WHERE "date" >= %s AND "date" < %s RETURNING *) '
+            f'INSERT INTO {name} SELECT * FROM moved',
+            [start, end],
+        )
+        # Индексы и внешние ключи родителя PostgreSQL создаст на секции сам
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} {bounds}")
+
+
+def ensure_partitions(months_ahead=None, today=None, using=DEFAULT_DB_ALIAS):
+    """
+    Makes sure every partitioned activity table has partitions from the
+    current month up to ``months_ahead`` months ahead
+    (``ACTIVITY_PARTITIONS_AHEAD`` by default). Returns the names of the
+    partitions created; does nothing on databases other than PostgreSQL or
+    before the tables are partitioned.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return []
+    if months_ahead is None:
+        months_ahead = settings.ACTIVITY_PARTITIONS_AHEAD
+    this_month = (today or date.today()).replace(day=1)
+
+    created = []
+    for model in PARTITIONED_MODELS:
+        table = model._meta.db_table
+        if not is_partitioned(connection, table):
+            continue
+        existing = existing_partitions(connection, table)
+        for offset in range(months_ahead + 1):
+            month = add_months(this_month, offset)
+            if partition_name(table, month) not in existing:
+                create_partition(connection, table, month)
+                created.append(partition_name(table, month))
+    return created
@@ -0,0 +1,28 @@
+import logging
+
+from .exports import recover_exports, run_export
+from .images import generate_photo_variants, recover_photo_variants
+from .tasks import run_in_background
+
+logger = logging.getLogger(__name__)
+
+
+def recover_lost_jobs(run=run_in_background):
+    """
+    Queues again the background jobs lost by a restarted process.
+
+    Jobs run in an in-process thread pool, so a killed or recycled worker
+    loses the jobs it had queued; their rows stay behind as the record of
+    what is left to do. Called when a gunicorn worker starts and by
+    ``manage.py recover_jobs``. ``run`` receives ``(func, *args)``; it
+    defaults to the thread pool. Returns the number of jobs queued.
+    """
+    export_ids = recover_exports()
+    for export_id in export_ids:
+        run(run_export, export_id)
+    pet_ids = recover_photo_variants()
+    for pet_id in pet_ids:
+        run(generate_photo_variants, pet_id)
+    if export_ids or pet_ids:
+        logger.info('Re-queued %d lost exports and %d photo variant jobs', len(export_ids), len(pet_ids))
+    return len(export_ids) + len(pet_ids)
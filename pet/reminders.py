@@ -0,0 +1,351 @@
+import heapq
+import itertools
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import IntegrityError, close_old_connections, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Appointment, Medication, Pet, SentReminder, medication_dose_times
+
+logger = logging.getLogger(__name__)
+
+# Sent after a reminder has been delivered.
+# Arguments: sender (Appointment or Medication), reminder (a Reminder).
+reminder_due = Signal()
+
+KIND_APPOINTMENT = 'appointment'
+KIND_MEDICATION = 'medication'
+
+# Перекрытие водяного знака: строки, сохранённые незадолго до обновления,
+# но закоммиченные после него, не должны потеряться
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+@dataclass(frozen=True)
+class Reminder:
+    """
+    A single reminder waiting in the scheduler.
+
+    :ivar kind: ``'appointment'`` or ``'medication'``.
+    :type kind: str
+    :ivar object_id: Primary key of the appointment or medication.
+    :type object_id: int
+    :ivar pet_id: The pet the reminder is about.
+    :type pet_id: int
+    :ivar owner_id: The owner to remind.
+    :type owner_id: int
+    :ivar label: Appointment or medication name.
+    :type label: str
+    :ivar occurs_at: When the appointment starts or the dose is due.
+    :type occurs_at: datetime
+    :ivar due_at: When the reminder fires (``occurs_at`` minus the lead time).
+    :type due_at: datetime
+    """
+    kind: str
+    object_id: int
+    pet_id: int
+    owner_id: int
+    label: str
+    occurs_at: datetime
+    due_at: datetime
+
+    @property
+    def key(self):
+        return self.kind, self.object_id
+
+
+class ReminderScheduler:
+    """
+    In-process scheduler firing appointment and medication reminders.
+
+    Instead of scanning both tables every minute, the scheduler keeps the
+    reminders due within ``horizon`` in a min-heap ordered by due time and
+    sleeps until the earliest one:
+
+    * the window is loaded with indexed range queries on
+      ``(appointment_date, appointment_time)`` and ``(date, time)`` and is
+      extended incrementally as time passes;
+    * rows changed since the last refresh are found through the ``updated_at``
+      indexes and replace their previous entries (stale heap entries are
+      skipped lazily when popped);
+    * right before firing, the row is re-read by primary key, so reminders of
+      rows deleted or moved in the meantime are dropped.
+
+    The scheduler runs in its own process (``manage.py runreminders``), so it
+    learns about rows changed by the web workers only by polling every
+    ``refresh_interval``; a reminder of a changed row that became due since
+    the previous poll fires late rather than never.
+
+    Reminders are emailed to the owner (:func:`deliver_reminder`) and recorded
+    in :class:`pet.models.SentReminder`, so none is delivered twice. On start
+    the window reaches ``replay`` into the past: reminders missed while the
+    scheduler was down, or whose delivery failed, are delivered right away.
+
+    :ivar horizon: How far ahead reminders are loaded into the heap.
+    :type horizon: timedelta
+    :ivar appointment_lead: How long before an appointment its reminder fires.
+    :type appointment_lead: timedelta
+    :ivar refresh_interval: Maximum time between two checks for changed rows.
+    :type refresh_interval: timedelta
+    :ivar replay: How far back undelivered reminders are still delivered.
+    :type replay: timedelta
+    """
+
+    def __init__(self, horizon=None, appointment_lead=None, refresh_interval=None, replay=None):
+        config = getattr(settings, 'REMINDERS', {})
+        self.horizon = horizon or timedelta(seconds=config.get('HORIZON', 6 * 3600))
+        self.appointment_lead = appointment_lead or timedelta(seconds=config.get('APPOINTMENT_LEAD', 3600))
+        self.refresh_interval = refresh_interval or timedelta(seconds=config.get('REFRESH_INTERVAL', 60))
+        self.replay = replay or timedelta(seconds=config.get('REPLAY', 24 * 3600))
+
+        self.heap = []
+        self.live = {}  # (kind, pk) -> {due_at: Reminder} актуальных записей
+        self.counter = itertools.count()
+        self.loaded_until = None
+        self.watermark = None
+        self.fired = 0
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    # Загрузка окна
+
+    def load(self, now=None):
+        """
+        (Re)loads every reminder due between ``now - replay`` and
+        ``now + horizon``; the overdue ones that were not delivered yet fire
+        on the next :meth:`run_pending`.
+        """
+        now = now or timezone.now()
+        with self._lock:
+            self.heap.clear()
+            self.live.clear()
+            # Водяной знак берём до выборки: изменения во время загрузки не потеряются
+            self.watermark = now
+            self._extend(now - self.replay, now + self.horizon)
+
+    def _extend(self, start, end):
+        """
+        Adds the reminders due in ``(start, end]`` and moves ``loaded_until``.
+        """
+        for reminder in self.fetch_appointments(start, end):
+            self._push(reminder)
+        for reminder in self.fetch_medications(start, end):
+            self._push(reminder)
+        self.loaded_until = end
+
+    def fetch_appointments(self, start, end, queryset=None):
+        """
+        Yields appointment reminders due in ``(start, end]``.
+        """
+        first, last = start + self.appointment_lead, end + self.appointment_lead
+        if queryset is None:
+            queryset = Appointment.objects.filter(
+                appointment_date__gte=timezone.localdate(first),
+                appointment_date__lte=timezone.localdate(last),
+            )
+        rows = queryset.values(
+            'id', 'pet_id', 'pet__owner_id', 'name', 'appointment_date', 'appointment_time'
+        )
+        for row in rows.iterator():
+            occurs_at = timezone.make_aware(datetime.combine(row['appointment_date'], row['appointment_time']))
+            due_at = occurs_at - self.appointment_lead
+            if start < due_at <= end:
+                yield Reminder(
+                    KIND_APPOINTMENT, row['id'], row['pet_id'], row['pet__owner_id'],
+                    row['name'], occurs_at, due_at,
+                )
+
+    def fetch_medications(self, start, end, queryset=None):
+        """
+        Yields medication dose reminders due in ``(start, end]``.
+        """
+        if queryset is None:
+            # Дозы записи распределены по 24 часам, поэтому захватываем и предыдущий день
+            queryset = Medication.objects.filter(
+                date__gte=timezone.localdate(start) - timedelta(days=1),
+                date__lte=timezone.localdate(end),
+            )
+        rows = queryset.values(
+            'id', 'pet_id', 'pet__owner_id', 'medication_name', 'date', 'time', 'frequency'
+        )
+        for row in rows.iterator():
+            for due_at in medication_dose_times(row['date'], row['time'], row['frequency']):
+                if start < due_at <= end:
+                    yield Reminder(
+                        KIND_MEDICATION, row['id'], row['pet_id'], row['pet__owner_id'],
+                        row['medication_name'], due_at, due_at,
+                    )
+
+    def _push(self, reminder):
+        self.live.setdefault(reminder.key, {})[reminder.due_at] = reminder
+        heapq.heappush(self.heap, (reminder.due_at, next(self.counter), reminder))
+
+    # Инкрементальное обновление
+
+    def refresh(self, now=None):
+        """
+        Extends the window to ``now + horizon``, applies rows changed since
+        the previous refresh and forgets deliveries older than ``replay``.
+        """
+        now = now or timezone.now()
+        with self._lock:
+            if self.loaded_until is None:
+                self.watermark = self.loaded_until = now
+            if now + self.horizon > self.loaded_until:
+                self._extend(self.loaded_until, now + self.horizon)
+            self._apply_changes(now)
+        SentReminder.objects.filter(due_at__lt=now - self.replay).delete()
+
+    def _apply_changes(self, now):
+        since, self.watermark = self.watermark - WATERMARK_OVERLAP, now
+        changes = (
+            (KIND_APPOINTMENT, self.fetch_appointments,
+             Appointment.objects.filter(updated_at__gt=since)),
+            (KIND_MEDICATION, self.fetch_medications,
+             Medication.objects.filter(updated_at__gt=since)),
+        )
+        for kind, fetch, queryset in changes:
+            changed_ids = set(queryset.values_list('id', flat=True))
+            if not changed_ids:
+                continue
+            for object_id in changed_ids:
+                # Старые записи в куче станут «мёртвыми» и будут пропущены
+                self.live.pop((kind, object_id), None)
+            # С прошлого опроса: напоминание, срок которого уже прошёл, сработает с опозданием
+            for reminder in fetch(since, self.loaded_until, queryset.filter(id__in=changed_ids)):
+                self._push(reminder)
+
+    def stop(self):
+        self._stopped.set()
+
+    # Срабатывание
+
+    def pop_due(self, now=None):
+        """
+        Removes and returns the live reminders due at or before ``now``.
+        """
+        now = now or timezone.now()
+        due = []
+        with self._lock:
+            while self.heap and self.heap[0][0] <= now:
+                due_at, _, reminder = heapq.heappop(self.heap)
+                entries = self.live.get(reminder.key)
+                if not entries or entries.get(due_at) is not reminder:
+                    continue
+                del entries[due_at]
+                if not entries:
+                    del self.live[reminder.key]
+                due.append(reminder)
+        return due
+
+    def next_due_at(self):
+        with self._lock:
+            return self.heap[0][0] if self.heap else None
+
+    def is_current(self, reminder):
+        """
+        Checks that the row behind ``reminder`` still exists and is still due
+        at the same time.
+        """
+        if reminder.kind == KIND_APPOINTMENT:
+            fetch, model = self.fetch_appointments, Appointment
+        else:
+            fetch, model = self.fetch_medications, Medication
+        queryset = model.objects.filter(pk=reminder.object_id)
+        window_start = reminder.due_at - timedelta(microseconds=1)
+        return any(
+            current.due_at == reminder.due_at
+            for current in fetch(window_start, reminder.due_at, queryset)
+        )
+
+    def fire(self, reminder):
+        """
+        Delivers ``reminder`` unless it was delivered before and sends
+        :data:`reminder_due`. Returns whether it was delivered.
+        """
+        try:
+            with transaction.atomic():
+                # Запись до отправки: уникальный ключ не даёт отправить напоминание дважды
+                SentReminder.objects.create(kind=reminder.kind, object_id=reminder.object_id, due_at=reminder.due_at)
+                deliver_reminder(reminder)
+        except IntegrityError:
+            return False
+        except Exception:
+            # Запись откатилась: напоминание будет доставлено при следующем запуске
+            logger.exception('Could not deliver reminder for %s %s', reminder.kind, reminder.object_id)
+            return False
+
+        logger.info('Reminder for owner %s: %s %r at %s',
+                    reminder.owner_id, reminder.kind, reminder.label, reminder.occurs_at)
+        sender = Appointment if reminder.kind == KIND_APPOINTMENT else Medication
+        try:
+            reminder_due.send(sender=sender, reminder=reminder)
+        except Exception:
+            logger.exception('Reminder receiver failed for %s %s', reminder.kind, reminder.object_id)
+        self.fired += 1
+        return True
+
+    def run_pending(self, now=None):
+        """
+        Fires every reminder due at or before ``now``; returns how many fired.
+        """
+        fired = 0
+        for reminder in self.pop_due(now):
+            if self.is_current(reminder) and self.fire(reminder):
+                fired += 1
+        return fired
+
+    def run(self):
+        """
+        Runs the scheduler until :meth:`stop` is called.
+        """
+        self.load()
+        next_refresh = timezone.now() + self.refresh_interval
+        while not self._stopped.is_set():
+            close_old_connections()
+            now = timezone.now()
+            if now >= next_refresh:
+                self.refresh(now)
+                next_refresh = now + self.refresh_interval
+            self.run_pending(now)
+
+            wake_at = next_refresh
+            next_due = self.next_due_at()
+            if next_due is not None:
+                wake_at = min(wake_at, next_due)
+            timeout = max((wake_at - timezone.now()).total_seconds(), 0)
+            # Просыпаемся по сроку, к следующему опросу или по остановке
+            self._stopped.wait(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': sum(len(entries) for entries in self.live.values()),
+                'heap_size': len(self.heap),
+                'loaded_until': self.loaded_until,
+                'fired': self.fired,
+            }
+
+
+def deliver_reminder(reminder):
+    """
+    Emails ``reminder`` to the pet's owner; owners without an email address
+    or with a deactivated account are skipped.
+    """
+    pet = Pet.objects.filter(pk=reminder.pet_id).values('name', 'owner__email', 'owner__is_active').first()
+    if pet is None or not pet['owner__email'] or not pet['owner__is_active']:
+        return
+    occurs_at = timezone.localtime(reminder.occurs_at).strftime('%Y-%m-%d %H:%M')
+    if reminder.kind == KIND_APPOINTMENT:
+        subject = f"{pet['name']}: {reminder.label} at {occurs_at}"
+        message = f"Reminder: {pet['name']} has an appointment, {reminder.label}, on {occurs_at}."
+    else:
+        subject = f"{pet['name']}: {reminder.label} due at {occurs_at}"
+        message = f"Reminder: a dose of {reminder.label} for {pet['name']} is due at {occurs_at}."
+    send_mail(subject, message, None, [pet['owner__email']])
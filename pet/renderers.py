@@ -0,0 +1,60 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+# Типы, которые orjson и msgpack не знают (Decimal, lazy-строки, UUID, ...),
+# кодируются так же, как в стандартном JSONRenderer
+_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``application/json`` renderer backed by orjson.
+
+    Produces the same output as DRF's :class:`JSONRenderer`: dates and
+    datetimes are passed through to DRF's encoder so their format does not
+    change, and so are all types orjson does not serialize natively. Requests
+    for indented output (``Accept: application/json; indent=4``, the browsable
+    API) and installs without orjson fall back to the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data,
+            default=_encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders responses as MessagePack (``Accept: application/msgpack``).
+
+    Meant for the mobile app: payloads are smaller than JSON and cheaper to
+    decode. Values are encoded like in :class:`ORJSONRenderer`, so dates and
+    decimals arrive as the same strings as in JSON.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encoder.default, use_bin_type=True, datetime=False)
+
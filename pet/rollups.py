@@ -0,0 +1,132 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F
+
+from .models import ActivityRollup, Feeding, Medication, Walk
+
+# Модели активностей и их тип в сводках
+ACTIVITY_TYPES = {
+    Medication: 'medication',
+    Feeding: 'feeding',
+    Walk: 'walk',
+}
+
+BACKFILL_BATCH_SIZE = 1000
+# Ключей в одном INSERT: 4 параметра на строку, с запасом до лимитов драйверов
+UPSERT_BATCH_SIZE = 200
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Adds ``deltas`` (a mapping of ``(pet_id, date, activity_type)`` to a
+    change in count) to the rollups.
+
+    Increments are written with a single ``INSERT ... ON CONFLICT DO UPDATE``
+    where the database supports it, so counting the first activity of a day
+    costs no more than the following ones. Decrements only ever touch
+    existing rows. Call inside the transaction that changed the activities.
+    """
+    increments = {key: delta for key, delta in deltas.items() if delta > 0}
+    decrements = {key: delta for key, delta in deltas.items() if delta < 0}
+
+    if increments:
+        upsert_increments(increments)
+    for (pet_id, day, activity_type), delta in decrements.items():
+        ActivityRollup.objects.filter(pet_id=pet_id, date=day, activity_type=activity_type).update(
+            count=F('count') + delta
+        )
+
+
+def upsert_increments(increments):
+    connection = connections[router.db_for_write(ActivityRollup)]
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        for (pet_id, day, activity_type), delta in increments.items():
+            updated = ActivityRollup.objects.filter(pet_id=pet_id, date=day, activity_type=activity_type).update(
+                count=F('count') + delta
+            )
+            if not updated:
+                ActivityRollup.objects.create(pet_id=pet_id, date=day, activity_type=activity_type, count=delta)
+        return
+
+    quote = connection.ops.quote_name
+    table = quote(ActivityRollup._meta.db_table)
+    fields = [ActivityRollup._meta.get_field(name) for name in ('pet', 'date', 'activity_type', 'count')]
+    columns = ', '.join(quote(field.column) for field in fields)
+    key_columns = ', '.join(quote(field.column) for field in fields[:3])
+    count = quote(fields[3].column)
+
+    items = list(increments.items())
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), UPSERT_BATCH_SIZE):
+            batch = items[start:start + UPSERT_BATCH_SIZE]
+            params = []
+            for (pet_id, day, activity_type), delta in batch:
+                params += [pet_id, fields[1].get_db_prep_value(day, connection), activity_type, delta]
+            rows = ', '.join(['(%s, %s, %s, %s)'] * len(batch))
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) VALUES {rows} '
+                f'ON CONFLICT ({key_columns}) DO UPDATE SET {count} = {table}.{count} + excluded.{count}',
+                params,
+            )
+
+
+def count_activities(objs, activity_type):
+    """
+    Returns the rollup increments for newly created ``objs``.
+    """
+    return Counter((obj.pet_id, obj.date, activity_type) for obj in objs)
+
+
+def backfill_rollups(pet_ids=None):
+    """
+    Recomputes the rollups from the activity tables with one grouped query
+    per activity type. Returns the number of rollup rows written.
+    """
+    rollups = ActivityRollup.objects.all()
+    if pet_ids is not None:
+        rollups = rollups.filter(pet_id__in=pet_ids)
+
+    written = 0
+    with transaction.atomic():
+        rollups.delete()
+        for model, activity_type in ACTIVITY_TYPES.items():
+            activities = model.objects.all()
+            if pet_ids is not None:
+                activities = activities.filter(pet_id__in=pet_ids)
+            rows = activities.values_list('pet_id', 'date').annotate(count=Count('id')).order_by()
+            batch = []
+            for pet_id, day, count in rows.iterator():
+                batch.append(ActivityRollup(pet_id=pet_id, date=day, activity_type=activity_type, count=count))
+                if len(batch) >= BACKFILL_BATCH_SIZE:
+                    ActivityRollup.objects.bulk_create(batch)
+                    written, batch = written + len(batch), []
+            ActivityRollup.objects.bulk_create(batch)
+            written += len(batch)
+    return written
+
+
+def daily_activity_stats(pet, start, end, activity_types=None):
+    """
+    Returns per-day activity counts of a pet between ``start`` and ``end``
+    (inclusive), read from the rollups only. Days without activity are
+    included with zero counts.
+    """
+    activity_types = list(activity_types or ACTIVITY_TYPES.values())
+    rows = ActivityRollup.objects.filter(
+        pet=pet, date__gte=start, date__lte=end, activity_type__in=activity_types,
+    ).values_list('date', 'activity_type', 'count')
+    counts = {(day, activity_type): count for day, activity_type, count in rows}
+
+    days = []
+    totals = dict.fromkeys(activity_types, 0)
+    day = start
+    while day <= end:
+        entry = {'date': day}
+        for activity_type in activity_types:
+            entry[activity_type] = counts.get((day, activity_type), 0)
+            totals[activity_type] += entry[activity_type]
+        days.append(entry)
+        day += timedelta(days=1)
+    return days, totals
@@ -0,0 +1,218 @@
+import re
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from .models import Appointment, Feeding, Medication, PetDocument, Walk
+
+# Конфигурация без стемминга: заметки пишут и на русском, и на английском.
+# Должна совпадать с выражением GIN-индексов из миграции 0015_search_indexes.
+SEARCH_CONFIG = 'simple'
+
+# (kind, model, searchable text, fields for the LIKE fallback)
+SEARCH_SOURCES = [
+    ('medication', Medication, "{t}medication_name || ' ' || {t}notes", ('medication_name', 'notes')),
+    ('feeding', Feeding, "{t}food_type || ' ' || {t}notes", ('food_type', 'notes')),
+    ('walk', Walk, "{t}notes", ('notes',)),
+    ('appointment', Appointment, "{t}name || ' ' || {t}description", ('name', 'description')),
+    ('document', PetDocument, "{t}title", ('title',)),
+]
+
+SEARCH_MODELS = {kind: model for kind, model, text, fields in SEARCH_SOURCES}
+
+# rowid строки pet_search = id * 8 + код источника (порядковый номер в SEARCH_SOURCES)
+SEARCH_CODES = {kind: code for code, (kind, model, text, fields) in enumerate(SEARCH_SOURCES, start=1)}
+
+_fts_tables = {}
+
+
+def search(user, query, pet_id=None, limit=20):
+    """
+    Full-text searches the free text of the user's pets and returns
+    ``(kind, object_id, score)`` tuples, best match first.
+
+    Uses ``tsvector`` GIN indexes on PostgreSQL and the ``pet_search`` FTS5
+    table on SQLite (both created by migration ``0015_search_indexes``).
+    Other databases fall back to an unranked ``icontains`` scan.
+    """
+    connection = connections[router.db_for_read(Medication)]
+    if connection.vendor == 'postgresql':
+        return search_postgresql(connection, user, query, pet_id, limit)
+    if connection.vendor == 'sqlite' and has_fts_table(connection):
+        return search_sqlite(connection, user, query, pet_id, limit)
+    return search_fallback(user, query, pet_id, limit)
+
+
+def search_postgresql(connection, user, query, pet_id, limit):
+    tsquery = tsquery_text(query)
+    if not tsquery:
+        return []
+    pet_table = connection.ops.quote_name('pet_pet')
+    selects, params = [], []
+    for kind, model, text, fields in SEARCH_SOURCES:
+        table = connection.ops.quote_name(model._meta.db_table)
+        document = f"to_tsvector('{SEARCH_CONFIG}', {text.format(t='s.')})"
+        pet_filter = ' AND s.pet_id = %s' if pet_id is not None else ''
+        selects.append(
+            f"SELECT '{kind}' AS kind, s.id, ts_rank({document}, q.query) AS score "
+            f"FROM {table} s JOIN {pet_table} p ON p.id = s.pet_id "
+            f"CROSS JOIN to_tsquery('{SEARCH_CONFIG}', %s) q(query) "
+            f"WHERE p.owner_id = %s{pet_filter} AND {document} @@ q.query"
+        )
+        params += [tsquery, user.pk] + ([pet_id] if pet_id is not None else [])
+
+    sql = ' UNION ALL '.join(selects) + ' ORDER BY score DESC, kind, id DESC LIMIT %s'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit])
+        return cursor.fetchall()
+
+
+def search_sqlite(connection, user, query, pet_id, limit):
+    match = fts5_query(query)
+    if not match:
+        return []
+    pet_filter = ' AND pet_id = %s' if pet_id is not None else ''
+    params = [match, user.pk] + ([pet_id] if pet_id is not None else []) + [limit]
+    with connection.cursor() as cursor:
+        # bm25() тем меньше, чем лучше совпадение
+        cursor.execute(
+            f"SELECT kind, object_id, -bm25(pet_search) AS score FROM pet_search "
+            f"WHERE pet_search MATCH %s "
+            f"AND pet_id IN (SELECT id FROM pet_pet WHERE owner_id = %s){pet_filter} "
+            f"ORDER BY bm25(pet_search) LIMIT %s",
+            params,
+        )
+        return cursor.fetchall()
+
+
+def fts5_query(query):
+    """
+    Turns free user input into an FTS5 query: every word must match, the
+    last one as a prefix. Quoting the words keeps FTS5 operators inert.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def tsquery_text(query):
+    """
+    The PostgreSQL counterpart of :func:`fts5_query`, for ``to_tsquery``:
+    only word characters are kept, so tsquery operators in the input are
+    inert.
+    """
+    words = re.findall(r'\w+', query.lower())
+    if not words:
+        return ''
+    words[-1] += ':*'
+    return ' & '.join(words)
+
+
+def has_fts_table(connection):
+    if connection.alias not in _fts_tables:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pet_search'")
+            _fts_tables[connection.alias] = cursor.fetchone() is not None
+    return _fts_tables[connection.alias]
+
+
+def search_fallback(user, query, pet_id, limit):
+    results = []
+    for kind, model, text, fields in SEARCH_SOURCES:
+        queryset = model.objects.filter(pet__owner=user)
+        if pet_id is not None:
+            queryset = queryset.filter(pet_id=pet_id)
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__icontains': query})
+        ids = queryset.filter(condition).order_by('-id').values_list('id', flat=True)[:limit]
+        results += [(kind, object_id, 0.0) for object_id in ids]
+    return results[:limit]
+
+
+def load_results(hits):
+    """
+    Loads the objects behind ``hits`` with one query per kind and returns
+    ``(kind, obj, score)`` in the original order; rows deleted in between
+    are skipped.
+    """
+    ids_by_kind = {}
+    for kind, object_id, score in hits:
+        ids_by_kind.setdefault(kind, []).append(object_id)
+    objects = {
+        kind: SEARCH_MODELS[kind].objects.in_bulk(ids)
+        for kind, ids in ids_by_kind.items()
+    }
+    return [
+        (kind, objects[kind][object_id], score)
+        for kind, object_id, score in hits
+        if object_id in objects[kind]
+    ]
+
+
+def ensure_search_indexes(using='default'):
+    """
+    Recreates the search indexes of migration ``0015_search_indexes`` that
+    have gone missing and returns the sources that were repaired.
+
+    The SQLite triggers keeping ``pet_search`` in sync are raw SQL Django's
+    migration state knows nothing about: a migration that rebuilds one of the
+    tables (SQLite alters most columns by copying the table) drops them
+    silently and the index stops following the table. Run after every
+    ``migrate`` (see :mod:`pet.signals`), this recreates missing triggers and
+    reindexes their source, as rows written without them are missing from
+    the index. On PostgreSQL missing GIN indexes are created again.
+    """
+    connection = connections[using]
+    repaired = []
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for kind, model, text, fields in SEARCH_SOURCES:
+                table = model._meta.db_table
+                cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = %s", [f'{table}_search'])
+                if cursor.fetchone() is None:
+                    cursor.execute(
+                        f"CREATE INDEX IF NOT EXISTS {table}_search ON {table} "
+                        f"USING GIN (to_tsvector('{SEARCH_CONFIG}', {text.format(t='')}))"
+                    )
+                    repaired.append(kind)
+        return repaired
+    if connection.vendor != 'sqlite':
+        return repaired
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = set(cursor.fetchall())
+    if ('table', 'pet_search') not in existing:
+        return repaired
+
+    for kind, model, text, fields in SEARCH_SOURCES:
+        table, code = model._meta.db_table, SEARCH_CODES[kind]
+        if all(('trigger', f'{table}_search_{event}') in existing for event in ('insert', 'update', 'delete')):
+            continue
+        new_text = text.format(t='new.')
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO pet_search (rowid, kind, object_id, pet_id, body) "
+                f"VALUES (new.id * 8 + {code}, '{kind}', new.id, new.pet_id, {new_text}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE ON {table} BEGIN "
+                f"UPDATE pet_search SET pet_id = new.pet_id, body = {new_text} "
+                f"WHERE rowid = old.id * 8 + {code}; END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN "
+                f"DELETE FROM pet_search WHERE rowid = old.id * 8 + {code}; END"
+            )
+            cursor.execute("DELETE FROM pet_search WHERE kind = %s", [kind])
+            cursor.execute(
+                f"INSERT INTO pet_search (rowid, kind, object_id, pet_id, body) "
+                f"SELECT id * 8 + {code}, '{kind}', id, pet_id, {text.format(t='')} FROM {table}"
+            )
+        repaired.append(kind)
+    return repaired
@@ -1,8 +1,140 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Pet, Medication, Feeding, Walk, Appointment, PetDocument
+from .models import Pet, Medication, Feeding, Walk, Appointment, PetDocument, PetExport, DocumentUpload
+from .uploads import get_offset
 
 
-class PetSerializer(serializers.ModelSerializer):
+class OwnedPetField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key reference to one of the requesting user's pets.
+
+    When the serializer context carries a preloaded ``pets`` mapping
+    (``{pk: Pet}``), the pet is looked up there instead of querying the
+    database, which lets bulk endpoints validate many rows with a single
+    ``IN`` query.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('queryset', Pet.objects.all())
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.context.get('request')
+        if request is None:
+            return queryset
+        return queryset.filter(owner=request.user)
+
+    def to_internal_value(self, data):
+        pets = self.context.get('pets')
+        if pets is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pet = pets.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pet is None:
+            self.fail('does_not_exist', pk_value=data)
+        return pet
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin for sparse fieldsets and a ``values()`` fast path.
+
+    When the serializer context carries ``fields`` (an iterable of field
+    names, set by :class:`pet.mixins.SparseFieldsListMixin` from ``?fields=``),
+    every other field is dropped. The serializer can then tell which model
+    columns it still needs (:meth:`get_select_columns`) and, when all of its
+    fields are plain columns, render rows of ``QuerySet.values()`` directly
+    (:meth:`get_values_plan`, :meth:`values_representation`) without building
+    model instances.
+
+    :ivar field_sources: Model columns read by fields that are not model
+        fields themselves (method fields, properties), by field name.
+    :type field_sources: dict[str, list[str]]
+    """
+    field_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested is None:
+            return
+
+        unknown = set(requested) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': f"Unknown fields: {', '.join(sorted(unknown))}. "
+                          f"Available: {', '.join(self.fields)}."
+            })
+        for name in set(self.fields) - set(requested):
+            self.fields.pop(name)
+
+    def get_model_field(self, field):
+        try:
+            model_field = self.Meta.model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        return None if model_field.many_to_many or model_field.one_to_many else model_field
+
+    def get_select_columns(self):
+        """
+        Returns the model fields needed to render the current fields, or
+        ``None`` if that can not be determined.
+        """
+        columns = {self.Meta.model._meta.pk.name}
+        for name, field in self.fields.items():
+            if name in self.field_sources:
+                columns.update(self.field_sources[name])
+                continue
+            model_field = self.get_model_field(field)
+            if model_field is None:
+                return None
+            columns.add(model_field.name)
+        return columns
+
+    def get_values_plan(self):
+        """
+        Returns ``[(field name, column, converter)]`` when every field can be
+        rendered from a ``values()`` row, otherwise ``None``.
+        """
+        plan = []
+        for name, field in self.fields.items():
+            model_field = self.get_model_field(field)
+            if model_field is None or isinstance(field, (serializers.FileField, serializers.SerializerMethodField)):
+                return None
+            if isinstance(field, serializers.RelatedField):
+                if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+                    return None
+                # values() уже отдаёт первичный ключ связанной записи
+                converter = None
+            else:
+                converter = field.to_representation
+            plan.append((name, model_field.name, converter))
+        return plan
+
+    @staticmethod
+    def values_representation(rows, plan):
+        """
+        Renders ``values()`` rows the same way ``to_representation`` renders
+        model instances.
+        """
+        rendered = []
+        for row in rows:
+            item = {}
+            for name, column, converter in plan:
+                value = row[column]
+                item[name] = value if value is None or converter is None else converter(value)
+            rendered.append(item)
+        return rendered
+
+
+class PetSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializes Pet model instances.
 
@@ -13,11 +145,19 @@ class PetSerializer(serializers.ModelSerializer):
 
     """
     owner_name= serializers.SerializerMethodField()
+    age_months = serializers.SerializerMethodField()
+    photo_variants = serializers.SerializerMethodField()
+    field_sources = {
+        'owner_name': ['owner__first_name'],
+        'age': ['birth_date'],
+        'age_months': ['birth_date'],
+        'photo_variants': ['photo', 'photo_variants'],
+    }
 
     class Meta:
         model = Pet
-        fields = ['id', 'photo', 'name', 'species', 'breed', 'birth_date', 'age',
-                  'owner_name']  # owner будет возвращаться в ответах
+        fields = ['id', 'photo', 'photo_variants', 'name', 'species', 'breed', 'birth_date', 'age',
+                  'age_months', 'owner_name']  # owner будет возвращаться в ответах
         extra_kwargs = {
             'owner': {'read_only': True}  # Поле owner доступно только для чтения
         }
@@ -25,7 +165,29 @@ class PetSerializer(serializers.ModelSerializer):
     def get_owner_name(self, obj):
         return obj.owner.first_name if obj.owner else None
 
-class MedicationSerializer(serializers.ModelSerializer):
+    def get_photo_variants(self, obj):
+        """
+        Returns URLs of the resized photos, e.g. ``{"thumb": {"webp": ..., "jpeg": ...}}``.
+        Empty until the background job has generated them for the current photo.
+        """
+        photo_variants = obj.photo_variants or {}
+        if not obj.photo or photo_variants.get('source') != obj.photo.name:
+            return {}
+
+        request = self.context.get('request')
+        storage = obj.photo.storage
+        return {
+            name: {
+                format_name: request.build_absolute_uri(storage.url(path)) if request else storage.url(path)
+                for format_name, path in formats.items()
+            }
+            for name, formats in photo_variants.get('variants', {}).items()
+        }
+
+    def get_age_months(self, obj):
+        return obj.months_since_birth()  # берёт значение из аннотации with_age(), если есть
+
+class MedicationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializes Medication model instances.
 
@@ -34,11 +196,13 @@ class MedicationSerializer(serializers.ModelSerializer):
     that are included in the serialization process and specifies the model it
     is based on. It is built using Django REST framework's `ModelSerializer`.
     """
+    pet = OwnedPetField()
+
     class Meta:
         model = Medication
         fields = ['id', 'pet', 'date', 'time', 'notes', 'medication_name', 'dosage', 'frequency']
 
-class FeedingSerializer(serializers.ModelSerializer):
+class FeedingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializes Feeding model instances.
 
@@ -48,6 +212,8 @@ class FeedingSerializer(serializers.ModelSerializer):
     is based on. It is built using Django REST framework's `ModelSerializer`.
 
     """
+    pet = OwnedPetField()
+
     class Meta:
         model = Feeding
         fields = ['id', 'pet', 'date', 'time', 'notes', 'food_type', 'amount']
@@ -60,7 +226,7 @@ class FeedingSerializer(serializers.ModelSerializer):
             validated_data.pop('custom_field')  # Удалите его
         return Feeding.objects.create(**validated_data)
 
-class WalkSerializer(serializers.ModelSerializer):
+class WalkSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer class for Walk model.
 
@@ -69,11 +235,13 @@ class WalkSerializer(serializers.ModelSerializer):
     that are included in the serialization process and specifies the model it
     is based on. It is built using Django REST framework's `ModelSerializer`.
     """
+    pet = OwnedPetField()
+
     class Meta:
         model = Walk
         fields = ['id', 'pet', 'date', 'time', 'notes']
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Handles the serialization and deserialization of Appointment model instances.
 
@@ -81,11 +249,13 @@ class AppointmentSerializer(serializers.ModelSerializer):
     representations such as JSON. Useful for API serialization
     and ensuring data integrity.
     """
+    pet = OwnedPetField()
+
     class Meta:
         model = Appointment
         fields = ['id', 'pet', 'name', 'appointment_date', 'appointment_time']
 
-class PetDocumentSerializer(serializers.ModelSerializer):
+class PetDocumentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for PetDocument model.
 
@@ -98,4 +268,53 @@ class PetDocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = PetDocument
         fields = ['id', 'pet', 'file', 'title', 'document_type', 'uploaded_at']
-        read_only_fields = ['uploaded_at']
\ No newline at end of file
+        read_only_fields = ['pet', 'uploaded_at']  # питомец берётся из URL
+
+
+class DocumentUploadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for DocumentUpload model.
+
+    Declares a resumable document upload. ``offset`` is the number of bytes
+    received so far and tells the client where to resume.
+    """
+    offset = serializers.SerializerMethodField()
+    field_sources = {'offset': ['id']}
+
+    class Meta:
+        model = DocumentUpload
+        fields = ['id', 'pet', 'title', 'document_type', 'filename', 'size', 'offset', 'created_at']
+        read_only_fields = ['pet', 'created_at']
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('The file must not be empty.')
+        return value
+
+    def get_offset(self, obj):
+        return get_offset(obj)
+
+
+class PetExportSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for PetExport model.
+
+    Exposes the state of a pet history export job. Only the output format is
+    writable; everything else is filled in by the background job. Once the
+    export is done, ``download_url`` points at the compressed file.
+    """
+    download_url = serializers.SerializerMethodField()
+    field_sources = {'download_url': ['status']}
+
+    class Meta:
+        model = PetExport
+        fields = ['id', 'pet', 'format', 'status', 'row_count', 'error',
+                  'created_at', 'finished_at', 'download_url']
+        read_only_fields = ['pet', 'status', 'row_count', 'error', 'created_at', 'finished_at']
+
+    def get_download_url(self, obj):
+        if obj.status != PetExport.STATUS_DONE:
+            return None
+        url = reverse('pet-export-download', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
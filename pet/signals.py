@@ -0,0 +1,219 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .adherence import refresh_courses
+from .blobs import release_blob, retain_blob
+from .cache import bump_owner_version, record_owner_deletion
+from .rollups import ACTIVITY_TYPES, apply_rollup_deltas, count_activities
+from .images import generate_photo_variants, release_photo_variants
+from .models import Appointment, Feeding, Medication, Pet, PetDocument, PetExport, Walk
+from .partitions import ensure_partitions
+from .search import ensure_search_indexes
+from .tasks import run_in_background
+
+# Sent by BulkCreateMixin after bulk_create(), which bypasses post_save.
+# Arguments: sender (the model), objs (the created instances), owner (the user).
+activities_bulk_created = Signal()
+
+# Модели, изменение которых делает устаревшими закешированные списки владельца
+OWNER_SCOPED_MODELS = (Pet, Medication, Feeding, Walk, Appointment, PetDocument)
+
+# Поля моделей, файлы которых лежат в контентно-адресуемом хранилище
+BLOB_FIELDS = {
+    Pet: 'photo',
+    PetDocument: 'file',
+}
+
+
+@receiver(post_save, sender=Pet)
+def schedule_photo_variants(sender, instance, **kwargs):
+    """
+    Regenerates photo variants in the background whenever the photo changes.
+    """
+    source = (instance.photo_variants or {}).get('source')
+    current = instance.photo.name if instance.photo else None
+    if current != source:
+        run_in_background(generate_photo_variants, instance.pk)
+
+
+@receiver(pre_save, sender=Pet)
+@receiver(pre_save, sender=PetDocument)
+def remember_previous_blob(sender, instance, **kwargs):
+    """
+    Remembers which stored file the row referenced before this save.
+    """
+    field = BLOB_FIELDS[sender]
+    previous = None
+    if instance.pk is not None:
+        previous = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+    instance._previous_blob = previous or None
+
+
+@receiver(pre_save, sender=Pet)
+def reset_photo_job(sender, instance, **kwargs):
+    """
+    Starts the attempt count of the variants job over when the photo changes.
+    """
+    if (instance.photo.name or None) != instance._previous_blob:
+        instance.photo_job_attempts = 0
+        instance.photo_job_started_at = None
+
+
+@receiver(post_save, sender=Pet)
+@receiver(post_save, sender=PetDocument)
+def count_blob_references(sender, instance, **kwargs):
+    """
+    Moves the reference from the previously stored file to the current one.
+    """
+    current = getattr(instance, BLOB_FIELDS[sender]).name or None
+    previous = getattr(instance, '_previous_blob', None)
+    if current != previous:
+        retain_blob(current)
+        release_blob(previous)
+    instance._previous_blob = current
+
+
+@receiver(post_delete, sender=Pet)
+@receiver(post_delete, sender=PetDocument)
+def release_deleted_blobs(sender, instance, **kwargs):
+    """
+    Releases the files of a deleted row (and the photo variants of a pet).
+    """
+    release_blob(getattr(instance, BLOB_FIELDS[sender]).name or None)
+    if sender is Pet:
+        release_photo_variants(instance.photo_variants)
+
+
+@receiver(post_delete, sender=PetExport)
+def delete_export_file(sender, instance, **kwargs):
+    """
+    Deletes the file of a deleted export (expired, or removed with its pet)
+    once the deletion commits.
+    """
+    if instance.file:
+        name, storage = instance.file.name, instance.file.storage
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+def get_owner_id(instance):
+    if isinstance(instance, Pet):
+        return instance.owner_id
+    pet = instance._state.fields_cache.get('pet')
+    if pet is not None:
+        return pet.owner_id
+    return Pet.objects.filter(pk=instance.pet_id).values_list('owner_id', flat=True).first()
+
+
+def invalidate_owner_lists(sender, instance, **kwargs):
+    """
+    Bumps the owner's cache version so cached list responses are not reused.
+    """
+    bump_owner_version(get_owner_id(instance))
+
+
+def invalidate_owner_lists_after_delete(sender, instance, **kwargs):
+    owner_id = get_owner_id(instance)
+    bump_owner_version(owner_id)
+    record_owner_deletion(owner_id)
+
+
+for model in OWNER_SCOPED_MODELS:
+    post_save.connect(invalidate_owner_lists, sender=model, dispatch_uid=f'invalidate_owner_lists_save_{model.__name__}')
+    post_delete.connect(invalidate_owner_lists_after_delete, sender=model,
+                        dispatch_uid=f'invalidate_owner_lists_delete_{model.__name__}')
+
+
+@receiver(activities_bulk_created)
+def invalidate_owner_lists_after_bulk(sender, objs, owner, **kwargs):
+    bump_owner_version(owner.pk)
+
+
+@receiver(pre_save, sender=Medication)
+@receiver(pre_save, sender=Feeding)
+@receiver(pre_save, sender=Walk)
+def remember_previous_activity(sender, instance, **kwargs):
+    """
+    Remembers the pet, day (and medication name) the record had before this
+    save, in case it is moved to another day, pet or course.
+    """
+    previous = None
+    if instance.pk is not None:
+        fields = ['pet_id', 'date'] + (['medication_name'] if sender is Medication else [])
+        previous = sender.objects.filter(pk=instance.pk).values(*fields).first()
+    instance._previous_activity = previous
+
+
+@receiver(post_save, sender=Medication)
+@receiver(post_delete, sender=Medication)
+def refresh_dose_schedule(sender, instance, **kwargs):
+    """
+    Refreshes the materialized dose schedule of the affected courses.
+    """
+    if isinstance(kwargs.get('origin'), Pet):
+        # Удаление питомца: строки расписания удаляются каскадом
+        return
+    changes = {(instance.pet_id, instance.medication_name, instance.date)}
+    previous = getattr(instance, '_previous_activity', None)
+    if previous is not None:
+        changes.add((previous['pet_id'], previous['medication_name'], previous['date']))
+    run_in_background(refresh_courses, changes)
+
+
+@receiver(activities_bulk_created, sender=Medication)
+def refresh_dose_schedule_after_bulk(sender, objs, **kwargs):
+    run_in_background(refresh_courses, {(obj.pet_id, obj.medication_name, obj.date) for obj in objs})
+
+
+@receiver(post_save, sender=Medication)
+@receiver(post_save, sender=Feeding)
+@receiver(post_save, sender=Walk)
+def update_rollups(sender, instance, created, **kwargs):
+    """
+    Moves the activity between daily rollups; runs inside the save's transaction.
+    """
+    activity_type = ACTIVITY_TYPES[sender]
+    current = (instance.pet_id, instance.date, activity_type)
+    previous = getattr(instance, '_previous_activity', None)
+    if created or previous is None:
+        apply_rollup_deltas({current: 1})
+        return
+    previous = (previous['pet_id'], previous['date'], activity_type)
+    if previous != current:
+        apply_rollup_deltas({previous: -1, current: 1})
+
+
+@receiver(post_delete, sender=Medication)
+@receiver(post_delete, sender=Feeding)
+@receiver(post_delete, sender=Walk)
+def remove_from_rollups(sender, instance, **kwargs):
+    if isinstance(kwargs.get('origin'), Pet):
+        # Сводки питомца удаляются каскадом
+        return
+    apply_rollup_deltas({(instance.pet_id, instance.date, ACTIVITY_TYPES[sender]): -1})
+
+
+@receiver(activities_bulk_created)
+def update_rollups_after_bulk(sender, objs, **kwargs):
+    if sender in ACTIVITY_TYPES:
+        apply_rollup_deltas(count_activities(objs, ACTIVITY_TYPES[sender]))
+
+
+@receiver(post_migrate)
+def create_upcoming_partitions(sender, using, **kwargs):
+    """
+    Creates the upcoming monthly partitions of the activity tables after every
+    ``migrate``, so each deploy keeps them ahead of the calendar (PostgreSQL only).
+    """
+    if sender.name == 'pet':
+        ensure_partitions(using=using)
+
+
+@receiver(post_migrate)
+def repair_search_indexes(sender, using, **kwargs):
+    """
+    Recreates search triggers and indexes dropped by a later migration that
+    rebuilt one of the searched tables, see :func:`pet.search.ensure_search_indexes`.
+    """
+    if sender.name == 'pet':
+        ensure_search_indexes(using=using)
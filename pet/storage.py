@@ -0,0 +1,74 @@
+import hashlib
+import os
+import posixpath
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files after the SHA-256 digest of their content.
+
+    A file uploaded to ``pets_photo/кошка.jpg`` is stored as
+    ``pets_photo/<d[:2]>/<digest>.jpg``. Uploading the same bytes again maps to
+    the same name, so the existing file is reused instead of being written a
+    second time with a random suffix, and detecting a duplicate is a single
+    ``exists()`` check. How many rows reference a file is tracked separately
+    by :class:`pet.models.StoredBlob`, see :mod:`pet.blobs`.
+    """
+    digest_chunk_size = 64 * 1024
+
+    def __init__(self, **kwargs):
+        # Одинаковое содержимое — одинаковое имя: перезапись при гонке безопасна
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым в _save(), суффиксы не нужны
+        return name
+
+    def get_blob_name(self, name, digest):
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(directory, digest[:2], f'{digest}{extension}')
+
+    def compute_digest(self, content):
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks(self.digest_chunk_size):
+            sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def is_blob_name(self, name):
+        """
+        Returns whether ``name`` has the ``<dir>/<d[:2]>/<digest><ext>`` form
+        given by this storage (files saved before it was used do not).
+        """
+        digest, _ = os.path.splitext(posixpath.basename(name))
+        prefix = posixpath.basename(posixpath.dirname(name))
+        return (len(digest) == 64 and prefix == digest[:2]
+                and all(char in '0123456789abcdef' for char in digest))
+
+    def _save(self, name, content):
+        blob_name = self.get_blob_name(name, self.compute_digest(content))
+        with transaction.atomic():
+            # Файл без ссылок удаляется под блокировкой его строки StoredBlob
+            # (pet.blobs._delete_unreferenced): берём её до проверки exists(),
+            # вызывающий код учитывает ссылку в той же транзакции
+            StoredBlob = apps.get_model('pet', 'StoredBlob')
+            StoredBlob.objects.select_for_update().filter(name=blob_name).first()
+            if self.exists(blob_name):
+                return blob_name
+            if hasattr(content, 'seek'):
+                content.seek(0)
+            return super()._save(blob_name, content)
+
+
+def get_blob_storage():
+    return blob_storage
+
+
+blob_storage = ContentAddressedStorage()
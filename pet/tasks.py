@@ -0,0 +1,56 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns the process-wide thread pool used for background jobs.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_WORKERS', 2),
+                thread_name_prefix='petlink-background',
+            )
+        return _executor
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Runs ``func(*args, **kwargs)`` off the request thread once the current
+    transaction commits, so the job always sees the rows that scheduled it.
+    """
+    transaction.on_commit(lambda: get_executor().submit(_run, func, args, kwargs))
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Background job %s failed', getattr(func, '__name__', func))
+    finally:
+        # Соединения в потоках пула не закрываются Django автоматически
+        connections.close_all()
+
+
+def shutdown(wait=True):
+    """
+    Stops the thread pool; with ``wait`` the queued and running jobs are
+    finished first. Called when a gunicorn worker exits, so recycling a
+    worker does not drop its jobs.
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
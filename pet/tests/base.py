@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import token_cache
+from user.models import CustomUser
+from pet.models import Pet
+
+PASSWORD = 'correct-horse-battery'
+
+
+class PetLinkTestCase(TestCase):
+    """
+    Base test case with two owners, a pet each and an API client
+    authenticated with the first owner's token.
+
+    Caches are cleared before every test, so cached lists, validators and
+    token lookups never leak between tests.
+    """
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='owner@example.com', password=PASSWORD, first_name='Anna')
+        cls.other = CustomUser.objects.create_user(email='other@example.com', password=PASSWORD)
+        cls.token = Token.objects.create(user=cls.user)
+        cls.pet = Pet.objects.create(owner=cls.user, name='Rex', species='Dog', birth_date=date(2020, 5, 17))
+        cls.other_pet = Pet.objects.create(owner=cls.other, name='Tom', species='Cat', birth_date=date(2021, 1, 1))
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def token_client(self, user=None):
+        token, created = Token.objects.get_or_create(user=user or self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+    def session_client(self, user=None):
+        client = APIClient()
+        client.force_login(user or self.user)
+        return client
+
+
+class TemporaryMediaMixin:
+    """
+    Stores uploaded files, exports and upload temp files in a temporary
+    directory removed after the test class.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp(prefix='petlink-test-')
+        cls.media_settings = override_settings(
+            MEDIA_ROOT=cls.media_root,
+            DOCUMENT_UPLOAD_TEMP_DIR=f'{cls.media_root}/uploads',
+        )
+        cls.media_settings.enable()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root, ignore_errors=True)
+        cls.addClassCleanup(cls.media_settings.disable)
+        super().setUpClass()
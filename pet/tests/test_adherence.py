@@ -0,0 +1,93 @@
+from datetime import date, time
+from unittest import mock
+
+from pet.adherence import rebuild_dose_schedule
+from pet.models import Medication, MedicationDose
+from .base import PetLinkTestCase
+
+
+def run_now(func, *args, **kwargs):
+    func(*args, **kwargs)
+
+
+@mock.patch('pet.signals.run_in_background', run_now)
+class DoseScheduleTests(PetLinkTestCase):
+
+    def log(self, day, name='Pill', frequency=2, pet=None):
+        return Medication.objects.create(pet=pet or self.pet, medication_name=name, dosage='1 tablet',
+                                         frequency=frequency, date=day, time=time(9, 0))
+
+    def schedule(self, name='Pill'):
+        return list(MedicationDose.objects.filter(pet=self.pet, medication_name=name)
+                    .order_by('date').values_list('date', 'expected', 'taken'))
+
+    def assertMatchesRebuild(self):
+        schedule = self.schedule()
+        rebuild_dose_schedule([self.pet.pk])
+        self.assertEqual(schedule, self.schedule())
+
+    def test_gaps_between_logged_days_count_as_missed(self):
+        self.log(date(2024, 3, 1), frequency=2)
+        self.log(date(2024, 3, 1), frequency=2)
+        self.log(date(2024, 3, 4), frequency=3)
+
+        self.assertEqual(self.schedule(), [
+            (date(2024, 3, 1), 2, 2),
+            (date(2024, 3, 2), 2, 0),
+            (date(2024, 3, 3), 2, 0),
+            (date(2024, 3, 4), 3, 1),
+        ])
+        self.assertMatchesRebuild()
+
+    def test_only_the_days_around_a_change_are_recomputed(self):
+        for day in (1, 5, 10, 15):
+            self.log(date(2024, 3, day))
+        # Строки вне затронутого диапазона не должны перезаписываться
+        MedicationDose.objects.filter(date=date(2024, 3, 2)).update(taken=7)
+
+        self.log(date(2024, 3, 12), frequency=4)
+
+        schedule = dict((day, (expected, taken)) for day, expected, taken in self.schedule())
+        self.assertEqual(schedule[date(2024, 3, 2)], (2, 7))
+        self.assertEqual(schedule[date(2024, 3, 12)], (4, 1))
+        self.assertEqual(schedule[date(2024, 3, 13)], (4, 0))
+        self.assertEqual(schedule[date(2024, 3, 15)], (2, 1))
+
+    def test_removing_the_first_or_last_day_shrinks_the_course(self):
+        first = self.log(date(2024, 3, 1))
+        self.log(date(2024, 3, 3))
+        last = self.log(date(2024, 3, 6))
+
+        first.delete()
+        last.delete()
+
+        self.assertEqual(self.schedule(), [(date(2024, 3, 3), 2, 1)])
+        self.assertMatchesRebuild()
+
+    def test_moved_record_refreshes_both_courses(self):
+        self.log(date(2024, 3, 1))
+        moved = self.log(date(2024, 3, 4))
+
+        moved.medication_name = 'Drops'
+        moved.date = date(2024, 3, 8)
+        moved.save()
+
+        self.assertEqual(self.schedule(), [(date(2024, 3, 1), 2, 1)])
+        self.assertEqual(self.schedule('Drops'), [(date(2024, 3, 8), 2, 1)])
+
+    def test_bulk_created_records(self):
+        jobs = []
+        # Задание выполняется после ответа, как в фоновом пуле, и не входит в бюджет запросов
+        with mock.patch('pet.signals.run_in_background', lambda *job: jobs.append(job)):
+            response = self.client.post('/pets/medications/', [
+                {'pet': self.pet.pk, 'medication_name': 'Pill', 'dosage': '1', 'frequency': 1,
+                 'date': f'2024-03-0{day}', 'time': '09:00'}
+                for day in (1, 3)
+            ], format='json')
+        for job in jobs:
+            run_now(*job)
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(self.schedule(), [
+            (date(2024, 3, 1), 1, 1), (date(2024, 3, 2), 1, 0), (date(2024, 3, 3), 1, 1),
+        ])
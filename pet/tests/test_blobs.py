@@ -0,0 +1,126 @@
+import io
+import os
+from datetime import date
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from pet.models import Pet, StoredBlob
+from pet.storage import get_blob_storage
+from .base import PetLinkTestCase, TemporaryMediaMixin
+
+
+def jpeg(color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+PHOTO = jpeg()
+
+
+class BlobStorageTests(TemporaryMediaMixin, PetLinkTestCase):
+
+    def create_pet(self, content=PHOTO, name='Murka'):
+        pet = Pet(owner=self.user, name=name, species='Cat', birth_date=date(2020, 1, 1))
+        pet.photo.save('кошка.jpg', ContentFile(content), save=False)
+        pet.save()
+        return pet
+
+    def test_duplicate_uploads_share_one_file(self):
+        first = self.create_pet()
+        second = self.create_pet(name='Barsik')
+
+        self.assertEqual(first.photo.name, second.photo.name)
+        self.assertTrue(get_blob_storage().is_blob_name(first.photo.name))
+        self.assertEqual(StoredBlob.objects.get(name=first.photo.name).ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(get_blob_storage().exists(second.photo.name))
+        self.assertEqual(StoredBlob.objects.get(name=second.photo.name).ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(get_blob_storage().exists(second.photo.name))
+        self.assertFalse(StoredBlob.objects.filter(name=second.photo.name).exists())
+
+    def test_file_reused_before_delete_runs_is_kept(self):
+        pet = self.create_pet()
+        name = pet.photo.name
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            pet.delete()
+        # Тот же файл загружают снова, пока удаление ещё не выполнено
+        again = self.create_pet(name='Barsik')
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(again.photo.name, name)
+        self.assertTrue(get_blob_storage().exists(name))
+        self.assertEqual(StoredBlob.objects.get(name=name).ref_count, 1)
+
+    def test_uploaded_duplicates_are_counted(self):
+        for name in ('Murka', 'Barsik'):
+            response = self.client.post('/pets/pet-create/', {
+                'name': name, 'species': 'Cat', 'birth_date': '2020-01-01',
+                'photo': SimpleUploadedFile('кошка.jpg', PHOTO, 'image/jpeg'),
+            }, format='multipart')
+            self.assertEqual(response.status_code, 201, response.content)
+        name, = set(Pet.objects.exclude(photo='').values_list('photo', flat=True))
+        self.assertEqual(StoredBlob.objects.get(name=name).ref_count, 2)
+
+
+class MigrateLegacyFilesTests(TemporaryMediaMixin, PetLinkTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.storage = get_blob_storage()
+        # Файлы, сохранённые до content-addressed storage: дубликаты с суффиксами
+        for name in ('pets_photo/кошка.jpg', 'pets_photo/кошка_NqdrUgy.jpg', 'pets_photo/забытый.jpg'):
+            path = self.storage.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as handle:
+                handle.write(PHOTO)
+        Pet.objects.filter(pk=self.pet.pk).update(photo='pets_photo/кошка.jpg')
+        Pet.objects.filter(pk=self.other_pet.pk).update(photo='pets_photo/кошка_NqdrUgy.jpg')
+
+    def run_command(self, *args):
+        stdout = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('migrate_legacy_files', '--min-age', '0', *args, stdout=stdout, stderr=io.StringIO())
+        return stdout.getvalue()
+
+    def test_duplicates_are_merged_counted_and_collected(self):
+        output = self.run_command()
+
+        self.assertIn('Moved 2 legacy files referenced by 2 rows to 1 stored files.', output)
+        self.pet.refresh_from_db()
+        self.other_pet.refresh_from_db()
+        self.assertEqual(self.pet.photo.name, self.other_pet.photo.name)
+        self.assertTrue(self.storage.is_blob_name(self.pet.photo.name))
+        self.assertEqual(StoredBlob.objects.get(name=self.pet.photo.name).ref_count, 2)
+        self.assertTrue(self.storage.exists(self.pet.photo.name))
+        for name in ('pets_photo/кошка.jpg', 'pets_photo/кошка_NqdrUgy.jpg', 'pets_photo/забытый.jpg'):
+            self.assertFalse(self.storage.exists(name), name)
+
+    def test_running_again_changes_nothing(self):
+        self.run_command()
+        self.pet.refresh_from_db()
+
+        output = self.run_command()
+
+        self.assertIn('Moved 0 legacy files', output)
+        self.assertIn('Deleted 0 unreferenced files.', output)
+        self.assertEqual(StoredBlob.objects.get(name=self.pet.photo.name).ref_count, 2)
+
+    def test_dry_run_changes_nothing(self):
+        output = self.run_command('--dry-run')
+
+        self.assertIn('Dry run', output)
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.photo.name, 'pets_photo/кошка.jpg')
+        self.assertTrue(self.storage.exists('pets_photo/кошка_NqdrUgy.jpg'))
+        self.assertFalse(StoredBlob.objects.exists())
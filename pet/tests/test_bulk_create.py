@@ -0,0 +1,53 @@
+import json
+
+from pet.models import Feeding, Walk
+from .base import PetLinkTestCase
+
+
+class BulkCreateTests(PetLinkTestCase):
+
+    def feeding(self, pet=None, **extra):
+        return {'pet': (pet or self.pet).pk, 'date': '2024-01-01', 'time': '08:00',
+                'food_type': 'dry', 'amount': '100g', **extra}
+
+    def test_json_array_stores_valid_items_and_reports_invalid_ones(self):
+        items = [self.feeding(time=f'{hour:02d}:00') for hour in range(24)] * 50
+        items += [self.feeding(self.other_pet), {**self.feeding(), 'pet': 'abc'}, self.feeding(date='bad'), 5]
+
+        response = self.client.post('/pets/feedings/', items, format='json')
+
+        self.assertEqual(response.status_code, 201, response.content[:300])
+        self.assertEqual(len(response.json()['created']), 1200)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1200, 1201, 1202, 1203])
+        self.assertEqual(Feeding.objects.count(), 1200)
+
+    def test_ndjson_body(self):
+        line = json.dumps({'pet': self.pet.pk, 'date': '2024-01-02', 'time': '10:00'})
+        body = '\n'.join([line] * 3) + '\n\n'
+
+        response = self.client.post('/pets/walks/', body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Walk.objects.count(), 3)
+
+    def test_malformed_ndjson_is_rejected(self):
+        response = self.client.post('/pets/walks/', '{bad\n', content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Walk.objects.exists())
+
+    def test_empty_and_oversized_lists_are_rejected(self):
+        self.assertEqual(self.client.post('/pets/walks/', [], format='json').status_code, 400)
+
+        items = [{'pet': self.pet.pk, 'date': '2024-01-02', 'time': '10:00'}] * 5001
+        self.assertEqual(self.client.post('/pets/walks/', items, format='json').status_code, 400)
+
+    def test_single_object_still_uses_the_regular_create(self):
+        response = self.client.post('/pets/walks/', {'pet': self.pet.pk, 'date': '2024-01-02', 'time': '10:00'},
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('id', response.json())
+
+        response = self.client.post('/pets/walks/', {'pet': self.other_pet.pk, 'date': '2024-01-02', 'time': '10:00'},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
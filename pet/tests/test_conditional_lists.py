@@ -0,0 +1,50 @@
+from datetime import date, time
+
+from pet.models import Pet, Walk
+from .base import PetLinkTestCase
+
+
+class ConditionalListTests(PetLinkTestCase):
+    url = '/pets/pet-create/'
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], response['ETag'])
+
+        since = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(since.status_code, 304)
+
+    def test_changes_and_deletions_change_the_validator(self):
+        etag = self.client.get(self.url)['ETag']
+
+        Pet.objects.create(owner=self.user, name='Bim', species='Dog', birth_date=date(2022, 2, 2))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+        etag = response['ETag']
+        Pet.objects.get(name='Bim').delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_validator_depends_on_the_query(self):
+        Walk.objects.create(pet=self.pet, date=date(2024, 3, 1), time=time(8, 0))
+        etag = self.client.get('/pets/walks/')['ETag']
+
+        response = self.client.get('/pets/walks/?fields=id', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_validators_are_per_owner(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.token_client(self.other).get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([pet['name'] for pet in response.json()], ['Tom'])
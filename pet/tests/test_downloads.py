@@ -0,0 +1,78 @@
+from django.core.files.base import ContentFile
+from django.test import override_settings
+
+from pet.models import PetDocument
+from .base import PetLinkTestCase, TemporaryMediaMixin
+
+CONTENT = b'0123456789abcdefghij'
+
+
+class DocumentDownloadTests(TemporaryMediaMixin, PetLinkTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.document = PetDocument(pet=self.pet, title='Passport', document_type='passport')
+        self.document.file.save('passport.pdf', ContentFile(CONTENT), save=False)
+        self.document.save()
+        self.url = f'/pets/documents/{self.document.pk}/download/'
+
+    def download(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_whole_file_with_content_etag(self):
+        response, body = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        digest = self.document.file.name.rsplit('/', 1)[1].split('.')[0]
+        self.assertEqual(response['ETag'], f'"{digest}"')
+
+    def test_not_modified(self):
+        etag = self.download()[0]['ETag']
+
+        response, body = self.download(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(body, b'')
+
+    def test_byte_ranges(self):
+        response, body = self.download(HTTP_RANGE='bytes=5-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, CONTENT[5:10])
+        self.assertEqual(response['Content-Range'], f'bytes 5-9/{len(CONTENT)}')
+        self.assertEqual(response['Content-Length'], '5')
+
+        response, body = self.download(HTTP_RANGE='bytes=-4')
+        self.assertEqual(body, CONTENT[-4:])
+
+        response, body = self.download(HTTP_RANGE='bytes=15-')
+        self.assertEqual(body, CONTENT[15:])
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.download(HTTP_RANGE='bytes=100-')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_stale_if_range_sends_the_whole_file(self):
+        response, body = self.download(HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"outdated"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, CONTENT)
+
+    @override_settings(SENDFILE_BACKEND='nginx', SENDFILE_URL='/protected/')
+    def test_offloaded_to_nginx(self):
+        response, body = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{self.document.file.name}')
+        self.assertEqual(body, b'')
+
+    def test_other_owner_cannot_download(self):
+        response = self.token_client(self.other).get(self.url)
+
+        self.assertEqual(response.status_code, 404)
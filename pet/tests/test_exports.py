@@ -0,0 +1,119 @@
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+
+from pet.exports import purge_expired_exports, recover_exports, run_export
+from pet.models import Appointment, Feeding, PetExport
+from pet.recovery import recover_lost_jobs
+from .base import PetLinkTestCase, TemporaryMediaMixin
+
+
+class ExportTests(TemporaryMediaMixin, PetLinkTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for day in range(5):
+            Feeding.objects.create(pet=cls.pet, date=date(2024, 1, 1 + day), time=time(8),
+                                   food_type='dry', amount='100g', notes='привет')
+        Appointment.objects.create(pet=cls.pet, name='Vet', appointment_date=date(2024, 1, 1),
+                                   appointment_time=time(9))
+
+    def request_export(self, export_format='ndjson'):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(f'/pets/pets/{self.pet.pk}/exports/', {'format': export_format}, format='json')
+        self.assertEqual(response.status_code, 202, response.content)
+        self.assertEqual(len(callbacks), 1)
+        return response.json()['id']
+
+    def download(self, export_id):
+        detail = self.client.get(f'/pets/exports/{export_id}/').json()
+        self.assertEqual(detail['status'], PetExport.STATUS_DONE)
+        response = self.client.get(detail['download_url'])
+        self.assertEqual(response.status_code, 200)
+        return gzip.decompress(b''.join(response.streaming_content)).decode()
+
+    def test_ndjson_export(self):
+        export_id = self.request_export()
+        run_export(export_id)
+
+        lines = [json.loads(line) for line in self.download(export_id).splitlines()]
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(PetExport.objects.get(pk=export_id).row_count, 6)
+
+    def test_csv_export(self):
+        export_id = self.request_export('csv')
+        run_export(export_id)
+
+        rows = list(csv.reader(io.StringIO(self.download(export_id))))
+        self.assertEqual(rows[0][:3], ['type', 'id', 'date'])
+        self.assertEqual(len(rows), 7)
+
+    def test_other_owners_pet_can_not_be_exported(self):
+        response = self.client.post(f'/pets/pets/{self.other_pet.pk}/exports/', {}, format='json')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_runs_once_when_queued_twice(self):
+        export_id = self.request_export()
+
+        with mock.patch('pet.exports.iter_pet_history', wraps=lambda pet_id: iter(())) as history:
+            run_export(export_id)
+            run_export(export_id)
+
+        self.assertEqual(history.call_count, 1)
+        self.assertEqual(PetExport.objects.get(pk=export_id).attempts, 1)
+
+    def test_lost_exports_are_recovered(self):
+        now = timezone.now()
+        queued = PetExport.objects.create(pet=self.pet, requested_by=self.user)
+        interrupted = PetExport.objects.create(pet=self.pet, requested_by=self.user, attempts=1,
+                                               status=PetExport.STATUS_RUNNING, started_at=now - timedelta(hours=1))
+        exhausted = PetExport.objects.create(pet=self.pet, requested_by=self.user, attempts=3,
+                                             status=PetExport.STATUS_RUNNING, started_at=now - timedelta(hours=1))
+        recent = PetExport.objects.create(pet=self.pet, requested_by=self.user)
+        PetExport.objects.filter(pk__in=[queued.pk, interrupted.pk, exhausted.pk]).update(
+            created_at=now - timedelta(hours=1))
+
+        self.assertCountEqual(recover_exports(now), [queued.pk, interrupted.pk])
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.status, PetExport.STATUS_FAILED)
+
+        ran = []
+        recover_lost_jobs(run=lambda func, *args: ran.append(args) or func(*args))
+        self.assertCountEqual(ran, [(queued.pk,), (interrupted.pk,)])
+        for export in (queued, interrupted):
+            export.refresh_from_db()
+            self.assertEqual(export.status, PetExport.STATUS_DONE)
+        self.assertEqual(PetExport.objects.get(pk=recent.pk).status, PetExport.STATUS_PENDING)
+
+    def test_expired_exports_are_deleted_with_their_files(self):
+        export_id = self.request_export()
+        run_export(export_id)
+        export = PetExport.objects.get(pk=export_id)
+        path = default_storage.path(export.file.name)
+        self.assertTrue(os.path.exists(path))
+
+        self.assertEqual(purge_expired_exports(timezone.now() + timedelta(days=1)), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(purge_expired_exports(timezone.now() + timedelta(days=8)), 1)
+
+        self.assertFalse(PetExport.objects.filter(pk=export_id).exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_recover_jobs_command(self):
+        export = PetExport.objects.create(pet=self.pet, requested_by=self.user)
+        PetExport.objects.filter(pk=export.pk).update(created_at=timezone.now() - timedelta(hours=1))
+
+        call_command('recover_jobs', stdout=io.StringIO())
+
+        export.refresh_from_db()
+        self.assertEqual(export.status, PetExport.STATUS_DONE)
@@ -0,0 +1,65 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from PetLink.checks import check_shared_cache, require_shared_cache
+from pet.models import Pet
+from .base import PetLinkTestCase
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+REDIS = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                     'LOCATION': 'redis://localhost:6379/0'}}
+
+
+class ListCacheTests(PetLinkTestCase):
+
+    def names(self):
+        response = self.client.get('/pets/pet-create/')
+        self.assertEqual(response.status_code, 200)
+        return [pet['name'] for pet in response.json()]
+
+    def test_list_is_cached_until_the_owner_changes_data(self):
+        self.assertEqual(self.names(), ['Rex'])
+
+        # Без сигналов версия владельца не меняется: отдаётся закешированный список
+        Pet.objects.filter(pk=self.pet.pk).update(name='Rex II')
+        self.assertEqual(self.names(), ['Rex'])
+
+        self.pet.name = 'Rex III'
+        self.pet.save()
+        self.assertEqual(self.names(), ['Rex III'])
+
+    def test_other_owners_do_not_share_entries(self):
+        self.names()
+
+        response = self.token_client(self.other).get('/pets/pet-create/')
+
+        self.assertEqual([pet['name'] for pet in response.json()], ['Tom'])
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+
+    @override_settings(DEBUG=False, CACHES=LOCMEM)
+    def test_per_process_cache_fails_the_deploy_check(self):
+        errors = check_shared_cache(None)
+
+        self.assertEqual([error.id for error in errors], ['petlink.E001'])
+
+    @override_settings(DEBUG=True, CACHES=LOCMEM)
+    def test_per_process_cache_is_fine_under_debug(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(DEBUG=False, CACHES=REDIS)
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+        require_shared_cache(9)
+
+    @override_settings(DEBUG=False)
+    def test_default_configuration_boots_with_several_workers(self):
+        self.assertEqual(check_shared_cache(None), [])
+        require_shared_cache(9)
+
+    @override_settings(CACHES=LOCMEM)
+    def test_several_workers_require_a_shared_cache(self):
+        require_shared_cache(1)
+        with self.assertRaises(ImproperlyConfigured):
+            require_shared_cache(9)
@@ -0,0 +1,79 @@
+import io
+import json
+import random
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from pet.management.commands.loadtest import MIXES, OPERATIONS, Command, percentile, summarize
+from pet.models import Feeding, Pet, PetDocument
+from user.models import CustomUser
+from .base import PetLinkTestCase, TemporaryMediaMixin
+
+
+class LoadTestCommandTests(TemporaryMediaMixin, PetLinkTestCase):
+
+    def command(self):
+        return Command(stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_percentiles_and_summary(self):
+        self.assertEqual(percentile([], 50), 0.0)
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual((percentile(values, 50), percentile(values, 95), percentile(values, 99)), (50, 95, 99))
+        self.assertEqual(percentile([0.2], 99), 0.2)
+
+        summary = summarize([
+            ('pet_list', 0.010, 200, 2), ('pet_list', 0.030, 200, 4),
+            ('login', 0.100, 400, None), ('login', 0.200, 0, None),
+        ], duration=2)
+
+        self.assertEqual(list(summary), ['login', 'pet_list', 'total'])
+        self.assertEqual(summary['pet_list']['queries'], 3)
+        self.assertEqual(summary['pet_list']['p99'], 30)
+        self.assertEqual(summary['login']['errors'], 2)
+        self.assertIsNone(summary['login']['queries'])
+        self.assertEqual((summary['total']['requests'], summary['total']['rps']), (4, 2))
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_every_operation_succeeds_against_the_app(self):
+        accounts = self.command().create_data(users=2, pets=2, activities=4)
+
+        self.assertEqual(CustomUser.objects.filter(email__startswith='loadtest-').count(), 2)
+        self.assertEqual(Pet.objects.filter(owner__email__startswith='loadtest-').count(), 4)
+        self.assertEqual(Feeding.objects.filter(pet_id__in=accounts[0].pet_ids).count(), 8)
+
+        rng = random.Random(0)
+        for name in sorted({name for mix in MIXES.values() for name in mix}):
+            with self.subTest(operation=name):
+                method, path, body, headers = OPERATIONS[name](accounts[0], rng)
+                headers = dict(headers)
+                content_type = headers.pop('Content-Type', None)
+                client = self.client_class()
+                client.credentials(**{f'HTTP_{key.upper()}': value for key, value in headers.items()})
+                response = client.generic(method, path, body or '', content_type=content_type)
+                self.assertLess(response.status_code, 300, response.content)
+        self.assertEqual(PetDocument.objects.count(), 1)
+
+    def test_baselines_are_saved_and_compared(self):
+        directory = tempfile.mkdtemp(dir=self.media_root)
+        options = {'baseline_dir': directory, 'save_baseline': 'before', 'compare': 'before', 'mix': 'read',
+                   'concurrency': 4, 'duration': 5, 'warmup': 1, 'users': 10, 'pets': 1, 'activities': 50, 'seed': 0}
+        summary = summarize([('pet_list', 0.010, 200, 2)], duration=5)
+        self.command().save_baseline(summary, 'sqlite', options)
+        saved = json.loads((Path(directory) / 'before.json').read_text())
+        self.assertEqual(saved['options']['mix'], 'read')
+        self.assertEqual(saved['results']['pet_list']['requests'], 1)
+
+        command = self.command()
+        baseline = command.load_baseline({**options, 'concurrency': 8})
+        self.assertIn('--concurrency=4', command.stderr.getvalue())
+
+        faster = summarize([('pet_list', 0.005, 200, 1), ('pet_list', 0.005, 200, 1)], duration=5)
+        command.report(faster, baseline)
+        pet_list = next(line for line in command.stdout.getvalue().splitlines() if line.startswith('pet_list'))
+        self.assertTrue(pet_list.endswith('+100%     -50%      -1.0'), pet_list)
+
+        with self.assertRaises(CommandError):
+            command.load_baseline({**options, 'compare': 'missing'})
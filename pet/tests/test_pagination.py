@@ -0,0 +1,58 @@
+from datetime import date, time, timedelta
+
+from pet.models import Feeding
+from .base import PetLinkTestCase
+
+
+class ActivityPaginationTests(PetLinkTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        start = date(2024, 1, 1)
+        # По три записи в день с одинаковым временем у пар — проверяем разрыв ничьих по id
+        for index in range(23):
+            Feeding.objects.create(pet=cls.pet, date=start + timedelta(days=index // 3),
+                                   time=time(8 + index % 2), food_type='dry', amount='100g')
+        Feeding.objects.create(pet=cls.other_pet, date=start, time=time(8), food_type='dry', amount='50g')
+
+    def walk_pages(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            pages.append(response.json())
+            url = response.json()['next']
+        return pages
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        pages = self.walk_pages('/pets/feedings/?page_size=5')
+
+        rows = [row for page in pages for row in page['results']]
+        self.assertEqual(len(pages), 5)
+        self.assertEqual(len({row['id'] for row in rows}), 23)
+        keys = [(row['date'], row['time'], row['id']) for row in rows]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_previous_link_returns_the_same_page(self):
+        first = self.client.get('/pets/feedings/?page_size=5').json()
+        second = self.client.get(first['next']).json()
+        back = self.client.get(second['previous']).json()
+
+        self.assertIsNone(first['previous'])
+        self.assertEqual(back['results'], first['results'])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/pets/feedings/?cursor=not-a-cursor')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_pet_filter(self):
+        response = self.client.get(f'/pets/feedings/?pet={self.pet.pk}&page_size=100')
+        self.assertEqual(len(response.json()['results']), 23)
+
+        response = self.client.get(f'/pets/feedings/?pet={self.other_pet.pk}')
+        self.assertEqual(response.json()['results'], [])
+
+        response = self.client.get('/pets/feedings/?pet=abc')
+        self.assertEqual(response.status_code, 400)
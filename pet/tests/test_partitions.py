@@ -0,0 +1,130 @@
+from datetime import date, time
+from importlib import import_module
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from pet.models import Pet, Walk
+from pet.partitions import add_months, ensure_partitions
+from user.models import CustomUser
+
+migration = import_module('pet.migrations.0017_partition_activity_tables')
+
+on_postgresql = skipUnless(connection.vendor == 'postgresql', 'partitioning is PostgreSQL only')
+
+
+def fetch(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def partitions(table):
+    return {name for name, in fetch(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = %s::regclass", [table]
+    )}
+
+
+def primary_key(table):
+    return [name for name, in fetch(
+        "SELECT a.attname FROM pg_index i "
+        "JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) "
+        "WHERE i.indrelid = %s::regclass AND i.indisprimary ORDER BY array_position(i.indkey, a.attnum)", [table]
+    )]
+
+
+class FirstPartitionMonthTests(SimpleTestCase):
+
+    def test_start_is_clamped(self):
+        this_month = date(2026, 10, 1)
+        floor = add_months(this_month, -migration.MONTHS_BACK)
+
+        self.assertEqual(migration.first_partition_month(None, this_month), this_month)
+        self.assertEqual(migration.first_partition_month(date(2025, 2, 17), this_month), date(2025, 2, 1))
+        self.assertEqual(migration.first_partition_month(date(201, 3, 1), this_month), floor)
+        self.assertEqual(migration.first_partition_month(date(2030, 1, 1), this_month), this_month)
+
+
+@on_postgresql
+class PartitionMigrationTests(TransactionTestCase):
+    before = [('pet', '0016_pet_updated_at')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor
+
+    def setUp(self):
+        owner = CustomUser.objects.create_user(email='owner@example.com', password='x')
+        self.pet = Pet.objects.create(owner=owner, name='Rex', species='Dog', birth_date=date(2020, 5, 17))
+        self.migrate(self.before)
+        executor = MigrationExecutor(connection)
+        self.addCleanup(self.migrate, executor.loader.graph.leaf_nodes())
+
+    def insert_walks(self, *days):
+        with connection.cursor() as cursor:
+            for day in days:
+                cursor.execute(
+                    "INSERT INTO pet_walk (pet_id, date, time, notes, created_at, updated_at) "
+                    "VALUES (%s, %s, '08:00', '', now(), now())", [self.pet.pk, day]
+                )
+        return fetch("SELECT id, date FROM pet_walk ORDER BY id")
+
+    def test_rows_survive_and_old_dates_go_to_the_default_partition(self):
+        this_month = date.today().replace(day=1)
+        typo = date(201, 3, 1)  # опечатка в годе не должна создавать тысячи секций
+        rows = self.insert_walks(typo, add_months(this_month, -2), this_month)
+
+        self.migrate([('pet', '0017_partition_activity_tables')])
+
+        self.assertEqual(fetch("SELECT id, date FROM pet_walk ORDER BY id"), rows)
+        self.assertEqual(fetch("SELECT date FROM pet_walk_default"), [(typo,)])
+        self.assertEqual(len(partitions('pet_walk')), migration.MONTHS_BACK + migration.MONTHS_AHEAD + 2)
+        self.assertEqual(partitions('pet_feeding'), {'pet_feeding_default'} | {
+            f'pet_feeding_p{add_months(this_month, offset):%Y_%m}' for offset in range(migration.MONTHS_AHEAD + 1)
+        })
+        self.assertEqual(primary_key('pet_walk'), ['id', 'date'])
+
+        # id остаётся identity-столбцом и продолжает нумерацию
+        self.assertEqual(fetch("SELECT pg_get_serial_sequence('pet_walk', 'id')"), [('public.pet_walk_id_seq',)])
+        walk = Walk.objects.create(pet=self.pet, date=this_month, time=time(9, 0))
+        self.assertEqual(walk.pk, rows[-1][0] + 1)
+
+    def test_migration_state_and_reverse(self):
+        rows = self.insert_walks(date(2024, 3, 1))
+        executor = self.migrate([('pet', '0017_partition_activity_tables')])
+
+        pk = executor.loader.project_state().apps.get_model('pet', 'Walk')._meta.pk
+        self.assertEqual((pk.name, pk.get_internal_type()), ('id', 'BigAutoField'))
+        self.assertEqual(fetch("SELECT is_identity FROM information_schema.columns "
+                               "WHERE table_name = 'pet_walk' AND column_name = 'id'"), [('YES',)])
+
+        self.migrate(self.before)
+
+        self.assertEqual(fetch("SELECT id, date FROM pet_walk ORDER BY id"), rows)
+        self.assertEqual(partitions('pet_walk'), set())
+        self.assertEqual(primary_key('pet_walk'), ['id'])
+        self.assertEqual(fetch("SELECT pg_get_serial_sequence('pet_walk', 'id')"), [('public.pet_walk_id_seq',)])
+        self.assertEqual(fetch("SELECT COUNT(*) FROM pg_indexes WHERE tablename = 'pet_walk'"), [(4,)])
+
+
+@on_postgresql
+class EnsurePartitionsTests(TestCase):
+
+    def test_rows_in_the_default_partition_move_to_the_new_partition(self):
+        owner = CustomUser.objects.create_user(email='owner@example.com', password='x')
+        pet = Pet.objects.create(owner=owner, name='Rex', species='Dog', birth_date=date(2020, 5, 17))
+        this_month = date.today().replace(day=1)
+        later = add_months(this_month, 8)
+        walk = Walk.objects.create(pet=pet, date=later, time=time(8, 0))
+        self.assertEqual(fetch("SELECT id FROM pet_walk_default"), [(walk.pk,)])
+
+        created = ensure_partitions(months_ahead=8)
+
+        self.assertIn(f'pet_walk_p{later:%Y_%m}', created)
+        self.assertEqual(fetch(f"SELECT id FROM pet_walk_p{later:%Y_%m}"), [(walk.pk,)])
+        self.assertEqual(fetch("SELECT id FROM pet_walk_default"), [])
+        self.assertEqual(ensure_partitions(months_ahead=8), [])
@@ -0,0 +1,53 @@
+import random
+from datetime import date, timedelta
+
+from pet.models import Pet
+from .base import PetLinkTestCase
+
+
+def months_between(birth_date, today):
+    months = (today.year - birth_date.year) * 12 + today.month - birth_date.month
+    return months - (1 if today.day < birth_date.day else 0)
+
+
+class PetAgeTests(PetLinkTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        rng = random.Random(1)
+        Pet.objects.bulk_create(
+            Pet(owner=cls.user, name=f'Pet {index}', species='Cat',
+                birth_date=date(2010, 1, 1) + timedelta(days=rng.randint(0, 6000)))
+            for index in range(200)
+        )
+
+    def test_age_matches_python_on_edge_days(self):
+        # Конец месяца, 29 февраля и смена года
+        for today in (date(2024, 3, 30), date(2024, 2, 29), date(2023, 12, 31), date(2025, 1, 1)):
+            for pet in Pet.objects.with_age(today):
+                self.assertEqual(pet.age_in_months, months_between(pet.birth_date, today), (pet.birth_date, today))
+
+    def test_filter_age_bounds_are_inclusive(self):
+        today = date(2024, 2, 29)
+        pets = list(Pet.objects.filter(owner=self.user))
+        for low, high in ((0, 5), (12, 24), (30, 30), (None, 40), (100, None)):
+            found = set(Pet.objects.filter(owner=self.user).filter_age(low, high, today).values_list('id', flat=True))
+            expected = {
+                pet.pk for pet in pets
+                if (low is None or months_between(pet.birth_date, today) >= low)
+                and (high is None or months_between(pet.birth_date, today) <= high)
+            }
+            self.assertEqual(found, expected, (low, high))
+
+    def test_list_filters_and_sorts_by_age(self):
+        response = self.client.get('/pets/pet-create/?ordering=age&min_age_months=12&max_age_months=60')
+
+        self.assertEqual(response.status_code, 200)
+        ages = [pet['age_months'] for pet in response.json()]
+        self.assertEqual(ages, sorted(ages))
+        self.assertTrue(all(12 <= age <= 60 for age in ages))
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get('/pets/pet-create/?ordering=name').status_code, 400)
+        self.assertEqual(self.client.get('/pets/pet-create/?min_age_months=-1').status_code, 400)
@@ -0,0 +1,125 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+
+from pet.images import (
+    claim_photo_job, encode_photo_variants, generate_photo_variants, iter_variant_paths, recover_photo_variants,
+)
+from pet.models import Pet, StoredBlob
+from pet.recovery import recover_lost_jobs
+from .base import PetLinkTestCase, TemporaryMediaMixin
+
+
+def jpeg_with_exif(size=(2000, 1500), color='red'):
+    image = Image.new('RGB', size, color)
+    exif = Image.Exif()
+    exif[0x0112] = 6  # повёрнуто на 90°
+    exif[0x010F] = 'Camera maker'
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+class PhotoVariantTests(TemporaryMediaMixin, PetLinkTestCase):
+
+    def create_pet(self, content=None, name='Murka'):
+        photo = SimpleUploadedFile('кошка.jpg', content or jpeg_with_exif(), 'image/jpeg')
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post('/pets/pet-create/', {
+                'name': name, 'species': 'Cat', 'birth_date': '2020-01-01', 'photo': photo,
+            }, format='multipart')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(len(callbacks), 1)
+        return Pet.objects.get(pk=response.json()['id'])
+
+    def test_variants_are_rotated_resized_and_stripped(self):
+        pet = self.create_pet()
+        self.assertEqual(pet.photo_variants, {})
+
+        generate_photo_variants(pet.pk)
+
+        pet.refresh_from_db()
+        self.assertEqual(pet.photo_variants['source'], pet.photo.name)
+        self.assertEqual(set(pet.photo_variants['variants']), {'thumb', 'small', 'medium'})
+        medium = Image.open(default_storage.open(pet.photo_variants['variants']['medium']['jpeg']))
+        self.assertEqual(medium.size, (480, 640))
+        self.assertEqual(dict(medium.getexif()), {})
+        thumb = Image.open(default_storage.open(pet.photo_variants['variants']['thumb']['webp']))
+        self.assertEqual(thumb.size, (128, 128))
+
+    def test_running_twice_keeps_reference_counts(self):
+        pet = self.create_pet()
+
+        generate_photo_variants(pet.pk)
+        generate_photo_variants(pet.pk)
+
+        pet.refresh_from_db()
+        for path in iter_variant_paths(pet.photo_variants):
+            self.assertEqual(StoredBlob.objects.get(name=path).ref_count, 1, path)
+
+    def test_lost_variant_jobs_are_recovered(self):
+        pet = self.create_pet()
+        self.assertEqual(recover_photo_variants(), [])
+
+        later = timezone.now() + timedelta(hours=1)
+        self.assertEqual(recover_photo_variants(later), [pet.pk])
+
+        Pet.objects.filter(pk=pet.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        ran = []
+        recover_lost_jobs(run=lambda func, *args: ran.append(args) or func(*args))
+
+        self.assertEqual(ran, [(pet.pk,)])
+        pet.refresh_from_db()
+        self.assertEqual(pet.photo_variants['source'], pet.photo.name)
+        self.assertEqual(recover_photo_variants(later), [])
+
+    def test_job_queued_by_several_workers_runs_once(self):
+        pet = self.create_pet()
+        self.assertTrue(claim_photo_job(pet.pk, pet.photo.name))
+
+        with mock.patch('pet.images.encode_photo_variants', wraps=encode_photo_variants) as encode:
+            generate_photo_variants(pet.pk)
+        self.assertFalse(encode.called)
+        self.assertEqual(recover_photo_variants(timezone.now() + timedelta(minutes=10)), [])
+
+        # Зависшая попытка: по истечении RUN_TIMEOUT задачу снова можно взять
+        Pet.objects.filter(pk=pet.pk).update(photo_job_started_at=timezone.now() - timedelta(days=1))
+        generate_photo_variants(pet.pk)
+        pet.refresh_from_db()
+        self.assertEqual(pet.photo_variants['source'], pet.photo.name)
+        self.assertEqual((pet.photo_job_attempts, pet.photo_job_started_at), (0, None))
+
+    @override_settings(BACKGROUND_JOBS={'QUEUE_TIMEOUT': 300, 'RUN_TIMEOUT': 1800, 'MAX_ATTEMPTS': 2})
+    def test_failing_photo_is_given_up_after_max_attempts(self):
+        pet = self.create_pet()
+        later = timezone.now() + timedelta(hours=1)
+
+        with mock.patch('pet.images.encode_photo_variants', side_effect=OSError('broken image')) as encode:
+            for attempt in range(2):
+                self.assertEqual(recover_photo_variants(later), [pet.pk])
+                with self.assertRaises(OSError):
+                    generate_photo_variants(pet.pk)
+            generate_photo_variants(pet.pk)
+
+        self.assertEqual(encode.call_count, 2)
+        self.assertEqual(recover_photo_variants(later), [])
+
+        # Новое фото — новая задача
+        pet.photo = SimpleUploadedFile('другая.jpg', jpeg_with_exif(color='blue'), 'image/jpeg')
+        pet.save()
+        self.assertEqual(recover_photo_variants(later), [pet.pk])
+
+    def test_command_generates_missing_variants(self):
+        pet = self.create_pet()
+
+        call_command('generate_photo_variants', stdout=io.StringIO())
+
+        pet.refresh_from_db()
+        self.assertEqual(pet.photo_variants['source'], pet.photo.name)
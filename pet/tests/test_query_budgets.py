@@ -0,0 +1,180 @@
+import io
+from datetime import date, time
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+from PetLink.query_budget import QueryBudgetExceeded
+from pet.exports import run_export
+from pet.models import Appointment, Feeding, Medication, PetDocument, PetExport, Walk
+from pet.views import AppointmentView
+from .base import PetLinkTestCase, TemporaryMediaMixin
+
+
+def png_bytes(size=(32, 24), color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(QUERY_BUDGET_STRICT=True, QUERY_COUNT_HEADER=True)
+class QueryBudgetTests(TemporaryMediaMixin, PetLinkTestCase):
+    """
+    Calls every endpoint with a query budget under session authentication and
+    under token authentication, with the token lookup cached and not. The
+    test runner makes budgets strict, so an overrun raises
+    :class:`QueryBudgetExceeded` and fails the test.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for index in range(3):
+            Medication.objects.create(pet=cls.pet, date=date(2024, 1, 1 + index), time=time(8),
+                                      medication_name='Drops', dosage='2', frequency=2, notes='Rex eye drops')
+            Feeding.objects.create(pet=cls.pet, date=date(2024, 1, 1 + index), time=time(9),
+                                   food_type='dry', amount='100g', notes='Rex dry food')
+            Walk.objects.create(pet=cls.pet, date=date(2024, 1, 1 + index), time=time(10), notes='Rex park')
+            Appointment.objects.create(pet=cls.pet, name='Rex vet check', appointment_date=date(2024, 1, 1 + index),
+                                       appointment_time=time(11))
+
+    def setUp(self):
+        super().setUp()
+        self.document = PetDocument.objects.create(
+            pet=self.pet, title='Rex passport', document_type='passport',
+            file=SimpleUploadedFile('passport.pdf', b'%PDF-1.4 passport'),
+        )
+        self.export = PetExport.objects.create(pet=self.pet, requested_by=self.user)
+        run_export(self.export.pk)
+
+    def clients(self):
+        """
+        Yields ``(label, client)`` for every way of authenticating.
+        """
+        yield 'session', self.session_client()
+        client = self.token_client()
+        yield 'token, cold cache', client
+        yield 'token, warm cache', client
+
+    def assertWithinBudget(self, method, url, expected_status, data=None, **kwargs):
+        """
+        ``url`` and ``data`` may be callables, called before every request for
+        endpoints that need a fresh object or a fresh file each time.
+        """
+        for label, client in self.clients():
+            with self.subTest(auth=label, method=method):
+                request_url = url() if callable(url) else url
+                request_data = data() if callable(data) else data
+                try:
+                    response = getattr(client, method)(request_url, request_data, **kwargs)
+                except QueryBudgetExceeded as exc:
+                    self.fail(f'{label}: {exc}')
+                self.assertEqual(response.status_code, expected_status, getattr(response, 'content', b'')[:300])
+                self.assertIn('X-Query-Count', response)
+
+    def test_pet_list_and_create(self):
+        self.assertWithinBudget('get', '/pets/pet-create/', 200)
+        self.assertWithinBudget('get', '/pets/pet-create/?ordering=age&fields=id,name', 200)
+        self.assertWithinBudget('post', '/pets/pet-create/', 201, format='json',
+                                data={'name': 'Bim', 'species': 'Dog', 'birth_date': '2022-02-02'})
+
+    def test_pet_create_with_photo(self):
+        self.assertWithinBudget(
+            'post', '/pets/pet-create/', 201, format='multipart',
+            data=lambda: {'name': 'Bim', 'species': 'Dog', 'birth_date': '2022-02-02',
+                          'photo': SimpleUploadedFile('bim.png', png_bytes(), 'image/png')},
+        )
+
+    def test_activity_lists_and_create(self):
+        bodies = {
+            'medications': {'medication_name': 'Drops', 'dosage': '2', 'frequency': 2},
+            'feedings': {'food_type': 'wet', 'amount': '80g'},
+            'walks': {'notes': 'forest'},
+        }
+        for name, body in bodies.items():
+            self.assertWithinBudget('get', f'/pets/{name}/', 200)
+            self.assertWithinBudget('get', f'/pets/{name}/?pet={self.pet.pk}&from=2024-01-01&to=2024-12-31', 200)
+            self.assertWithinBudget('post', f'/pets/{name}/', 201, format='json',
+                                    data={'pet': self.pet.pk, 'date': '2024-02-01', 'time': '08:00', **body})
+            self.assertWithinBudget('post', f'/pets/{name}/', 201, format='json',
+                                    data=[{'pet': self.pet.pk, 'date': '2024-02-02', 'time': '08:00', **body}] * 5)
+
+    def test_appointments(self):
+        self.assertWithinBudget('get', '/pets/appointments/', 200)
+        self.assertWithinBudget('post', '/pets/appointments/', 201, format='json',
+                                data={'pet': self.pet.pk, 'name': 'Vaccination',
+                                      'appointment_date': '2024-05-05', 'appointment_time': '10:00'})
+        # SessionAuthentication идёт первой, поэтому 403, а не 401
+        self.assertEqual(self.client_class().get('/pets/appointments/').status_code, 403)
+
+    def test_documents(self):
+        url = f'/pets/pets/{self.pet.pk}/documents/'
+        self.assertWithinBudget('get', url, 200)
+        self.assertWithinBudget('post', url, 201, format='multipart', data=lambda: {
+            'title': 'Blood test', 'document_type': 'analysis',
+            'file': SimpleUploadedFile('blood.pdf', b'%PDF-1.4 blood test'),
+        })
+        self.assertWithinBudget('get', f'/pets/documents/{self.document.pk}/download/', 200)
+
+    def test_resumable_upload(self):
+        uploads = []
+
+        def start():
+            response = self.client.post(f'/pets/pets/{self.pet.pk}/documents/uploads/', format='json', data={
+                'title': 'X-ray', 'document_type': 'analysis', 'filename': 'xray.pdf', 'size': 6,
+            })
+            uploads.append(response.json()['id'])
+            return f'/pets/documents/uploads/{uploads[-1]}/'
+
+        self.assertWithinBudget('post', f'/pets/pets/{self.pet.pk}/documents/uploads/', 201, format='json', data={
+            'title': 'X-ray', 'document_type': 'analysis', 'filename': 'xray.pdf', 'size': 6,
+        })
+        self.assertWithinBudget('get', start, 200)
+        self.assertWithinBudget('patch', start, 200, data=b'xray!!',
+                                content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0')
+
+        def complete():
+            url = start()
+            self.client.patch(url, data=b'xray!!', content_type='application/offset+octet-stream',
+                              HTTP_UPLOAD_OFFSET='0')
+            return url + 'finalize/'
+
+        self.assertWithinBudget('post', complete, 201)
+        self.assertWithinBudget('delete', start, 204)
+
+    def test_exports(self):
+        url = f'/pets/pets/{self.pet.pk}/exports/'
+        self.assertWithinBudget('get', url, 200)
+        self.assertWithinBudget('post', url, 202, format='json', data={'format': 'csv'})
+        self.assertWithinBudget('get', f'/pets/exports/{self.export.pk}/', 200)
+        self.assertWithinBudget('get', f'/pets/exports/{self.export.pk}/download/', 200)
+
+    def test_reports(self):
+        self.assertWithinBudget('get', f'/pets/pets/{self.pet.pk}/timeline/', 200)
+        self.assertWithinBudget('get', f'/pets/pets/{self.pet.pk}/adherence/?from=2024-01-01&to=2024-01-31', 200)
+        self.assertWithinBudget('get', f'/pets/pets/{self.pet.pk}/stats/?days=30', 200)
+        # Совпадения во всех пяти источниках — самый дорогой поиск
+        self.assertWithinBudget('get', '/pets/search/?q=rex', 200)
+
+    def test_overrun_is_rolled_back(self):
+        with mock.patch.object(AppointmentView, 'query_budget', {'POST': 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.post('/pets/appointments/', format='json', data={
+                    'pet': self.pet.pk, 'name': 'Over budget',
+                    'appointment_date': '2024-05-05', 'appointment_time': '10:00',
+                })
+
+        self.assertFalse(Appointment.objects.filter(name='Over budget').exists())
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_overrun_is_only_logged_when_not_strict(self):
+        with mock.patch.object(AppointmentView, 'query_budget', {'POST': 0}), \
+                self.assertLogs('PetLink.query_budget', 'WARNING'):
+            response = self.client.post('/pets/appointments/', format='json', data={
+                'pet': self.pet.pk, 'name': 'Over budget',
+                'appointment_date': '2024-05-05', 'appointment_time': '10:00',
+            })
+
+        self.assertEqual(response.status_code, 201)
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.utils import timezone
+
+from pet.models import Appointment, Medication, SentReminder
+from pet.reminders import ReminderScheduler
+from .base import PetLinkTestCase
+
+
+class ReminderSchedulerTests(PetLinkTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now().replace(microsecond=0)
+
+    def scheduler(self, now=None):
+        scheduler = ReminderScheduler(horizon=timedelta(hours=6), appointment_lead=timedelta(hours=1),
+                                      refresh_interval=timedelta(minutes=1), replay=timedelta(hours=24))
+        scheduler.load(now or self.now)
+        return scheduler
+
+    def appointment(self, starts_in, name='Vet'):
+        at = timezone.localtime(self.now + starts_in)
+        return Appointment.objects.create(pet=self.pet, name=name, appointment_date=at.date(),
+                                          appointment_time=at.time())
+
+    def test_due_reminders_are_emailed_once(self):
+        self.appointment(timedelta(hours=2))
+        starts = timezone.localtime(self.now + timedelta(minutes=30))
+        Medication.objects.create(pet=self.pet, medication_name='Pill', dosage='1', frequency=1,
+                                  date=starts.date(), time=starts.time())
+        scheduler = self.scheduler()
+
+        self.assertEqual(scheduler.run_pending(self.now + timedelta(minutes=31)), 1)
+        self.assertEqual(scheduler.run_pending(self.now + timedelta(minutes=61)), 1)
+
+        self.assertEqual([message.to for message in mail.outbox], [[self.user.email]] * 2)
+        self.assertIn('Pill', mail.outbox[0].subject)
+        self.assertIn('Rex', mail.outbox[1].body)
+        self.assertEqual(SentReminder.objects.count(), 2)
+
+        # Перезапуск: уже доставленные напоминания не повторяются
+        restarted = self.scheduler(self.now + timedelta(minutes=62))
+        self.assertEqual(restarted.run_pending(self.now + timedelta(minutes=62)), 0)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_reminders_missed_while_down_are_delivered_on_start(self):
+        self.appointment(timedelta(minutes=30))  # напоминание должно было прийти полчаса назад
+
+        scheduler = self.scheduler()
+
+        self.assertEqual(scheduler.run_pending(self.now), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_delivery_is_retried_on_start(self):
+        self.appointment(timedelta(minutes=90))
+        scheduler = self.scheduler()
+
+        with mock.patch('pet.reminders.send_mail', side_effect=ConnectionRefusedError), \
+                self.assertLogs('pet.reminders', 'ERROR'):
+            self.assertEqual(scheduler.run_pending(self.now + timedelta(minutes=31)), 0)
+        self.assertFalse(SentReminder.objects.exists())
+
+        restarted = self.scheduler(self.now + timedelta(minutes=40))
+        self.assertEqual(restarted.run_pending(self.now + timedelta(minutes=40)), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_rows_changed_by_other_processes_are_polled(self):
+        scheduler = self.scheduler()
+        # Создана веб-воркером после загрузки окна, срок наступил до следующего опроса
+        self.appointment(timedelta(minutes=61))
+
+        scheduler.refresh(self.now + timedelta(minutes=2))
+
+        self.assertEqual(scheduler.run_pending(self.now + timedelta(minutes=2)), 1)
+
+    def test_deleted_rows_are_not_delivered(self):
+        appointment = self.appointment(timedelta(hours=2))
+        scheduler = self.scheduler()
+
+        appointment.delete()
+
+        self.assertEqual(scheduler.run_pending(self.now + timedelta(hours=1)), 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_old_deliveries_are_forgotten(self):
+        SentReminder.objects.create(kind='appointment', object_id=1, due_at=self.now - timedelta(days=2))
+        SentReminder.objects.create(kind='appointment', object_id=2, due_at=self.now - timedelta(hours=1))
+
+        self.scheduler().refresh(self.now)
+
+        self.assertEqual(list(SentReminder.objects.values_list('object_id', flat=True)), [2])
@@ -0,0 +1,108 @@
+import gzip
+import json
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from PetLink.middleware import parse_accept_encoding
+from pet.models import Walk
+from pet.renderers import ORJSONRenderer, msgpack, orjson
+from .base import PetLinkTestCase
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+class RendererTests(PetLinkTestCase):
+
+    @skipUnless(orjson, 'orjson is not installed')
+    def test_orjson_output_matches_the_stock_renderer(self):
+        data = {
+            'date': date(2024, 3, 1), 'time': time(8, 30), 'decimal': Decimal('1.50'),
+            'at': datetime(2024, 3, 1, 8, 30, 15, 123456, tzinfo=timezone.utc),
+            'id': uuid.UUID(int=1), 'text': 'Рекс', 'items': [1, 2.5, None, True],
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_msgpack_is_negotiated(self):
+        Walk.objects.create(pet=self.pet, date=date(2024, 3, 1), time=time(8, 0))
+
+        response = self.client.get('/pets/walks/', HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), self.client.get('/pets/walks/').json())
+
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_msgpack_request_body(self):
+        body = msgpack.packb({'pet': self.pet.pk, 'date': '2024-03-01', 'time': '08:00', 'notes': 'Рекс'})
+
+        response = self.client.post('/pets/walks/', body, content_type='application/msgpack')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Walk.objects.get().notes, 'Рекс')
+
+    def test_invalid_json_is_rejected(self):
+        response = self.client.post('/pets/walks/', '{"pet": NaN', content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+
+
+class CompressionTests(PetLinkTestCase):
+    url = '/pets/walks/?page_size=100'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Walk.objects.bulk_create(
+            Walk(pet=cls.pet, date=date(2024, 3, 1 + index // 10), time=time(index % 10 + 8), notes='Around the park')
+            for index in range(50)
+        )
+
+    def test_accept_encoding_is_parsed(self):
+        self.assertEqual(parse_accept_encoding('gzip;q=0.5, zstd , br;q=0, *;q=x'),
+                         {'gzip': 0.5, 'zstd': 1.0, 'br': 0.0, '*': 0.0})
+
+    def test_gzip(self):
+        plain = self.client.get(self.url)
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['ETag'].removeprefix('W/'), plain['ETag'].removeprefix('W/'))
+        self.assertEqual(json.loads(gzip.decompress(response.content)), plain.json())
+
+    @skipUnless(zstandard, 'zstandard is not installed')
+    def test_zstd_is_preferred_unless_the_client_says_otherwise(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, zstd')
+        self.assertEqual(response['Content-Encoding'], 'zstd')
+        self.assertEqual(json.loads(zstandard.ZstdDecompressor().decompressobj().decompress(response.content)),
+                         self.client.get(self.url).json())
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, zstd;q=0.5')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_refused_and_unknown_encodings(self):
+        for header in ('', 'identity', 'br', 'gzip;q=0, zstd;q=0'):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=header)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get('/pets/walks/?page_size=1', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        # Настройки читаются при создании middleware, поэтому нужен новый клиент
+        with override_settings(RESPONSE_COMPRESSION={'MIN_SIZE': 10}):
+            response = self.token_client().get('/pets/walks/?page_size=1', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
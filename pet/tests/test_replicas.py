@@ -0,0 +1,74 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from PetLink.db_router import PIN_COOKIE
+from .base import PetLinkTestCase
+
+REPLICAS = {'DATABASES': ['replica1'], 'PIN_SECONDS': 5}
+
+
+@override_settings(READ_REPLICAS=REPLICAS)
+@mock.patch('PetLink.db_router.choose_replica', return_value='default')
+class ReplicaPinTests(PetLinkTestCase):
+    url = '/pets/walks/'
+
+    def write(self, client=None):
+        response = (client or self.client).post(self.url, {
+            'pet': self.pet.pk, 'date': '2024-03-01', 'time': '08:00',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response
+
+    def read_from_replica(self, choose_replica, client=None):
+        choose_replica.reset_mock()
+        self.assertEqual((client or self.client).get(self.url).status_code, 200)
+        return choose_replica.called
+
+    def test_reads_after_a_write_go_to_the_primary(self, choose_replica):
+        self.assertTrue(self.read_from_replica(choose_replica))
+
+        cookie = self.write().cookies[PIN_COOKIE]
+
+        self.assertEqual(cookie['max-age'], 5)
+        self.assertTrue(cookie['httponly'])
+        self.assertFalse(self.read_from_replica(choose_replica))
+
+    def test_cookie_pin_does_not_depend_on_the_cache(self, choose_replica):
+        self.write()
+        # Другой воркер со своим кешем пина не видел
+        cache.clear()
+
+        self.assertFalse(self.read_from_replica(choose_replica))
+
+    def test_clients_without_cookies_are_pinned_through_the_cache(self, choose_replica):
+        self.write()
+        self.client.cookies.clear()
+        self.assertFalse(self.read_from_replica(choose_replica))
+
+        cache.clear()
+        self.assertTrue(self.read_from_replica(choose_replica))
+
+    def test_pin_expires(self, choose_replica):
+        self.write()
+        cache.clear()
+
+        with mock.patch('django.core.signing.time.time', return_value=time.time() + 6):
+            self.assertTrue(self.read_from_replica(choose_replica))
+
+    def test_pin_of_another_user_or_a_forged_pin_is_ignored(self, choose_replica):
+        other = self.token_client(self.other)
+        other.cookies[PIN_COOKIE] = self.write().cookies[PIN_COOKIE].value
+        cache.clear()
+        self.assertTrue(self.read_from_replica(choose_replica, other))
+
+        self.client.cookies[PIN_COOKIE] = str(self.user.pk)
+        self.assertTrue(self.read_from_replica(choose_replica))
+
+    def test_no_pin_without_replicas(self, choose_replica):
+        with override_settings(READ_REPLICAS={'DATABASES': []}):
+            response = self.write()
+
+        self.assertNotIn(PIN_COOKIE, response.cookies)
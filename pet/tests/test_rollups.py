@@ -0,0 +1,74 @@
+from datetime import date, time, timedelta
+
+from pet.models import ActivityRollup, Feeding, Walk
+from pet.rollups import backfill_rollups
+from .base import PetLinkTestCase
+
+
+class ActivityRollupTests(PetLinkTestCase):
+
+    def rollups(self):
+        return set(ActivityRollup.objects.filter(pet=self.pet, count__gt=0)
+                   .values_list('date', 'activity_type', 'count'))
+
+    def assertMatchesBackfill(self):
+        rollups = self.rollups()
+        backfill_rollups([self.pet.pk])
+        self.assertEqual(rollups, self.rollups())
+
+    def walk(self, day, pet=None):
+        return Walk.objects.create(pet=pet or self.pet, date=day, time=time(8, 0))
+
+    def test_saves_and_deletes_update_the_day(self):
+        first = self.walk(date(2024, 3, 1))
+        self.walk(date(2024, 3, 1))
+        Feeding.objects.create(pet=self.pet, food_type='Dry', amount='100 g', date=date(2024, 3, 1), time=time(9, 0))
+        self.assertEqual(self.rollups(), {(date(2024, 3, 1), 'walk', 2), (date(2024, 3, 1), 'feeding', 1)})
+
+        first.delete()
+
+        self.assertEqual(self.rollups(), {(date(2024, 3, 1), 'walk', 1), (date(2024, 3, 1), 'feeding', 1)})
+        self.assertMatchesBackfill()
+
+    def test_moved_activity_changes_both_days_and_pets(self):
+        walk = self.walk(date(2024, 3, 1))
+
+        walk.date = date(2024, 3, 2)
+        walk.save()
+        self.assertEqual(self.rollups(), {(date(2024, 3, 2), 'walk', 1)})
+
+        walk.pet = self.other_pet
+        walk.save()
+        self.assertEqual(self.rollups(), set())
+        self.assertEqual(ActivityRollup.objects.get(pet=self.other_pet, count__gt=0).date, date(2024, 3, 2))
+
+    def test_bulk_created_activities_are_counted(self):
+        response = self.client.post('/pets/walks/', [
+            {'pet': self.pet.pk, 'date': '2024-03-01', 'time': f'0{hour}:00'} for hour in range(1, 4)
+        ], format='json')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(self.rollups(), {(date(2024, 3, 1), 'walk', 3)})
+        self.assertMatchesBackfill()
+
+    def test_stats_endpoint(self):
+        today = date.today()
+        self.walk(today)
+        self.walk(today - timedelta(days=1))
+
+        response = self.client.get(f'/pets/pets/{self.pet.pk}/stats/?days=3&type=walk')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual(body['totals'], {'walk': 2})
+        self.assertEqual([day['walk'] for day in body['days']], [0, 1, 1])
+
+    def test_stats_of_another_owners_pet(self):
+        response = self.client.get(f'/pets/pets/{self.other_pet.pk}/stats/')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_stats_validates_parameters(self):
+        url = f'/pets/pets/{self.pet.pk}/stats/'
+        self.assertEqual(self.client.get(url + '?days=0').status_code, 400)
+        self.assertEqual(self.client.get(url + '?type=nap').status_code, 400)
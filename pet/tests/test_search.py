@@ -0,0 +1,69 @@
+from datetime import date, time
+
+from django.db import connection
+
+from pet.models import Appointment, Walk
+from pet.search import ensure_search_indexes, fts5_query, search, tsquery_text
+from .base import PetLinkTestCase
+
+
+class SearchTests(PetLinkTestCase):
+
+    def walk(self, notes, pet=None):
+        return Walk.objects.create(pet=pet or self.pet, date=date(2024, 3, 1), time=time(8, 0), notes=notes)
+
+    def found(self, query):
+        return {(kind, object_id) for kind, object_id, score in search(self.user, query)}
+
+    def test_search_endpoint(self):
+        walk = self.walk('Long walk in the park, chased a squirrel')
+        appointment = Appointment.objects.create(pet=self.pet, name='Dentist', description='Squirrel bite check',
+                                                 appointment_date=date(2024, 3, 2), appointment_time=time(10, 0))
+        self.walk('Squirrel again', pet=self.other_pet)
+
+        response = self.client.get('/pets/search/?q=squir')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        results = {(result['type'], result['data']['id']) for result in response.json()['results']}
+        self.assertEqual(results, {('walk', walk.pk), ('appointment', appointment.pk)})
+
+    def test_last_word_matches_as_a_prefix(self):
+        walk = self.walk('Дали таблетку от глистов')
+
+        self.assertEqual(self.found('таблетку глист'), {('walk', walk.pk)})
+        self.assertEqual(self.found('глист таблетку'), set())
+        self.assertEqual(self.found('таблетку & | !'), {('walk', walk.pk)})
+        self.assertEqual(self.found('!?'), set())
+
+    def test_queries_keep_only_words(self):
+        self.assertEqual(fts5_query('deworm "tab'), '"deworm" "tab"*')
+        self.assertEqual(tsquery_text('Deworm & !tab'), 'deworm & tab:*')
+        self.assertEqual(tsquery_text(':*'), '')
+
+    def test_index_follows_updates_and_deletes(self):
+        walk = self.walk('Muddy puddles')
+
+        walk.notes = 'Dry sunny day'
+        walk.save()
+        self.assertEqual(self.found('puddles'), set())
+        self.assertEqual(self.found('sunny'), {('walk', walk.pk)})
+
+        walk.delete()
+        self.assertEqual(self.found('sunny'), set())
+
+    def test_missing_triggers_are_recreated(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite FTS5 triggers')
+        self.assertEqual(ensure_search_indexes(), [])
+        # Так триггеры теряются, когда миграция пересоздаёт таблицу
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER pet_walk_search_insert')
+        walk = self.walk('Swimming in the lake')
+        self.assertEqual(self.found('lake'), set())
+
+        self.assertEqual(ensure_search_indexes(), ['walk'])
+
+        self.assertEqual(self.found('lake'), {('walk', walk.pk)})
+        self.assertEqual(self.found('lake'), self.found('swimming'))
+        later = self.walk('Lake again')
+        self.assertEqual(self.found('lake'), {('walk', walk.pk), ('walk', later.pk)})
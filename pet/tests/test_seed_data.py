@@ -0,0 +1,80 @@
+import io
+from datetime import date, time
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from pet.management.commands.seed_data import Command
+from pet.models import ActivityRollup, Feeding, Medication, MedicationDose, Pet, Walk
+from user.models import CustomUser
+from .base import PetLinkTestCase
+
+
+class SeedDataTests(PetLinkTestCase):
+
+    def seed(self, *args):
+        stdout = io.StringIO()
+        call_command('seed_data', '--users', '3', '--days', '40', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def snapshot(self, seed):
+        pets = Pet.objects.filter(owner__email__endswith=f'@seed{seed}.petlink.invalid')
+        rows = {}
+        for model in (Feeding, Walk, Medication):
+            rows[model.__name__] = sorted(
+                model.objects.filter(pet__in=pets).values_list('pet__name', 'date', 'time', 'notes')
+            )
+        rows['pets'] = sorted(pets.values_list('owner__email', 'name', 'species', 'breed', 'birth_date'))
+        return rows
+
+    def test_same_seed_generates_the_same_data(self):
+        self.seed('--seed', '1', '--batch-size', '50', '--skip-derived')
+        first = self.snapshot(1)
+        CustomUser.objects.filter(email__endswith='@seed1.petlink.invalid').delete()
+
+        self.seed('--seed', '1', '--skip-derived')
+
+        self.assertEqual(self.snapshot(1), first)
+        self.assertGreater(len(first['Feeding']), 40)
+        self.seed('--seed', '2', '--skip-derived')
+        self.assertNotEqual(self.snapshot(2)['pets'], first['pets'])
+
+    def test_reported_counts_and_derived_tables(self):
+        output = self.seed('--seed', '3', '--password', 'seed-password')
+
+        users = CustomUser.objects.filter(email__endswith='@seed3.petlink.invalid')
+        pets = Pet.objects.filter(owner__in=users)
+        self.assertEqual(users.count(), 3)
+        self.assertTrue(users.first().check_password('seed-password'))
+        for name, count in (('CustomUser', 3), ('Pet', pets.count()),
+                            ('Feeding', Feeding.objects.filter(pet__in=pets).count())):
+            self.assertIn(f'{name:<12} {count:>10,} rows', output)
+
+        walks = Walk.objects.filter(pet__in=pets)
+        self.assertEqual(ActivityRollup.objects.filter(pet__in=pets, activity_type='walk').count(),
+                         walks.values('pet', 'date').distinct().count())
+        if Medication.objects.filter(pet__in=pets).exists():
+            self.assertTrue(MedicationDose.objects.filter(pet__in=pets).exists())
+
+    def test_existing_seed_is_rejected(self):
+        self.seed('--seed', '4', '--users', '1', '--skip-derived')
+
+        with self.assertRaises(CommandError):
+            self.seed('--seed', '4', '--skip-derived')
+
+    def test_copy_escapes_text_values(self):
+        command = Command()
+        cursor = mock.MagicMock()
+        command.connection = mock.MagicMock()
+        command.connection.cursor.return_value.__enter__.return_value = cursor
+        command.connection.ops.quote_name = lambda name: f'"{name}"'
+        fields = [Walk._meta.get_field(name) for name in ('pet', 'date', 'time', 'notes')]
+
+        command.copy(Walk, fields, [[1, date(2024, 3, 1), time(8, 5), 'tab\there\nnew\\line'], [2, None, None, '']])
+
+        sql, buffer = cursor.copy_expert.call_args.args
+        self.assertEqual(sql, 'COPY "pet_walk" ("pet_id", "date", "time", "notes") FROM STDIN')
+        self.assertEqual(buffer.getvalue(),
+                         '1\t2024-03-01\t08:05:00\ttab\\there\\nnew\\\\line\n'
+                         '2\t\\N\t\\N\t\n')
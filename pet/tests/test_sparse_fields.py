@@ -0,0 +1,79 @@
+from datetime import date, time
+from io import StringIO
+
+from django.core.management import call_command
+
+from pet.models import Feeding, Walk
+from pet.serializers import FeedingSerializer, PetSerializer, WalkSerializer
+from .base import PetLinkTestCase
+
+
+class SparseFieldsTests(PetLinkTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for hour in (8, 12, 18):
+            Walk.objects.create(pet=cls.pet, date=date(2024, 3, 1), time=time(hour, 30), notes=f'Walk at {hour}')
+        Walk.objects.create(pet=cls.other_pet, date=date(2024, 3, 1), time=time(9, 0))
+
+    def test_only_requested_fields_are_returned(self):
+        response = self.client.get('/pets/walks/?fields=id,time')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        results = response.json()['results']
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], {'id': results[0]['id'], 'time': '18:30:00'})
+
+    def test_values_path_matches_the_serializer(self):
+        queryset = Walk.objects.filter(pet=self.pet).order_by('id')
+        serializer = WalkSerializer(context={'fields': None})
+        plan = serializer.get_values_plan()
+
+        self.assertIsNotNone(plan)
+        rows = queryset.values(*{column for name, column, converter in plan})
+        self.assertEqual(serializer.values_representation(rows, plan),
+                         [dict(item) for item in WalkSerializer(queryset, many=True).data])
+
+    def test_full_list_is_unchanged(self):
+        response = self.client.get('/pets/walks/')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['results'][-1], {
+            'id': Walk.objects.get(time=time(8, 30)).pk, 'pet': self.pet.pk,
+            'date': '2024-03-01', 'time': '08:30:00', 'notes': 'Walk at 8',
+        })
+
+    def test_method_fields_keep_the_model_path(self):
+        serializer = PetSerializer(context={'fields': ['name', 'owner_name']})
+        self.assertIsNone(serializer.get_values_plan())
+        self.assertEqual(serializer.get_select_columns(), {'id', 'name', 'owner__first_name'})
+
+        response = self.client.get('/pets/pet-create/?fields=name,owner_name')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json(), [{'name': 'Rex', 'owner_name': 'Anna'}])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/pets/walks/?fields=id,weather')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('weather', response.json()['fields'])
+
+    def test_fields_are_ignored_on_create(self):
+        response = self.client.post('/pets/walks/?fields=id', {
+            'pet': self.pet.pk, 'date': '2024-03-02', 'time': '07:00',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['date'], '2024-03-02')
+
+    def test_benchmark_command(self):
+        out = StringIO()
+
+        call_command('bench_serializers', rows=30, repeat=1, stdout=out)
+
+        self.assertEqual(len(out.getvalue().splitlines()), 4)
+        self.assertIn('values(), ?fields=', out.getvalue())
+        self.assertFalse(Feeding.objects.exists())
+        self.assertIsNotNone(FeedingSerializer(context={'fields': None}).get_values_plan())
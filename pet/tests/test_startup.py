@@ -0,0 +1,58 @@
+import runpy
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from PetLink.warmup import warm_up_app
+from pet.management.commands.importtime import parse_importtime
+
+GUNICORN_CONF = Path(settings.BASE_DIR) / 'gunicorn.conf.py'
+SHARED_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                            'LOCATION': 'redis://localhost:6379/0'}}
+
+
+class WarmupTests(SimpleTestCase):
+
+    def test_warm_up_app(self):
+        self.assertGreaterEqual(warm_up_app(), 0)
+
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   _io\n'
+            'import time:      2500 |      40000 | django.db\n'
+            'unrelated line\n'
+        )
+
+        self.assertEqual(parse_importtime(output), {'_io': (120, 120), 'django.db': (2500, 40000)})
+
+
+class GunicornConfigTests(SimpleTestCase):
+
+    def setUp(self):
+        self.config = runpy.run_path(str(GUNICORN_CONF))
+        self.server = mock.Mock()
+        self.server.cfg.workers = self.config['workers']
+
+    def test_master_preloads_the_app(self):
+        self.assertTrue(self.config['preload_app'])
+        self.assertGreater(self.config['max_requests'], 0)
+
+    @override_settings(CACHES=SHARED_CACHE)
+    def test_starts_on_a_shared_cache(self):
+        self.config['on_starting'](self.server)
+
+    def test_worker_survives_failed_recovery(self):
+        with mock.patch('PetLink.warmup.open_connections'), \
+                mock.patch('pet.recovery.recover_lost_jobs', side_effect=RuntimeError('database is down')):
+            self.config['post_fork'](self.server, mock.Mock(pid=42))
+
+        self.server.log.warning.assert_called_once()
+
+    def test_exiting_worker_finishes_its_jobs(self):
+        with mock.patch('pet.tasks.shutdown') as shutdown:
+            self.config['worker_exit'](self.server, mock.Mock(pid=42))
+
+        shutdown.assert_called_once_with(wait=True)
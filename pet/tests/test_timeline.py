@@ -0,0 +1,54 @@
+from datetime import date, time, timedelta
+
+from pet.models import Appointment, Feeding, Medication, Walk
+from .base import PetLinkTestCase
+
+
+class TimelineTests(PetLinkTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        day = date(2024, 3, 1)
+        for index in range(7):
+            # Одинаковые отметки времени у разных источников: порядок решают kind и id
+            Feeding.objects.create(pet=cls.pet, date=day, time=time(9), food_type='dry', amount='100g')
+            Walk.objects.create(pet=cls.pet, date=day + timedelta(days=index), time=time(9))
+            Medication.objects.create(pet=cls.pet, date=day - timedelta(days=index), time=time(index),
+                                      medication_name='Drops', dosage='2')
+            Appointment.objects.create(pet=cls.pet, name='Vet', appointment_date=day, appointment_time=time(9))
+        Walk.objects.create(pet=cls.other_pet, date=day, time=time(9))
+
+    def url(self, pet=None):
+        return f'/pets/pets/{(pet or self.pet).pk}/timeline/'
+
+    def test_merges_every_source_newest_first(self):
+        items, url = [], self.url() + '?page_size=4'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            items += response.json()['results']
+            url = response.json()['next']
+
+        self.assertEqual(len(items), 28)
+        self.assertEqual(len({(item['type'], item['data']['id']) for item in items}), 28)
+        moments = [
+            (item['data'].get('date') or item['data']['appointment_date'],
+             item['data'].get('time') or item['data']['appointment_time'])
+            for item in items
+        ]
+        self.assertEqual(moments, sorted(moments, reverse=True))
+
+    def test_previous_link_returns_the_same_page(self):
+        first = self.client.get(self.url() + '?page_size=4').json()
+        second = self.client.get(first['next']).json()
+        third = self.client.get(second['next']).json()
+
+        back = self.client.get(third['previous']).json()
+
+        self.assertEqual(back['results'], second['results'])
+
+    def test_other_owners_pet_is_not_found(self):
+        response = self.client.get(self.url(self.other_pet))
+
+        self.assertEqual(response.status_code, 404)
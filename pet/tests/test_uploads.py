@@ -0,0 +1,96 @@
+import os
+from unittest import mock
+
+from django.db import DatabaseError
+
+from pet.models import DocumentUpload, PetDocument
+from pet.uploads import get_upload_path, lock_upload_file
+from .base import PetLinkTestCase, TemporaryMediaMixin
+
+CONTENT = b'%PDF-1.4 x-ray of the left paw'
+
+
+class ResumableUploadTests(TemporaryMediaMixin, PetLinkTestCase):
+
+    def setUp(self):
+        super().setUp()
+        response = self.client.post(f'/pets/pets/{self.pet.pk}/documents/uploads/', format='json', data={
+            'title': 'X-ray', 'document_type': 'analysis', 'filename': 'xray.pdf', 'size': len(CONTENT),
+        })
+        self.assertEqual(response.status_code, 201, response.content)
+        self.upload = DocumentUpload.objects.get(pk=response.json()['id'])
+        self.url = f'/pets/documents/uploads/{self.upload.pk}/'
+
+    def send(self, chunk, offset):
+        return self.client.patch(self.url, data=chunk, content_type='application/offset+octet-stream',
+                                 HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_chunks_are_appended_and_finalized(self):
+        self.assertEqual(self.send(CONTENT[:10], 0).json()['offset'], 10)
+        response = self.send(CONTENT[10:], 10)
+        self.assertEqual(response['Upload-Offset'], str(len(CONTENT)))
+
+        response = self.client.post(self.url + 'finalize/')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        document = PetDocument.objects.get(pk=response.json()['id'])
+        with document.file.open('rb') as handle:
+            self.assertEqual(handle.read(), CONTENT)
+        self.assertFalse(DocumentUpload.objects.filter(pk=self.upload.pk).exists())
+        self.assertFalse(os.path.exists(get_upload_path(self.upload)))
+
+    def test_repeated_chunk_is_rejected(self):
+        self.send(CONTENT[:10], 0)
+
+        response = self.send(CONTENT[:10], 0)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Upload-Offset'], '10')
+        with open(get_upload_path(self.upload), 'rb') as handle:
+            self.assertEqual(handle.read(), CONTENT[:10])
+
+    def test_chunk_sent_while_another_is_written_is_rejected(self):
+        self.send(CONTENT[:10], 0)
+
+        # Другой воркер держит файл, пока читает тело своего запроса
+        with lock_upload_file(self.upload):
+            response = self.send(CONTENT[10:], 10)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Upload-Offset'], '10')
+        self.assertEqual(self.send(CONTENT[10:], 10).status_code, 200)
+
+    def test_chunk_after_finalize_is_not_found(self):
+        self.send(CONTENT, 0)
+        self.client.post(self.url + 'finalize/')
+
+        self.assertEqual(self.send(b'more', len(CONTENT)).status_code, 404)
+        self.assertFalse(os.path.exists(get_upload_path(self.upload)))
+
+    def test_incomplete_upload_is_not_finalized(self):
+        self.send(CONTENT[:10], 0)
+
+        response = self.client.post(self.url + 'finalize/')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 10)
+
+    def test_failed_finalize_keeps_the_upload(self):
+        self.send(CONTENT, 0)
+
+        with mock.patch.object(PetDocument, 'save', side_effect=DatabaseError('connection lost')):
+            with self.assertRaises(DatabaseError):
+                self.client.post(self.url + 'finalize/')
+
+        self.assertTrue(DocumentUpload.objects.filter(pk=self.upload.pk).exists())
+        with open(get_upload_path(self.upload), 'rb') as handle:
+            self.assertEqual(handle.read(), CONTENT)
+        response = self.client.post(self.url + 'finalize/')
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_abort_deletes_the_temp_file(self):
+        self.send(CONTENT[:10], 0)
+
+        self.assertEqual(self.client.delete(self.url).status_code, 204)
+
+        self.assertFalse(os.path.exists(get_upload_path(self.upload)))
@@ -0,0 +1,195 @@
+import fcntl
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from .models import DocumentUpload, PetDocument
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class UploadOffsetMismatch(Exception):
+    """
+    Raised when a chunk does not start where the stored data ends.
+
+    :ivar offset: Number of bytes already received.
+    :type offset: int
+    """
+
+    def __init__(self, offset):
+        super().__init__(f'Upload offset mismatch, {offset} bytes received so far.')
+        self.offset = offset
+
+
+class UploadTooLarge(Exception):
+    """
+    Raised when a chunk would grow the file past its declared size.
+    """
+
+
+class UploadIncomplete(Exception):
+    """
+    Raised when finalizing an upload that has not received every byte.
+    """
+
+
+def get_upload_dir():
+    directory = getattr(settings, 'DOCUMENT_UPLOAD_TEMP_DIR', None) or os.path.join(
+        settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir(), 'petlink-uploads'
+    )
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def get_upload_path(upload):
+    return os.path.join(get_upload_dir(), f'{upload.pk}.part')
+
+
+def get_offset(upload):
+    """
+    Returns the number of bytes received so far, i.e. the size of the temp file.
+    """
+    try:
+        return os.path.getsize(get_upload_path(upload))
+    except FileNotFoundError:
+        return 0
+
+
+def lock_upload(upload):
+    """
+    Locks the upload row until the end of the transaction. Raises
+    ``DocumentUpload.DoesNotExist`` if the upload was finalized or aborted
+    in the meantime.
+    """
+    if DocumentUpload.objects.select_for_update().filter(pk=upload.pk).values_list('pk').first() is None:
+        raise DocumentUpload.DoesNotExist('The upload was finalized or aborted.')
+
+
+@contextmanager
+def lock_upload_file(upload, blocking=True):
+    """
+    Opens the upload's temp file for appending, creating it if needed, and
+    holds an exclusive ``flock`` on it until the block exits. Writers,
+    finalizing and aborting are serialized by this lock rather than by a row
+    lock, so no transaction stays open while a request body is streamed.
+
+    With ``blocking=False`` raises :class:`BlockingIOError` if another
+    process holds the lock.
+    """
+    path = get_upload_path(upload)
+    with open(path, 'ab') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        try:
+            yield handle
+        except DocumentUpload.DoesNotExist:
+            # Пустой файл создан уже после завершения или отмены загрузки
+            if os.path.exists(path) and not os.path.getsize(path):
+                os.remove(path)
+            raise
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def append_chunk(upload, offset, stream, length=None):
+    """
+    Appends the bytes of ``stream`` to the upload's temp file at ``offset``.
+
+    The stream is copied in fixed-size chunks directly to disk, so the
+    request body is never held in memory. The offset is checked and the
+    bytes appended with the temp file locked (see :func:`lock_upload_file`),
+    so of two chunks sent at the same offset one is appended and the other
+    gets :class:`UploadOffsetMismatch` without waiting for the first.
+    Returns the new offset.
+    """
+    path = get_upload_path(upload)
+    try:
+        with lock_upload_file(upload, blocking=False) as handle:
+            if not DocumentUpload.objects.filter(pk=upload.pk).exists():
+                raise DocumentUpload.DoesNotExist('The upload was finalized or aborted.')
+            if not os.path.exists(path) or not os.path.samestat(os.fstat(handle.fileno()), os.stat(path)):
+                # Файл успели перенести в хранилище и вернуть после неудачного завершения
+                raise BlockingIOError
+            current = os.fstat(handle.fileno()).st_size
+            if offset != current:
+                raise UploadOffsetMismatch(current)
+            if length is not None and offset + length > upload.size:
+                raise UploadTooLarge(f'The chunk exceeds the declared size of {upload.size} bytes.')
+
+            written = offset
+            while True:
+                chunk = stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > upload.size:
+                    handle.truncate(offset)
+                    raise UploadTooLarge(f'The chunk exceeds the declared size of {upload.size} bytes.')
+                handle.write(chunk)
+            return written
+    except BlockingIOError:
+        # Другой запрос сейчас дописывает или завершает загрузку
+        raise UploadOffsetMismatch(get_offset(upload))
+
+
+def finalize_upload(upload):
+    """
+    Turns a complete upload into a ``PetDocument`` and removes the temp file.
+
+    The temp file is moved into the storage before the document row is
+    saved; if anything fails after that, it is copied back, so the upload
+    can be finalized again.
+    """
+    path = get_upload_path(upload)
+    document = PetDocument(pet=upload.pet, title=upload.title, document_type=upload.document_type)
+    with lock_upload_file(upload):
+        try:
+            with transaction.atomic():
+                lock_upload(upload)
+                if get_offset(upload) != upload.size:
+                    raise UploadIncomplete(
+                        f'Received {get_offset(upload)} of {upload.size} bytes, the upload is not complete.'
+                    )
+                with open(path, 'rb') as handle:
+                    document.file.save(upload.filename, UploadedPart(handle), save=False)
+                document.save()
+                upload.delete()
+        except Exception:
+            if document.file and not os.path.exists(path):
+                # Файл в хранилище оставляем: его могла переиспользовать другая загрузка,
+                # а ненужный удалит manage.py migrate_legacy_files
+                shutil.copyfile(document.file.path, path)
+            raise
+        if os.path.exists(path):  # файл уже был в хранилище и не перемещался
+            os.remove(path)
+    return document
+
+
+class UploadedPart(File):
+    """
+    A finished temp file; exposing its path lets ``FileSystemStorage`` move it
+    into place instead of copying the bytes.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def discard_upload(upload):
+    """
+    Deletes an upload together with its temp file. Does nothing if the
+    upload was finalized or deleted in the meantime.
+    """
+    path = get_upload_path(upload)
+    try:
+        with lock_upload_file(upload):
+            with transaction.atomic():
+                lock_upload(upload)
+                upload.delete()
+            os.remove(path)
+    except DocumentUpload.DoesNotExist:
+        return
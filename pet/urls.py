@@ -1,5 +1,11 @@
 from django.urls import path
-from .views import PetCreateView, MedicationView, FeedingView, WalkView, AppointmentView, PetDocumentView
+from .async_views import AsyncPetListView, AsyncMedicationView, AsyncFeedingView, AsyncWalkView
+from .views import (
+    PetCreateView, MedicationView, FeedingView, WalkView, AppointmentView, PetDocumentView,
+    PetTimelineView, PetExportView, PetExportDetailView, PetExportDownloadView,
+    DocumentUploadView, DocumentUploadDetailView, DocumentUploadFinalizeView, PetDocumentDownloadView,
+    ListCacheStatsView, PetAdherenceView, PetActivityStatsView, PetSearchView,
+)
 
 urlpatterns = [
     path('pet-create/', PetCreateView.as_view(), name='pet-create'),
@@ -8,6 +14,23 @@ urlpatterns = [
     path('walks/', WalkView.as_view(), name='walks'),
     path('appointments/', AppointmentView.as_view(), name='appointments'),
     path('pets/<int:pet_id>/documents/', PetDocumentView.as_view(), name='pet-documents'),
+    path('pets/<int:pet_id>/documents/uploads/', DocumentUploadView.as_view(), name='pet-document-uploads'),
+    path('documents/<int:pk>/download/', PetDocumentDownloadView.as_view(), name='pet-document-download'),
+    path('documents/uploads/<uuid:pk>/', DocumentUploadDetailView.as_view(), name='pet-document-upload-detail'),
+    path('documents/uploads/<uuid:pk>/finalize/', DocumentUploadFinalizeView.as_view(),
+         name='pet-document-upload-finalize'),
+    path('search/', PetSearchView.as_view(), name='pet-search'),
+    path('pets/<int:pet_id>/timeline/', PetTimelineView.as_view(), name='pet-timeline'),
+    path('pets/<int:pet_id>/adherence/', PetAdherenceView.as_view(), name='pet-adherence'),
+    path('pets/<int:pet_id>/stats/', PetActivityStatsView.as_view(), name='pet-activity-stats'),
+    path('pets/<int:pet_id>/exports/', PetExportView.as_view(), name='pet-exports'),
+    path('exports/<int:pk>/', PetExportDetailView.as_view(), name='pet-export-detail'),
+    path('exports/<int:pk>/download/', PetExportDownloadView.as_view(), name='pet-export-download'),
+    path('cache-stats/', ListCacheStatsView.as_view(), name='list-cache-stats'),
+    path('async/pets/', AsyncPetListView.as_view(), name='async-pets'),
+    path('async/medications/', AsyncMedicationView.as_view(), name='async-medications'),
+    path('async/feedings/', AsyncFeedingView.as_view(), name='async-feedings'),
+    path('async/walks/', AsyncWalkView.as_view(), name='async-walks'),
 
 ]
 
@@ -1,16 +1,45 @@
-from rest_framework.generics import ListCreateAPIView
+import io
+import os
+from datetime import date, timedelta
+
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import (
+    CreateAPIView, GenericAPIView, ListCreateAPIView, RetrieveAPIView, RetrieveDestroyAPIView,
+)
 from rest_framework.response import Response
 from rest_framework import permissions, status, viewsets
-from rest_framework.permissions import IsAuthenticated
-from .models import Pet, Medication, Feeding, Walk, Appointment, PetDocument
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.settings import api_settings
+from PetLink.db_router import ReplicaReadMixin
+from PetLink.query_budget import QueryBudgetMixin
+from .adherence import adherence_report
+from .rollups import ACTIVITY_TYPES, daily_activity_stats
+from .search import load_results, search
+from .downloads import serve_file
+from .exports import run_export
+from .models import Pet, Medication, Feeding, Walk, Appointment, PetDocument, PetExport, DocumentUpload
+from .cache import get_cache_stats
+from .mixins import BulkCreateMixin, CachedListMixin, ConditionalListMixin, SparseFieldsListMixin
+from .pagination import ActivityCursorPagination, TimelinePagination, TimelineSource
+from .parsers import NDJSONParser
 from .serializers import (
     PetSerializer, MedicationSerializer, FeedingSerializer,
-    WalkSerializer, AppointmentSerializer, PetDocumentSerializer
+    WalkSerializer, AppointmentSerializer, PetDocumentSerializer, PetExportSerializer,
+    DocumentUploadSerializer,
+)
+from .tasks import run_in_background
+from .uploads import (
+    UploadIncomplete, UploadOffsetMismatch, UploadTooLarge,
+    append_chunk, discard_upload, finalize_upload, get_offset,
 )
 
 
 
-class PetCreateView(ListCreateAPIView):
+class PetCreateView(QueryBudgetMixin, ReplicaReadMixin, ConditionalListMixin, CachedListMixin, SparseFieldsListMixin,
+                    ListCreateAPIView):
     """
     Provides functionality for listing and creating pet profiles.
 
@@ -18,17 +47,51 @@ class PetCreateView(ListCreateAPIView):
     for their pets. Regular users can view and manage only their own pet profiles,
     while administrative users have access to see all pet profiles. The creation
     process is limited to a maximum of 5 pet profiles per user.
+
+    The list can be filtered by age with ``?min_age_months=`` and
+    ``?max_age_months=`` and sorted with ``?ordering=age`` (or ``-age``). Age is
+    computed by the database, see :class:`pet.models.PetQuerySet`.
     """
     serializer_class = PetSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 3, 'POST': 8}  # + учёт ссылок на файл фото
+    # Младше — значит позже родился: сортировка по индексу birth_date
+    age_orderings = {
+        'age': ('-birth_date', '-id'),
+        '-age': ('birth_date', 'id'),
+    }
 
     def get_queryset(self):
         """
         Ограничивает список питомцев только для текущего пользователя.
         """
-        if self.request.user.is_staff:
-            return Pet.objects.all()  # Администратор видит всех питомцев
-        return Pet.objects.filter(owner=self.request.user)  # Пользователи видят только своих питомцев
+        queryset = Pet.objects.select_related('owner').with_age()  # owner_name без запроса на каждого питомца
+        if not self.request.user.is_staff:  # Администратор видит всех питомцев
+            queryset = queryset.filter(owner=self.request.user)  # Пользователи видят только своих питомцев
+
+        params = self.request.query_params
+        queryset = queryset.filter_age(
+            min_months=self._get_months_param('min_age_months'),
+            max_months=self._get_months_param('max_age_months'),
+        )
+        ordering = params.get('ordering')
+        if ordering in self.age_orderings:
+            queryset = queryset.order_by(*self.age_orderings[ordering])
+        elif ordering is not None:
+            raise ValidationError({'ordering': f"Supported values: {', '.join(self.age_orderings)}."})
+        return queryset
+
+    def get_validator_extra(self):
+        # Возраст в ответе меняется с датой, даже если строки не менялись
+        return date.today()
+
+    def _get_months_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        if not value.isdigit():
+            raise ValidationError({name: 'A non-negative integer is required.'})
+        return int(value)
 
     def perform_create(self, serializer):
         """
@@ -46,7 +109,54 @@ class PetCreateView(ListCreateAPIView):
         # Создаём профиль питомца
         serializer.save(owner=self.request.user)
 
-class MedicationView(ListCreateAPIView):
+class BaseActivityView(BulkCreateMixin, QueryBudgetMixin, ReplicaReadMixin, ConditionalListMixin, CachedListMixin,
+                       SparseFieldsListMixin, ListCreateAPIView):
+    """
+    Base view for listing and creating activity logs of the current user's pets.
+
+    Activity lists are paginated with a keyset cursor ordered by
+    ``(date, time, id)``, newest first, so every page costs the same regardless
+    of how much history a pet has. The list can be narrowed to a single pet
+    with the ``?pet=<id>`` query parameter, which lets the database use the
+    ``(pet_id, date, time)`` index directly, and to a period with ``?from=``
+    and ``?to=`` (ISO dates, inclusive). On PostgreSQL the activity tables are
+    partitioned by month of ``date`` (see :mod:`pet.partitions`), so a period
+    and later cursor pages only touch the months they cover.
+
+    POST accepts either a single object or many records at once as a JSON
+    array or an NDJSON body, see :class:`pet.mixins.BulkCreateMixin`.
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = ActivityCursorPagination
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, NDJSONParser]
+    query_budget = {'GET': 3, 'POST': 4}
+
+    def get_queryset(self):
+        model = self.get_serializer_class().Meta.model
+        queryset = model.objects.filter(pet__owner=self.request.user)
+
+        pet_id = self.request.query_params.get('pet')
+        if pet_id is not None:
+            if not pet_id.isdigit():
+                raise ValidationError({'pet': 'A valid integer is required.'})
+            queryset = queryset.filter(pet_id=int(pet_id))
+        return self.filter_period(queryset)
+
+    def filter_period(self, queryset):
+        params = self.request.query_params
+        for param, lookup in (('from', 'date__gte'), ('to', 'date__lte')):
+            if param not in params:
+                continue
+            try:
+                day = parse_date(params[param])
+            except ValueError:
+                day = None
+            if day is None:
+                raise ValidationError({param: 'Date must be in YYYY-MM-DD format.'})
+            queryset = queryset.filter(**{lookup: day})
+        return queryset
+
+class MedicationView(BaseActivityView):
     """
     Handles the listing and creation of Medication objects for the logged-in user.
 
@@ -56,13 +166,10 @@ class MedicationView(ListCreateAPIView):
     """
     serializer_class = MedicationSerializer
 
-    def get_queryset(self):
-        return Medication.objects.filter(pet__owner=self.request.user)
-
     def perform_create(self, serializer):
         medication = serializer.save()
 
-class FeedingView(ListCreateAPIView):
+class FeedingView(BaseActivityView):
     """
     Handles the creation and retrieval of feeding records associated with pets.
 
@@ -72,13 +179,10 @@ class FeedingView(ListCreateAPIView):
     """
     serializer_class = FeedingSerializer
 
-    def get_queryset(self):
-        return Feeding.objects.filter(pet__owner=self.request.user)
-
     def perform_create(self, serializer):
         activity = serializer.save()
 
-class WalkView(ListCreateAPIView):
+class WalkView(BaseActivityView):
     """
     Handles the list and creation of Walk objects specific to the logged-in user.
 
@@ -89,13 +193,11 @@ class WalkView(ListCreateAPIView):
     """
     serializer_class = WalkSerializer
 
-    def get_queryset(self):
-        return Walk.objects.filter(pet__owner=self.request.user)
-
     def perform_create(self, serializer):
         walk = serializer.save()
 
-class AppointmentView(ListCreateAPIView):
+class AppointmentView(QueryBudgetMixin, ReplicaReadMixin, ConditionalListMixin, CachedListMixin, SparseFieldsListMixin,
+                      ListCreateAPIView):
     """
     Handles creation and retrieval of appointment data for the authenticated user.
 
@@ -104,12 +206,14 @@ class AppointmentView(ListCreateAPIView):
     associated with the pets of the currently authenticated user.
     """
     serializer_class = AppointmentSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 3, 'POST': 4}
 
     def get_queryset(self):
         return Appointment.objects.filter(pet__owner=self.request.user)
 
 
-class PetDocumentView(ListCreateAPIView):
+class PetDocumentView(QueryBudgetMixin, ReplicaReadMixin, CachedListMixin, SparseFieldsListMixin, ListCreateAPIView):
     """
     API view for creating and retrieving pet documents.
 
@@ -117,11 +221,375 @@ class PetDocumentView(ListCreateAPIView):
     specific pet. It filters documents based on the provided pet ID and ensures that
     the created documents are linked to the specified pet.    """
     serializer_class = PetDocumentSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 3, 'POST': 9}  # + учёт ссылок на файл
 
     def get_queryset(self):
         pet_id = self.kwargs['pet_id']
-        return PetDocument.objects.filter(pet_id=pet_id)
+        return PetDocument.objects.filter(pet_id=pet_id, pet__owner=self.request.user)
 
     def perform_create(self, serializer):
-        pet_id = self.kwargs['pet_id']
-        serializer.save(pet_id=pet_id)
\ No newline at end of file
+        pet = get_object_or_404(Pet, pk=self.kwargs['pet_id'], owner=self.request.user)
+        serializer.save(pet=pet)
+
+
+class PetDocumentDownloadView(QueryBudgetMixin, RetrieveAPIView):
+    """
+    Downloads the file of a document belonging to one of the current user's pets.
+
+    Supports ``Range`` requests, strong ``ETag`` validators and
+    ``If-None-Match``, and offloads the transfer to the front server when
+    ``SENDFILE_BACKEND`` is configured, see :func:`pet.downloads.serve_file`.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 3
+
+    def get_queryset(self):
+        return PetDocument.objects.filter(pet__owner=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        document = self.get_object()
+        extension = os.path.splitext(document.file.name)[1]  # имя в хранилище — хеш содержимого
+        return serve_file(request, document.file, filename=f'{document.title}{extension}')
+
+
+class PetTimelineView(QueryBudgetMixin, ReplicaReadMixin, GenericAPIView):
+    """
+    Returns a single chronologically ordered feed of a pet's activity.
+
+    Medications, feedings, walks and appointments of one pet are merged into a
+    single stream, newest first, so clients no longer have to call every list
+    endpoint and merge the results themselves. Each source is read through its
+    ``(pet_id, date, time)`` index one page at a time and the cursors are
+    k-way merged, see :class:`pet.pagination.TimelinePagination`.
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = TimelinePagination
+    query_budget = 5  # питомец + по одному запросу на источник
+    serializer_classes = {
+        'appointment': AppointmentSerializer,
+        'feeding': FeedingSerializer,
+        'medication': MedicationSerializer,
+        'walk': WalkSerializer,
+    }
+
+    def get_sources(self, pet):
+        return [
+            TimelineSource('appointment', Appointment.objects.filter(pet=pet),
+                           date_field='appointment_date', time_field='appointment_time'),
+            TimelineSource('feeding', Feeding.objects.filter(pet=pet)),
+            TimelineSource('medication', Medication.objects.filter(pet=pet)),
+            TimelineSource('walk', Walk.objects.filter(pet=pet)),
+        ]
+
+    def get(self, request, *args, **kwargs):
+        pet = get_object_or_404(Pet, pk=self.kwargs['pet_id'], owner=request.user)
+        page = self.paginator.paginate_sources(self.get_sources(pet), request, view=self)
+
+        context = self.get_serializer_context()
+        data = [
+            {
+                'type': kind,
+                'data': self.serializer_classes[kind](obj, context=context).data,
+            }
+            for kind, obj in page
+        ]
+        return self.paginator.get_paginated_response(data)
+
+
+class DocumentUploadView(QueryBudgetMixin, CreateAPIView):
+    """
+    Starts a resumable, chunked upload of a pet document.
+
+    The client declares ``title``, ``document_type``, ``filename`` and the total
+    ``size`` in bytes and receives an upload id. The bytes are then sent in
+    chunks to :class:`DocumentUploadDetailView` and the document is created by
+    :class:`DocumentUploadFinalizeView`.
+    """
+    serializer_class = DocumentUploadSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = 4
+
+    def perform_create(self, serializer):
+        pet = get_object_or_404(Pet, pk=self.kwargs['pet_id'], owner=self.request.user)
+        serializer.save(pet=pet, owner=self.request.user)
+
+
+class DocumentUploadDetailView(QueryBudgetMixin, RetrieveDestroyAPIView):
+    """
+    Reports, appends to or aborts a resumable document upload.
+
+    ``GET``/``HEAD`` return the current offset (also in the ``Upload-Offset``
+    header). ``PATCH`` appends the raw request body at the offset given in the
+    ``Upload-Offset`` header; the body is streamed to a temp file on disk in
+    fixed-size chunks rather than buffered in memory. A chunk that does not
+    start at the current offset is rejected with ``409 Conflict`` carrying the
+    offset to resume from. ``DELETE`` aborts the upload.
+    """
+    serializer_class = DocumentUploadSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = 3
+    offset_header = 'Upload-Offset'
+
+    def get_queryset(self):
+        return DocumentUpload.objects.filter(owner=self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        response[self.offset_header] = str(response.data['offset'])
+        return response
+
+    def patch(self, request, *args, **kwargs):
+        upload = self.get_object()
+        try:
+            offset = int(request.headers[self.offset_header])
+        except (KeyError, ValueError):
+            raise ValidationError({self.offset_header: 'A valid integer header is required.'})
+
+        length = request.headers.get('Content-Length')
+        try:
+            new_offset = append_chunk(upload, offset, request.stream or io.BytesIO(),
+                                      int(length) if length else None)
+        except UploadOffsetMismatch as exc:
+            return Response(
+                {'error': str(exc), 'offset': exc.offset},
+                status=status.HTTP_409_CONFLICT,
+                headers={self.offset_header: str(exc.offset)},
+            )
+        except UploadTooLarge as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        except DocumentUpload.DoesNotExist:
+            raise Http404('The upload was finalized or aborted.')
+
+        return Response(
+            {'id': upload.pk, 'offset': new_offset, 'size': upload.size},
+            headers={self.offset_header: str(new_offset)},
+        )
+
+    def perform_destroy(self, instance):
+        discard_upload(instance)
+
+
+class DocumentUploadFinalizeView(QueryBudgetMixin, GenericAPIView):
+    """
+    Completes a resumable upload and creates the ``PetDocument``.
+    """
+    serializer_class = PetDocumentSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = 12  # загрузка, учёт ссылок на файл, документ, удаление загрузки
+
+    def get_queryset(self):
+        return DocumentUpload.objects.select_related('pet').filter(owner=self.request.user)
+
+    def post(self, request, *args, **kwargs):
+        upload = get_object_or_404(self.get_queryset(), pk=self.kwargs['pk'])
+        try:
+            document = finalize_upload(upload)
+        except UploadIncomplete as exc:
+            return Response(
+                {'error': str(exc), 'offset': get_offset(upload)},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except DocumentUpload.DoesNotExist:
+            raise Http404('The upload was finalized or aborted.')
+        return Response(self.get_serializer(document).data, status=status.HTTP_201_CREATED)
+
+
+class PetExportView(QueryBudgetMixin, SparseFieldsListMixin, ListCreateAPIView):
+    """
+    Starts and lists full-history exports of a pet.
+
+    POST schedules a background job that streams every record of the pet into
+    a gzip-compressed NDJSON or CSV file and answers immediately with
+    ``202 Accepted``; GET lists the pet's previous exports with their status.
+    """
+    serializer_class = PetExportSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 4, 'POST': 5}
+
+    def get_pet(self):
+        return get_object_or_404(Pet, pk=self.kwargs['pet_id'], owner=self.request.user)
+
+    def get_queryset(self):
+        return PetExport.objects.filter(pet=self.get_pet())
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        export = serializer.save(pet=self.get_pet(), requested_by=request.user)
+        run_in_background(run_export, export.pk)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class PetExportDetailView(QueryBudgetMixin, RetrieveAPIView):
+    """
+    Returns the status of a single export requested by the current user.
+    """
+    serializer_class = PetExportSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = 3
+
+    def get_queryset(self):
+        return PetExport.objects.filter(requested_by=self.request.user)
+
+
+class PetExportDownloadView(PetExportDetailView):
+    """
+    Streams the finished export file of the current user as an attachment.
+    """
+
+    def get(self, request, *args, **kwargs):
+        export = self.get_object()
+        if export.status != PetExport.STATUS_DONE or not export.file:
+            raise Http404('Export is not ready.')
+        return serve_file(request, export.file)
+
+
+class ListCacheStatsView(GenericAPIView):
+    """
+    Reports hit/miss counters of the per-owner list cache (staff only).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_cache_stats())
+
+
+class PetAdherenceView(QueryBudgetMixin, ReplicaReadMixin, GenericAPIView):
+    """
+    Reports medication adherence of a pet: expected versus taken doses.
+
+    Reads the materialized schedule (:class:`pet.models.MedicationDose`), so
+    both the totals and the daily figures are aggregated by the database.
+    The period is chosen with ``?from=`` and ``?to=`` (ISO dates, the last
+    30 days by default, at most ``max_days``) and can be narrowed to one
+    medication with ``?medication=``.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 3  # питомец + итоги + дни
+    default_days = 30
+    max_days = 366
+
+    def get_period(self, request):
+        params = request.query_params
+        try:
+            end = parse_date(params['to']) if 'to' in params else date.today()
+            start = parse_date(params['from']) if 'from' in params else end - timedelta(days=self.default_days - 1)
+        except ValueError:
+            start = end = None
+        if start is None or end is None:
+            raise ValidationError({'detail': 'Dates must be in YYYY-MM-DD format.'})
+        if start > end:
+            raise ValidationError({'detail': '"from" must not be after "to".'})
+        if (end - start).days >= self.max_days:
+            raise ValidationError({'detail': f'The period can not be longer than {self.max_days} days.'})
+        return start, end
+
+    def get(self, request, *args, **kwargs):
+        pet = get_object_or_404(Pet, pk=self.kwargs['pet_id'], owner=request.user)
+        start, end = self.get_period(request)
+        medications = adherence_report(pet, start, end, request.query_params.get('medication'))
+        return Response({
+            'pet': pet.pk,
+            'from': start,
+            'to': end,
+            'medications': medications,
+        })
+
+
+class PetActivityStatsView(QueryBudgetMixin, ReplicaReadMixin, GenericAPIView):
+    """
+    Returns the number of medications, feedings and walks of a pet per day.
+
+    Reads only the daily rollups (:class:`pet.models.ActivityRollup`), never
+    the activity tables. ``?days=`` sets the period ending today (90 by
+    default, at most ``max_days``) and ``?type=`` limits the activity types,
+    e.g. ``?type=walk&type=feeding``.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 2  # питомец + сводки
+    default_days = 90
+    max_days = 366
+
+    def get_days(self, request):
+        days = request.query_params.get('days', self.default_days)
+        try:
+            days = int(days)
+        except (TypeError, ValueError):
+            raise ValidationError({'days': 'A valid integer is required.'})
+        if not 1 <= days <= self.max_days:
+            raise ValidationError({'days': f'Must be between 1 and {self.max_days}.'})
+        return days
+
+    def get_activity_types(self, request):
+        activity_types = request.query_params.getlist('type')
+        unknown = set(activity_types) - set(ACTIVITY_TYPES.values())
+        if unknown:
+            raise ValidationError({'type': f'Unknown activity types: {", ".join(sorted(unknown))}.'})
+        return activity_types or list(ACTIVITY_TYPES.values())
+
+    def get(self, request, *args, **kwargs):
+        pet = get_object_or_404(Pet, pk=self.kwargs['pet_id'], owner=request.user)
+        activity_types = self.get_activity_types(request)
+        end = date.today()
+        start = end - timedelta(days=self.get_days(request) - 1)
+        days, totals = daily_activity_stats(pet, start, end, activity_types)
+        return Response({
+            'pet': pet.pk,
+            'from': start,
+            'to': end,
+            'totals': totals,
+            'days': days,
+        })
+
+
+class PetSearchView(QueryBudgetMixin, ReplicaReadMixin, GenericAPIView):
+    """
+    Full-text search over the caller's activity notes, appointment
+    descriptions and document titles.
+
+    ``?q=`` is matched against indexed text (``tsvector`` on PostgreSQL,
+    FTS5 on SQLite, see :mod:`pet.search`) and the hits are returned ranked,
+    best first. ``?pet=`` narrows the search to one pet and ``?limit=`` sets
+    the number of results (at most ``max_limit``).
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 7  # поиск (и проверка FTS-таблицы в первый раз) + по одному запросу на тип результата
+    default_limit = 20
+    max_limit = 100
+    serializer_classes = {
+        'appointment': AppointmentSerializer,
+        'document': PetDocumentSerializer,
+        'feeding': FeedingSerializer,
+        'medication': MedicationSerializer,
+        'walk': WalkSerializer,
+    }
+
+    def get_int_param(self, name, default=None):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return default
+        if not value.isdigit():
+            raise ValidationError({name: 'A valid integer is required.'})
+        return int(value)
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'This parameter is required.'})
+        pet_id = self.get_int_param('pet')
+        limit = min(self.get_int_param('limit', self.default_limit) or self.default_limit, self.max_limit)
+
+        hits = load_results(search(request.user, query, pet_id=pet_id, limit=limit))
+        context = self.get_serializer_context()
+        return Response({
+            'query': query,
+            'results': [
+                {
+                    'type': kind,
+                    'score': score,
+                    'data': self.serializer_classes[kind](obj, context=context).data,
+                }
+                for kind, obj, score in hits
+            ],
+        })
@@ -0,0 +1,88 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import alogin
+from django.db import connections
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.authtoken.models import Token
+
+from .models import CustomUser
+from .serializers import LoginSerializer
+
+# PBKDF2 занимает CPU на десятки миллисекунд: выносим в ограниченный пул,
+# чтобы не блокировать цикл событий и не плодить потоки под нагрузкой.
+password_hasher_pool = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'PASSWORD_HASHER_WORKERS', 4),
+    thread_name_prefix='petlink-password-hasher',
+)
+
+
+def run_hasher_task(func, *args):
+    """
+    Runs ``func`` in a password hasher thread and closes the database
+    connections it opened (``check_password`` saves the user when the hash
+    needs upgrading), so the long-lived pool threads never keep one open.
+    """
+    try:
+        return func(*args)
+    finally:
+        connections.close_all()
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLoginView(View):
+    """
+    Async variant of :class:`user.views.LoginView`.
+
+    The user is fetched with the async ORM and the password hash is verified
+    in a bounded thread pool, so slow PBKDF2 iterations never block the event
+    loop. Unknown emails still pay for one hash to keep response times uniform.
+    """
+    http_method_names = ['post', 'options']
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError as exc:
+            return JsonResponse({'detail': f'JSON parse error - {exc}'}, status=400)
+
+        serializer = LoginSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+
+        email = serializer.validated_data['email']
+        password = serializer.validated_data['password']
+        loop = asyncio.get_running_loop()
+
+        try:
+            user = await CustomUser.objects.aget_by_natural_key(email)
+        except CustomUser.DoesNotExist:
+            await loop.run_in_executor(password_hasher_pool, run_hasher_task, CustomUser().set_password, password)
+            user = None
+        else:
+            password_ok = await loop.run_in_executor(
+                password_hasher_pool, run_hasher_task, user.check_password, password
+            )
+            if not password_ok or not user.is_active:
+                user = None
+
+        if user is None:
+            return JsonResponse({"error": "Invalid email or password"}, status=401)
+
+        user.backend = 'django.contrib.auth.backends.ModelBackend'
+        await alogin(request, user)
+        token, created = await Token.objects.aget_or_create(user=user)
+        return JsonResponse(
+            {
+                "token": token.key,
+                "user_id": user.id,
+                "email": user.email,
+                "first_name": user.first_name
+            },
+            status=200,
+        )
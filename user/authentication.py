@@ -0,0 +1,222 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+CACHE_KEY_PREFIX = 'petlink:token-auth'
+
+
+def get_cache_settings():
+    options = {'MAX_SIZE': 10000, 'TTL': 300, 'SHARED': True, 'LOCAL_TTL': 5}
+    options.update(getattr(settings, 'TOKEN_AUTH_CACHE', {}))
+    return options
+
+
+class TokenCache:
+    """
+    Bounded, thread-safe LRU cache of token key -> ``(user, token)`` with a TTL.
+
+    Entries live in process memory. With ``SHARED`` enabled (the default), the
+    Django cache is used as a second tier shared by all worker processes and
+    as a revocation channel: every user has a revocation epoch in the shared
+    cache, an entry is only valid while the epoch it was stored with is
+    current, and revoking bumps the epoch, so the revocation takes effect in
+    every process on its next request instead of after the TTL. This needs a
+    cache shared by the workers, see :mod:`PetLink.checks`.
+
+    Without ``SHARED`` a revocation only reaches the process handling it, so
+    entries expire after ``LOCAL_TTL`` seconds instead: other processes check
+    the token and ``is_active`` in the database again at least that often.
+
+    :ivar hits: Number of authentications served without a database query.
+    :type hits: int
+    :ivar misses: Number of authentications that had to query the database.
+    :type misses: int
+    """
+
+    def __init__(self, max_size=None, ttl=None, shared=None, local_ttl=None):
+        options = get_cache_settings()
+        self.max_size = max_size if max_size is not None else options['MAX_SIZE']
+        self.ttl = ttl if ttl is not None else options['TTL']
+        self.shared = shared if shared is not None else options['SHARED']
+        if not self.shared:
+            # Отзыв виден только этому процессу: остальные перепроверят токен через LOCAL_TTL
+            self.ttl = min(self.ttl, local_ttl if local_ttl is not None else options['LOCAL_TTL'])
+        self.entries = OrderedDict()
+        self.keys_by_user = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _shared_key(key):
+        # Сам токен в ключ общего кеша не кладём
+        return f'{CACHE_KEY_PREFIX}:token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+    @staticmethod
+    def _epoch_key(user_id):
+        return f'{CACHE_KEY_PREFIX}:user:{user_id}:epoch'
+
+    def get(self, key):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] <= now:
+                self._discard(key)
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+
+        if entry is not None and self.shared:
+            if cache.get(self._epoch_key(entry[0].pk), 0) != entry[3]:
+                self.discard(key)
+                entry = None
+        if entry is None and self.shared:
+            entry = self._get_shared(key, now)
+
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry[0], entry[1]
+
+    def _get_shared(self, key, now):
+        stored = cache.get(self._shared_key(key))
+        if stored is None:
+            return None
+        user, token, epoch = stored
+        if cache.get(self._epoch_key(user.pk), 0) != epoch:
+            return None
+        entry = (user, token, now + self.ttl, epoch)
+        self._store(key, entry)
+        return entry
+
+    def set(self, key, user, token):
+        epoch = 0
+        if self.shared:
+            epoch = cache.get(self._epoch_key(user.pk), 0)
+            cache.set(self._shared_key(key), (user, token, epoch), self.ttl)
+        self._store(key, (user, token, time.monotonic() + self.ttl, epoch))
+
+    def _store(self, key, entry):
+        with self.lock:
+            self._discard(key)
+            self.entries[key] = entry
+            self.keys_by_user.setdefault(entry[0].pk, set()).add(key)
+            while len(self.entries) > self.max_size:
+                self._discard(next(iter(self.entries)))
+
+    def _discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            keys = self.keys_by_user.get(entry[0].pk)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.keys_by_user[entry[0].pk]
+
+    def discard(self, key):
+        with self.lock:
+            self._discard(key)
+
+    def revoke_token(self, key, user_id):
+        """
+        Forgets a deleted token in this process and, if shared, everywhere.
+        """
+        self.discard(key)
+        if self.shared:
+            cache.delete(self._shared_key(key))
+            self._bump_epoch(user_id)
+
+    def revoke_user(self, user_id):
+        """
+        Forgets every cached token of a user (deactivated, changed or deleted).
+        """
+        with self.lock:
+            for key in list(self.keys_by_user.get(user_id, ())):
+                self._discard(key)
+        if self.shared:
+            self._bump_epoch(user_id)
+
+    def _bump_epoch(self, user_id):
+        key = self._epoch_key(user_id)
+        if not cache.add(key, 1, timeout=None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), timeout=None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_user.clear()
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'shared': self.shared,
+                'hits': self.hits,
+                'misses': self.misses,
+                'db_lookups_saved': self.hits,
+                'hit_ratio': round(self.hits / total, 4) if total else None,
+            }
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    DRF ``TokenAuthentication`` that remembers successful lookups.
+
+    The ``Token`` + user join is issued only on a cache miss; see
+    :class:`TokenCache` for expiry and revocation. Invalid tokens and inactive
+    users are never cached, so failures always hit the database.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return user, token
+
+
+async def aauthenticate_token(request):
+    """
+    Async counterpart of :class:`CachedTokenAuthentication` for async views.
+
+    Returns the active user of the ``Authorization: Token <key>`` header, or
+    ``None`` when the header is missing or the token is invalid.
+    """
+    auth = get_authorization_header(request).split()
+    if len(auth) != 2 or auth[0].lower() != b'token':
+        return None
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        return None
+
+    cached = token_cache.get(key)
+    if cached is not None:
+        return cached[0]
+    try:
+        token = await Token.objects.select_related('user').aget(key=key)
+    except Token.DoesNotExist:
+        return None
+    if not token.user.is_active:
+        return None
+    token_cache.set(key, token.user, token)
+    return token.user
@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .models import CustomUser
+
+
+@receiver(post_delete, sender=Token)
+def revoke_deleted_token(sender, instance, **kwargs):
+    token_cache.revoke_token(instance.key, instance.user_id)
+
+
+@receiver(post_save, sender=CustomUser)
+def revoke_changed_user(sender, instance, update_fields=None, **kwargs):
+    """
+    Drops cached tokens of a user whose account changed (e.g. deactivated),
+    except for the ``last_login`` update performed on every login.
+    """
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    token_cache.revoke_user(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def revoke_deleted_user(sender, instance, **kwargs):
+    token_cache.revoke_user(instance.pk)
@@ -1,3 +1,143 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from PetLink.query_budget import QueryBudgetExceeded
+from .authentication import TokenCache, token_cache
+from .models import CustomUser
+
+PASSWORD = 'correct-horse-battery'
+
+
+class UserTestCase(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='owner@example.com', password=PASSWORD, first_name='Anna')
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+
+    def clients(self):
+        session = APIClient()
+        session.force_login(self.user)
+        yield 'anonymous', APIClient()
+        yield 'session', session
+        token = APIClient()
+        token.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        yield 'token', token
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(UserTestCase):
+
+    def assertWithinBudget(self, url, data, expected_status):
+        for label, client in self.clients():
+            with self.subTest(auth=label):
+                try:
+                    response = client.post(url, data() if callable(data) else data, format='json')
+                except QueryBudgetExceeded as exc:
+                    self.fail(f'{label}: {exc}')
+                self.assertEqual(response.status_code, expected_status, response.content)
+
+    def test_register(self):
+        emails = iter(f'new{index}@example.com' for index in range(10))
+        self.assertWithinBudget('/accounts/register/', lambda: {
+            'email': next(emails), 'username': next(emails), 'password': PASSWORD, 'first_name': 'New',
+        }, 201)
+
+    def test_login(self):
+        self.assertWithinBudget('/accounts/login/', {'email': self.user.email, 'password': PASSWORD}, 200)
+
+    def test_failed_login(self):
+        self.assertWithinBudget('/accounts/login/', {'email': self.user.email, 'password': 'wrong'}, 401)
+
+
+class TokenCacheTests(UserTestCase):
+    """
+    Two ``TokenCache`` instances stand for two worker processes sharing the
+    Django cache.
+    """
+
+    def test_revoked_token_is_dropped_by_every_worker(self):
+        first, second = TokenCache(shared=True), TokenCache(shared=True)
+        first.set(self.token.key, self.user, self.token)
+        self.assertIsNotNone(second.get(self.token.key))
+
+        second.revoke_token(self.token.key, self.user.pk)
+
+        self.assertIsNone(first.get(self.token.key))
+        self.assertIsNone(second.get(self.token.key))
+
+    def test_deactivated_user_is_dropped_by_every_worker(self):
+        first, second = TokenCache(shared=True), TokenCache(shared=True)
+        first.set(self.token.key, self.user, self.token)
+
+        with mock.patch('user.signals.token_cache', second):
+            self.user.is_active = False
+            self.user.save()
+
+        self.assertIsNone(first.get(self.token.key))
+
+    def test_unshared_entries_expire_after_the_local_ttl(self):
+        worker = TokenCache(shared=False, ttl=300, local_ttl=5)
+        with mock.patch('user.authentication.time.monotonic', return_value=1000.0):
+            worker.set(self.token.key, self.user, self.token)
+        with mock.patch('user.authentication.time.monotonic', return_value=1004.0):
+            self.assertIsNotNone(worker.get(self.token.key))
+        with mock.patch('user.authentication.time.monotonic', return_value=1006.0):
+            self.assertIsNone(worker.get(self.token.key))
+
+    def test_deleted_token_is_rejected(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(client.get('/pets/pet-create/').status_code, 200)
+
+        Token.objects.filter(pk=self.token.pk).delete()
+
+        # SessionAuthentication идёт первой, поэтому 403, а не 401
+        self.assertEqual(client.get('/pets/pet-create/').status_code, 403)
+
+
+class AsyncLoginTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password=PASSWORD)
+        # Хеш с меньшим числом итераций: check_password перехеширует пароль и сохранит пользователя
+        CustomUser.objects.filter(pk=self.user.pk).update(
+            password=PBKDF2PasswordHasher().encode(PASSWORD, 'legacysalt', iterations=1000),
+        )
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.pool.shutdown)
+
+    def login(self, password):
+        with mock.patch('user.async_views.password_hasher_pool', self.pool):
+            return async_to_sync(self.async_client.post)(
+                '/accounts/async/login/', {'email': self.user.email, 'password': password},
+                content_type='application/json',
+            )
+
+    def test_hasher_thread_closes_its_connection(self):
+        # Тестовая SQLite в памяти игнорирует close(), поэтому проверяем сам вызов
+        with mock.patch.object(connections, 'close_all', wraps=connections.close_all) as close_all:
+            response = self.login(PASSWORD)
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.user.refresh_from_db()
+        self.assertNotIn('$1000$', self.user.password)
+        self.assertEqual(close_all.call_count, 1)
+
+    def test_wrong_password(self):
+        self.assertEqual(self.login('wrong').status_code, 401)
@@ -1,8 +1,11 @@
 from django.urls import path
 # from .views import CustomUserRegistrationView, LoginView
 from .views import *
+from .async_views import AsyncLoginView
 
 urlpatterns = [
     path('register/', CustomUserRegistrationView.as_view(), name='user-registration'),
     path('login/', LoginView.as_view(), name='user-login'),
+    path('async/login/', AsyncLoginView.as_view(), name='async-user-login'),
+    path('auth-cache-stats/', AuthCacheStatsView.as_view(), name='auth-cache-stats'),
 ]
\ No newline at end of file
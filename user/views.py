@@ -4,12 +4,14 @@ from rest_framework.authtoken.models import Token
 from django.contrib.auth import login
 from django.contrib.auth import authenticate
 from rest_framework import status, generics
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from .authentication import token_cache
 from .serializers import CustomUserSerializer, LoginSerializer
 from .models import CustomUser
+from PetLink.query_budget import QueryBudgetMixin
 
 
-class CustomUserRegistrationView(GenericAPIView):
+class CustomUserRegistrationView(QueryBudgetMixin, GenericAPIView):
     """
     Handles user registration with custom logic.
 
@@ -19,6 +21,7 @@ class CustomUserRegistrationView(GenericAPIView):
     returns the appropriate error messages.
     """
     serializer_class = CustomUserSerializer
+    query_budget = 3
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -27,7 +30,7 @@ class CustomUserRegistrationView(GenericAPIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class LoginView(GenericAPIView):
+class LoginView(QueryBudgetMixin, GenericAPIView):
     """
     Handles user login through REST API.
 
@@ -38,6 +41,7 @@ class LoginView(GenericAPIView):
     through the specified serializer.
     """
     serializer_class = LoginSerializer
+    query_budget = 12  # сессия, last_login и токен
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -66,4 +70,16 @@ class LoginView(GenericAPIView):
         return Response(
             {"error": "Invalid email or password"},
             status=status.HTTP_401_UNAUTHORIZED,
-        )
\ No newline at end of file
+        )
+
+
+class AuthCacheStatsView(GenericAPIView):
+    """
+    Reports how many token lookups the authentication cache saved (staff only).
+
+    Counters are kept per worker process.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(token_cache.stats())